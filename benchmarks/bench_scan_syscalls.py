@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark de chamadas de sistema por entrada do DirectoryScanner
+
+Compara a travessia antiga (Path.iterdir + is_dir + stat por entrada) com o
+motor baseado em os.scandir, contando as chamadas de sistema de metadados
+(stat/lstat/listdir/scandir) feitas por entrada escaneada.
+
+Uso:
+    python benchmarks/bench_scan_syscalls.py [--dirs N] [--files N] [--depth N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from collections import Counter
+
+# Adicionar diretório raiz do projeto ao path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir.parent))
+
+from modules.directory_scanner import DirectoryNode, DirectoryScanner
+
+
+class _CountingDirEntry:
+    """Proxy de os.DirEntry que contabiliza as chamadas que geram syscalls"""
+
+    def __init__(self, entry, counter: Counter):
+        self._entry = entry
+        self._counter = counter
+        self._stat_done = False
+        self.name = entry.name
+        self.path = entry.path
+
+    def _count_type_check(self):
+        # Com d_type disponível, só links simbólicos exigem stat
+        if not self._stat_done and self._entry.is_symlink():
+            self._counter['stat'] += 1
+            self._stat_done = True
+
+    def is_dir(self, *, follow_symlinks=True):
+        self._count_type_check()
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, *, follow_symlinks=True):
+        self._count_type_check()
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_symlink(self):
+        return self._entry.is_symlink()
+
+    def inode(self):
+        return self._entry.inode()
+
+    def stat(self, *, follow_symlinks=True):
+        if not self._stat_done:
+            self._counter['stat'] += 1
+            self._stat_done = True
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class _CountingScandir:
+    """Iterador de os.scandir que devolve entradas contabilizadas"""
+
+    def __init__(self, iterator, counter: Counter):
+        self._iterator = iterator
+        self._counter = counter
+
+    def __iter__(self):
+        for entry in self._iterator:
+            yield _CountingDirEntry(entry, self._counter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._iterator.close()
+
+    def close(self):
+        self._iterator.close()
+
+
+class SyscallCounter:
+    """Substitui temporariamente funções do módulo os para contar syscalls"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._originals = {}
+
+    def __enter__(self):
+        counts = self.counts
+        originals = self._originals = {
+            'stat': os.stat, 'lstat': os.lstat,
+            'listdir': os.listdir, 'scandir': os.scandir
+        }
+
+        def counted(name):
+            def wrapper(*args, **kwargs):
+                counts[name] += 1
+                return originals[name](*args, **kwargs)
+            return wrapper
+
+        def scandir(*args, **kwargs):
+            counts['scandir'] += 1
+            return _CountingScandir(originals['scandir'](*args, **kwargs), counts)
+
+        os.stat = counted('stat')
+        os.lstat = counted('lstat')
+        os.listdir = counted('listdir')
+        os.scandir = scandir
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, func in self._originals.items():
+            setattr(os, name, func)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+def legacy_scan(node: DirectoryNode) -> int:
+    """Reproduz a travessia anterior baseada em Path.iterdir"""
+    items = list(node.path.iterdir())
+    items.sort(key=lambda x: (not x.is_dir(), x.name.lower()))
+
+    scanned = 0
+    for item_path in items:
+        child_node = DirectoryNode(str(item_path))
+        node.add_child(child_node)
+        scanned += 1
+        if child_node.is_directory:
+            scanned += legacy_scan(child_node)
+    return scanned
+
+
+def create_tree(root: Path, dirs: int, files: int, depth: int):
+    """Cria árvore sintética para o benchmark"""
+    level = [root]
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            for d in range(dirs):
+                directory = parent / f"dir_{d}"
+                directory.mkdir()
+                next_level.append(directory)
+            for f in range(files):
+                (parent / f"file_{f}.txt").write_text("x" * f)
+        level = next_level
+    for parent in level:
+        for f in range(files):
+            (parent / f"file_{f}.txt").write_text("x" * f)
+
+
+def run_benchmark(root: Path):
+    """Executa as duas travessias e imprime o resultado"""
+    results = []
+
+    with SyscallCounter() as counter:
+        start = time.perf_counter()
+        entries = legacy_scan(DirectoryNode(str(root)))
+        elapsed = time.perf_counter() - start
+    results.append(("iterdir (anterior)", entries, counter, elapsed))
+
+    scanner = DirectoryScanner({'.txt'})
+    with SyscallCounter() as counter:
+        start = time.perf_counter()
+        scanner.scan_directory(str(root))
+        elapsed = time.perf_counter() - start
+    results.append(("scandir (atual)", scanner.total_items_scanned, counter, elapsed))
+
+    print(f"{'Travessia':<20} {'Entradas':>9} {'Syscalls':>9} {'Por entrada':>12} {'Tempo (s)':>10}")
+    print("-" * 64)
+    for label, entries, counter, elapsed in results:
+        per_entry = counter.total / entries if entries else 0
+        print(f"{label:<20} {entries:>9} {counter.total:>9} {per_entry:>12.2f} {elapsed:>10.3f}")
+        detail = ", ".join(f"{name}={count}" for name, count in sorted(counter.counts.items()))
+        print(f"{'':<20} {detail}")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de syscalls do DirectoryScanner")
+    parser.add_argument('--dirs', type=int, default=4, help="Subdiretórios por diretório")
+    parser.add_argument('--files', type=int, default=20, help="Arquivos por diretório")
+    parser.add_argument('--depth', type=int, default=4, help="Profundidade da árvore")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        create_tree(root, args.dirs, args.files, args.depth)
+        run_benchmark(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,10 +24,21 @@ from modules.ui_components import (
 )
 from modules.exclusion_manager import ExclusionManager, ExclusionRule
 from modules.file_processor import FileProcessor
-from modules.directory_scanner import DirectoryScanner
+from modules.directory_scanner import (DirectoryScanner, DirectoryNode, TraversalPolicy,
+                                       SCAN_DIRECTORY_FINISHED, SCAN_FINISHED)
+from modules.directory_watcher import is_watch_supported
+from modules.scan_snapshot import ScanSnapshotStore, ScanCheckpointStore
+from modules.scan_store import SQLiteScanStore
+from modules.scan_analytics import default_collectors
+from modules.duplicate_finder import HashCache
+from modules.exclusion_cache import ExclusionDecisionCache
+from modules.content_index import ContentIndex
 from modules.export_manager import ExportManager
 from modules.config_manager import ConfigManager
 
+# Máximo de resultados listados na busca da árvore escaneada
+TREE_SEARCH_MAX_RESULTS = 500
+
 class UltraTextoPro:
     """Classe principal da aplicação UltraTexto Pro - Versão Completa"""
     
@@ -40,6 +51,14 @@ class UltraTextoPro:
         self.config_manager = ConfigManager()
         self.exclusion_manager = ExclusionManager()
         self.export_manager = ExportManager()
+        self.scan_snapshot_store = ScanSnapshotStore.from_config(self.config_manager)
+        self.scan_checkpoint_store = ScanCheckpointStore.from_config(self.config_manager)
+        self.hash_cache = HashCache.from_config(self.config_manager)
+        self.content_index = ContentIndex.from_config(self.config_manager)
+        
+        # Decisões de exclusão gravadas em disco entre sessões
+        if self.config_manager.get("advanced.cache_enabled", True):
+            self.exclusion_manager.decision_cache = ExclusionDecisionCache.from_config(self.config_manager)
         
         # Configurar variáveis
         self.setup_variables()
@@ -49,6 +68,10 @@ class UltraTextoPro:
         # Dados da aplicação
         self.current_directory = None
         self.current_directory_tree = None
+        self.current_scanner = None
+        self.directory_watcher = None
+        self.result_entries = []
+        self.scan_store = None
         self.last_processing_stats = None
         
         # Carregar configurações
@@ -57,6 +80,14 @@ class UltraTextoPro:
         # Aplicar exclusões automáticas baseadas na configuração
         self.exclusion_manager.apply_auto_exclusions(self.config_manager)
         
+        # Contagem de avaliações, acertos e tempo por regra de exclusão
+        if self.config_manager.get("advanced.performance_monitoring", False):
+            self.exclusion_manager.enable_profiling()
+        
+        # Ordem de avaliação das regras ajustada ao custo e à seletividade observados
+        if self.config_manager.get("advanced.adaptive_rule_order", False):
+            self.exclusion_manager.enable_adaptive_ordering()
+        
         # Atualizar resumo das exclusões na interface
         self.root.after(100, self.update_exclusions_summary)
     
@@ -256,6 +287,11 @@ class UltraTextoPro:
         info_label = ttk.Label(info_frame, text="Informações do Diretório:", style='Dark.TLabel')
         info_label.pack(anchor='w', pady=(0, 10))
         
+        # Busca na árvore escaneada (pelo índice de nomes do scanner)
+        self.tree_search_box = SearchBox(info_frame, on_search=self.search_scanned_tree,
+                                         on_clear=self.clear_tree_search, search_as_you_type=True)
+        self.tree_search_box.pack(fill=tk.X, pady=(0, 10))
+        
         # Treeview para preview
         self.preview_tree = FileTreeView(info_frame, height=10)
         self.preview_tree.pack(fill=tk.BOTH, expand=True)
@@ -352,6 +388,14 @@ class UltraTextoPro:
                                     style='Dark.TButton', command=self.add_size_exclusion)
         add_size_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        add_gitignore_button = ttk.Button(filter_buttons_frame, text="🙈 .gitignore", 
+                                         style='Dark.TButton', command=self.add_gitignore_exclusion)
+        add_gitignore_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        add_include_button = ttk.Button(filter_buttons_frame, text="✳ Inclusão", 
+                                       style='Dark.TButton', command=self.add_include_pattern)
+        add_include_button.pack(side=tk.LEFT, padx=(0, 10))
+        
         preview_button = ttk.Button(filter_buttons_frame, text="👁 Preview", 
                                    style='Accent.TButton', command=self.preview_exclusions)
         preview_button.pack(side=tk.RIGHT)
@@ -396,7 +440,7 @@ class UltraTextoPro:
         search_frame.pack(fill=tk.X, pady=(0, 15))
         
         self.search_box = SearchBox(search_frame, on_search=self.search_results, 
-                                   on_clear=self.clear_search)
+                                   on_clear=self.clear_search, search_as_you_type=True)
         self.search_box.pack(fill=tk.X)
         
         # Lista de arquivos gerados
@@ -477,9 +521,17 @@ class UltraTextoPro:
                                       style='Dark.TButton', command=self.show_duplicate_names)
         duplicates_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        duplicate_files_button = ttk.Button(analysis_buttons_frame, text="🧬 Conteúdo Duplicado", 
+                                           style='Dark.TButton', command=self.show_duplicate_files)
+        duplicate_files_button.pack(side=tk.LEFT, padx=(0, 10))
+        
         empty_dirs_button = ttk.Button(analysis_buttons_frame, text="📁 Pastas Vazias", 
                                       style='Dark.TButton', command=self.show_empty_directories)
-        empty_dirs_button.pack(side=tk.LEFT)
+        empty_dirs_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        histograms_button = ttk.Button(analysis_buttons_frame, text="📏 Tamanhos e Idades", 
+                                      style='Dark.TButton', command=self.show_size_and_age_histograms)
+        histograms_button.pack(side=tk.LEFT)
         
         # Área de resultados de análise
         self.analysis_tree = FileTreeView(analysis_frame, height=15)
@@ -765,6 +817,30 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
         """Retorna extensões suportadas"""
         return self.config_manager.get_supported_extensions()
     
+    def create_directory_scanner(self) -> DirectoryScanner:
+        """Cria scanner de diretórios com as configurações atuais"""
+        max_workers = 1
+        if self.config_manager.get("processing.parallel_processing", True):
+            max_workers = self.config_manager.get("processing.max_workers", 4)
+        
+        traversal_policy = TraversalPolicy(
+            follow_symlinks=self.config_manager.get("processing.follow_symlinks", True),
+            one_filesystem=self.config_manager.get("processing.one_filesystem", False),
+            dedupe_hardlinks=self.config_manager.get("processing.dedupe_hardlinks", False)
+        )
+        
+        return DirectoryScanner(set(self.get_supported_extensions()), self.exclusion_manager,
+                                max_workers=max_workers,
+                                snapshot_store=self.scan_snapshot_store,
+                                checkpoint_store=self.scan_checkpoint_store,
+                                traversal_policy=traversal_policy,
+                                collectors=default_collectors(),
+                                hash_cache=self.hash_cache,
+                                # Sincronizado na primeira busca no conteúdo, não a cada escaneamento
+                                content_index=(self.content_index
+                                               if self.config_manager.get("advanced.content_index", True)
+                                               else None))
+    
     def browse_directory(self):
         """Abre dialog para selecionar diretório"""
         initial_dir = self.current_directory or os.path.expanduser("~")
@@ -855,7 +931,7 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
         
         try:
             # Usar scanner para obter informações
-            scanner = DirectoryScanner(set(self.get_supported_extensions()), self.exclusion_manager)
+            scanner = self.create_directory_scanner()
             
             # Escanear apenas o primeiro nível para preview rápido
             root_node = scanner.scan_directory(self.current_directory, include_subdirectories=False)
@@ -898,17 +974,53 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
                                      "Analisando estrutura completa...")
             
             try:
-                scanner = DirectoryScanner(set(self.get_supported_extensions()), self.exclusion_manager)
+                self.stop_directory_watch()
+                self.exclusion_manager.reset_profiling()
+                scanner = self.create_directory_scanner()
                 scanner.set_progress_callback(lambda c, t, m: progress.update_status(m))
                 
-                self.current_directory_tree = scanner.scan_directory(
-                    self.current_directory, 
-                    self.include_subdirectories.get()
-                )
+                if self.config_manager.get("advanced.disk_scan_store", False):
+                    # Árvore gravada em SQLite para diretórios que não cabem na memória
+                    if self.scan_store is None:
+                        self.scan_store = SQLiteScanStore.from_config(self.config_manager)
+                    self.current_directory_tree = scanner.scan_directory_to_store(
+                        self.current_directory,
+                        self.scan_store,
+                        self.include_subdirectories.get()
+                    )
+                elif self.config_manager.get("advanced.scan_slice_seconds", 0) > 0:
+                    # Escaneamento em fatias que sobrevive a cancelamentos e reinícios
+                    self.current_directory_tree = self.scan_in_slices(scanner, progress)
+                elif self.config_manager.get("advanced.compact_scan_tree", False):
+                    # Árvore compacta para diretórios muito grandes
+                    self.current_directory_tree = scanner.scan_directory_compact(
+                        self.current_directory,
+                        self.include_subdirectories.get()
+                    ).root
+                else:
+                    # Escaneamento em fluxo: o diálogo acompanha cada diretório concluído
+                    for event in scanner.iter_scan(self.current_directory,
+                                                   self.include_subdirectories.get()):
+                        if event.kind == SCAN_DIRECTORY_FINISHED:
+                            progress.update_status(f"Escaneado: {event.node.path}")
+                        elif event.kind == SCAN_FINISHED:
+                            self.current_directory_tree = event.node
+                
+                # O scanner guarda as análises coletadas durante o escaneamento
+                self.current_scanner = scanner
+                
+                self.exclusion_manager.save_decision_cache()
+                
+                # Relatório de desempenho das regras de exclusão deste escaneamento
+                if self.exclusion_manager.profiler is not None:
+                    self.exclusion_manager.export_profiling_report(
+                        self.config_manager.get_cache_directory() / "exclusion_rule_profile.json"
+                    )
                 
                 progress.close()
                 self.root.after(0, lambda: self.notifications.show_success("Escaneamento concluído!"))
                 self.root.after(0, self.update_scan_results)
+                self.root.after(0, lambda: self.start_directory_watch(scanner))
                 
             except Exception as e:
                 progress.close()
@@ -917,17 +1029,87 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
         thread = threading.Thread(target=scan_thread, daemon=True)
         thread.start()
     
+    def scan_in_slices(self, scanner: DirectoryScanner, progress) -> DirectoryNode:
+        """
+        Escaneia em fatias de tempo, retomando um escaneamento interrompido
+        do mesmo diretório. O token pendente fica salvo nas configurações.
+        """
+        pending = self.config_manager.get("advanced.pending_scan", {}) or {}
+        token = pending.get("token") if pending.get("directory") == self.current_directory else None
+        slice_seconds = self.config_manager.get("advanced.scan_slice_seconds", 0)
+        
+        while True:
+            root_node, token = scanner.scan_directory_budgeted(
+                self.current_directory,
+                self.include_subdirectories.get(),
+                max_seconds=slice_seconds,
+                resume_token=token
+            )
+            
+            self.config_manager.set("advanced.pending_scan",
+                                    {"directory": self.current_directory, "token": token}
+                                    if token else {})
+            self.config_manager.save_config()
+            
+            if token is None:
+                return root_node
+            
+            progress.update_status(f"Escaneados: {scanner.total_items_scanned} itens")
+            if progress.cancelled:
+                scanner.cancel()
+                self.root.after(0, lambda: self.notifications.show_warning(
+                    "Escaneamento pausado; será retomado no próximo escaneamento"))
+                return root_node
+    
+    def start_directory_watch(self, scanner: DirectoryScanner):
+        """Mantém a árvore escaneada atualizada com as alterações no disco"""
+        if not self.config_manager.get("advanced.watch_mode", False) or not is_watch_supported():
+            return
+        
+        # Árvores compactas e gravadas em SQLite não podem ser alteradas no lugar
+        if not isinstance(self.current_directory_tree, DirectoryNode):
+            return
+        
+        def on_status(status):
+            self.status_bar.set_status(status)
+            self.update_scan_results()
+        
+        scanner.set_status_callback(on_status)
+        scanner.set_progress_callback(lambda c, t, m: self.status_bar.set_info(m))
+        
+        try:
+            self.directory_watcher = scanner.watch(
+                self.current_directory_tree,
+                debounce=self.config_manager.get("advanced.watch_debounce_ms", 500) / 1000,
+                include_subdirectories=self.include_subdirectories.get(),
+                dispatch=lambda apply: self.root.after(0, apply)
+            )
+        except OSError as e:
+            self.notifications.show_warning(f"Observação de diretório indisponível: {str(e)}")
+    
+    def stop_directory_watch(self):
+        """Encerra a observação do diretório escaneado"""
+        if self.directory_watcher:
+            self.directory_watcher.stop()
+            self.directory_watcher = None
+    
     def update_scan_results(self):
         """Atualiza resultados do escaneamento"""
         if not self.current_directory_tree:
             return
         
+        # Com uma busca ativa, a lista mostra os resultados da busca
+        query = self.tree_search_box.get_text().strip()
+        if query:
+            self.search_scanned_tree(query)
+            return
+        
         # Limpar árvore
         for item in self.preview_tree.get_children():
             self.preview_tree.delete(item)
         
         # Gerar texto da árvore
-        scanner = DirectoryScanner(set(self.get_supported_extensions()), self.exclusion_manager)
+        scanner = self.create_directory_scanner()
         tree_text = scanner.generate_tree_text(self.current_directory_tree, max_items=100)
         
         # Adicionar linhas à árvore
@@ -935,6 +1117,42 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
             if line.strip():
                 self.preview_tree.insert('', 'end', text=line, values=('', '', ''))
     
+    def search_scanned_tree(self, query):
+        """Busca na árvore escaneada pelo índice de nomes (sem percorrer a árvore a cada tecla)"""
+        query = query.strip()
+        if not query:
+            self.update_scan_results()
+            return
+        
+        if not self.current_directory_tree:
+            return
+        
+        scanner = self.get_analysis_scanner()
+        matches = scanner.search_nodes(self.current_directory_tree, query)
+        
+        # Limpar árvore
+        for item in self.preview_tree.get_children():
+            self.preview_tree.delete(item)
+        
+        root_path = self.current_directory_tree.path
+        for node in matches[:TREE_SEARCH_MAX_RESULTS]:
+            icon = "📁" if node.is_directory else "📄"
+            size_str = self._format_file_size(node.size) if not node.is_directory else ""
+            item_type = "Pasta" if node.is_directory else "Arquivo"
+            self.preview_tree.insert('', 'end', text=f"{icon} {os.path.relpath(node.path, root_path)}",
+                                   values=(size_str, item_type, ''))
+        
+        if len(matches) > TREE_SEARCH_MAX_RESULTS:
+            hidden = len(matches) - TREE_SEARCH_MAX_RESULTS
+            self.preview_tree.insert('', 'end', text=f"... (mais {hidden} resultados)",
+                                   values=('', '', ''))
+        
+        self.status_bar.set_info(f"{len(matches)} resultado(s) para '{query}'")
+    
+    def clear_tree_search(self):
+        """Limpa a busca na árvore escaneada"""
+        self.update_scan_results()
+    
     def start_processing(self):
         """Inicia o processamento em thread separada"""
         if not self.current_directory:
@@ -985,6 +1203,7 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
             
             # Salvar estatísticas
             self.last_processing_stats = processor.stats
+            self.exclusion_manager.save_decision_cache()
             
             # Adicionar ao histórico
             self.config_manager.add_processing_entry({
@@ -1093,6 +1312,9 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
         self.selected_directory.set("")
         self.current_directory = None
         self.current_directory_tree = None
+        self.current_scanner = None
+        self.stop_directory_watch()
+        self.tree_search_box.clear()
         
         # Limpar árvores
         for item in self.preview_tree.get_children():
@@ -1202,6 +1424,28 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
             self.update_exclusions_tree()
             self.notifications.show_success("Exclusão por tamanho adicionada!")
     
+    def add_gitignore_exclusion(self):
+        """Adiciona exclusão pelos arquivos .gitignore de cada pasta"""
+        file_name = simpledialog.askstring("Exclusão por .gitignore", 
+                                          "Nome dos arquivos de exclusão:",
+                                          initialvalue=".gitignore")
+        if file_name:
+            rule = ExclusionRule('gitignore', file_name, f"Arquivos {file_name}", case_sensitive=True)
+            self.exclusion_manager.add_rule_to_current_profile(rule)
+            self.update_exclusions_tree()
+            self.notifications.show_success(f"Exclusão por '{file_name}' adicionada!")
+    
+    def add_include_pattern(self):
+        """Adiciona padrão de inclusão (só o que casar com algum padrão é escaneado)"""
+        pattern = simpledialog.askstring("Padrão de Inclusão", 
+                                        "Padrão relativo à pasta escaneada (ex: src/**/*.py);\n"
+                                        "sem '/', vale em qualquer nível (ex: *.py):")
+        if pattern:
+            rule = ExclusionRule('include', pattern, f"Inclusão: {pattern}")
+            self.exclusion_manager.add_rule_to_current_profile(rule)
+            self.update_exclusions_tree()
+            self.notifications.show_success(f"Padrão de inclusão '{pattern}' adicionado!")
+    
     def preview_exclusions(self):
         """Mostra preview das exclusões"""
         if not self.current_directory:
@@ -1222,10 +1466,13 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
                 icon = {
                     'file': '📄',
                     'folder': '📁', 
+                    'folder_substring': '📂',
                     'extension': '🏷',
                     'regex': '🔍',
                     'size': '📏',
-                    'date': '📅'
+                    'date': '📅',
+                    'gitignore': '🙈',
+                    'include': '✳'
                 }.get(rule.rule_type, '❓')
                 
                 enabled_text = "✅" if rule.enabled else "❌"
@@ -1254,52 +1501,48 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
     # Métodos de resultados
     def refresh_results(self):
         """Atualiza a lista de resultados"""
-        # Limpar árvore
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
-        
-        # Listar arquivos do diretório de saída
+        # Listar arquivos do diretório de saída (uma vez; a busca filtra esta lista)
         output_dir = self.config_manager.get_output_directory()
+        self.result_entries = []
         
         try:
             for file_path in output_dir.iterdir():
                 if file_path.is_file():
-                    size_str = self._format_file_size(file_path.stat().st_size)
-                    modified = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    modified_str = modified.strftime("%d/%m/%Y %H:%M")
-                    
-                    self.results_tree.insert('', 'end', text=f"📄 {file_path.name}", 
-                                           values=(size_str, file_path.suffix, modified_str))
+                    file_stat = file_path.stat()
+                    modified = datetime.fromtimestamp(file_stat.st_mtime)
+                    self.result_entries.append((
+                        file_path.name.lower(),
+                        f"📄 {file_path.name}",
+                        (self._format_file_size(file_stat.st_size), file_path.suffix,
+                         modified.strftime("%d/%m/%Y %H:%M"))
+                    ))
         
         except Exception as e:
             self.notifications.show_error(f"Erro ao listar resultados: {str(e)}")
+        
+        self.show_result_entries(self.result_entries)
+    
+    def show_result_entries(self, entries):
+        """Mostra entradas da lista de resultados"""
+        # Limpar árvore
+        for item in self.results_tree.get_children():
+            self.results_tree.delete(item)
+        
+        for _, text, values in entries:
+            self.results_tree.insert('', 'end', text=text, values=values)
     
     def search_results(self, query):
-        """Busca nos resultados"""
+        """Busca nos resultados (filtra a lista já carregada, sem reler o disco)"""
         if not query:
             self.refresh_results()
             return
         
-        # Limpar árvore
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+        if not self.result_entries:
+            self.refresh_results()
         
-        # Buscar arquivos que correspondem à consulta
-        output_dir = self.config_manager.get_output_directory()
         query_lower = query.lower()
-        
-        try:
-            for file_path in output_dir.iterdir():
-                if file_path.is_file() and query_lower in file_path.name.lower():
-                    size_str = self._format_file_size(file_path.stat().st_size)
-                    modified = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    modified_str = modified.strftime("%d/%m/%Y %H:%M")
-                    
-                    self.results_tree.insert('', 'end', text=f"📄 {file_path.name}", 
-                                           values=(size_str, file_path.suffix, modified_str))
-        
-        except Exception as e:
-            self.notifications.show_error(f"Erro na busca: {str(e)}")
+        self.show_result_entries([entry for entry in self.result_entries
+                                  if query_lower in entry[0]])
     
     def clear_search(self):
         """Limpa a busca"""
@@ -1411,7 +1654,7 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
             
             # Adicionar dados da árvore se disponível
             if self.current_directory_tree:
-                scanner = DirectoryScanner(set(self.get_supported_extensions()), self.exclusion_manager)
+                scanner = self.create_directory_scanner()
                 export_data["tree_items"] = scanner.generate_tree_items_for_export(self.current_directory_tree)
             
             # Determinar nome do arquivo
@@ -1547,7 +1790,7 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
             self.notifications.show_warning("Execute um escaneamento primeiro!")
             return
         
-        scanner = DirectoryScanner(set(self.get_supported_extensions()), self.exclusion_manager)
+        scanner = self.get_analysis_scanner()
         largest_files = scanner.get_largest_files(self.current_directory_tree, 20)
         
         # Limpar árvore de análise
@@ -1571,6 +1814,7 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
             return
         
         distribution = self.current_directory_tree.get_extension_distribution()
+        extension_bytes = self.get_analysis_scanner().get_extension_bytes(self.current_directory_tree)
         
         # Limpar árvore de análise
         for item in self.analysis_tree.get_children():
@@ -1583,7 +1827,8 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
         for ext, count in sorted_extensions:
             ext_display = ext if ext else "(sem extensão)"
             self.analysis_tree.insert('', 'end', text=f"🏷 {ext_display}", 
-                                     values=(str(count), "arquivos", ""))
+                                     values=(str(count), "arquivos",
+                                             self._format_file_size(extension_bytes.get(ext, 0))))
         
         self.notifications.show_info(f"Mostrando distribuição de {len(sorted_extensions)} extensões")
     
@@ -1593,7 +1838,7 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
             self.notifications.show_warning("Execute um escaneamento primeiro!")
             return
         
-        scanner = DirectoryScanner(set(self.get_supported_extensions()), self.exclusion_manager)
+        scanner = self.get_analysis_scanner()
         duplicates = scanner.get_duplicate_names(self.current_directory_tree)
         
         # Limpar árvore de análise
@@ -1614,13 +1859,56 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
         
         self.notifications.show_info(f"Encontradas {len(duplicates)} duplicatas")
     
+    def show_duplicate_files(self):
+        """Mostra arquivos com conteúdo idêntico (o hash roda em segundo plano)"""
+        if not self.current_directory_tree:
+            self.notifications.show_warning("Execute um escaneamento primeiro!")
+            return
+        
+        scanner = self.get_analysis_scanner()
+        root_node = self.current_directory_tree
+        self.notifications.show_info("Procurando arquivos com conteúdo duplicado...")
+        
+        def duplicates_thread():
+            try:
+                groups = scanner.get_duplicate_files(root_node)
+                self.root.after(0, lambda: self.display_duplicate_files(groups))
+            except Exception as e:
+                self.root.after(0, lambda: self.notifications.show_error(
+                    f"Erro ao procurar duplicatas: {str(e)}"))
+        
+        thread = threading.Thread(target=duplicates_thread, daemon=True)
+        thread.start()
+    
+    def display_duplicate_files(self, groups):
+        """Exibe os grupos de arquivos duplicados na árvore de análise"""
+        # Limpar árvore de análise
+        for item in self.analysis_tree.get_children():
+            self.analysis_tree.delete(item)
+        
+        wasted_total = 0
+        for group in groups:
+            wasted = group[0].size * (len(group) - 1)
+            wasted_total += wasted
+            parent_item = self.analysis_tree.insert('', 'end', text=f"🧬 {group[0].name}", 
+                                                   values=(str(len(group)), "cópias",
+                                                           self._format_file_size(wasted)))
+            
+            for node in group:
+                rel_path = os.path.relpath(node.path, self.current_directory)
+                self.analysis_tree.insert(parent_item, 'end', text=f"📄 {rel_path}", 
+                                        values=("", "", self._format_file_size(node.size)))
+        
+        self.notifications.show_info(f"Encontrados {len(groups)} grupos de duplicatas "
+                                     f"({self._format_file_size(wasted_total)} repetidos)")
+    
     def show_empty_directories(self):
         """Mostra diretórios vazios"""
         if not self.current_directory_tree:
             self.notifications.show_warning("Execute um escaneamento primeiro!")
             return
         
-        scanner = DirectoryScanner(set(self.get_supported_extensions()), self.exclusion_manager)
+        scanner = self.get_analysis_scanner()
         empty_dirs = scanner.get_empty_directories(self.current_directory_tree)
         
         # Limpar árvore de análise
@@ -1635,6 +1923,40 @@ Diretório de saída: {self.config_manager.get_output_directory()}"""
         
         self.notifications.show_info(f"Encontrados {len(empty_dirs)} diretórios vazios")
     
+    def show_size_and_age_histograms(self):
+        """Mostra histogramas de tamanho e idade dos arquivos"""
+        if not self.current_directory_tree:
+            self.notifications.show_warning("Execute um escaneamento primeiro!")
+            return
+        
+        scanner = self.get_analysis_scanner()
+        size_histogram = scanner.get_size_histogram(self.current_directory_tree)
+        age_histogram = scanner.get_age_histogram(self.current_directory_tree)
+        
+        # Limpar árvore de análise
+        for item in self.analysis_tree.get_children():
+            self.analysis_tree.delete(item)
+        
+        sizes_item = self.analysis_tree.insert('', 'end', text="📏 Tamanhos", open=True,
+                                               values=("", "", ""))
+        for lower, upper, count in size_histogram:
+            label = (f"{self._format_file_size(lower)} – {self._format_file_size(upper)}"
+                     if lower else "vazios")
+            self.analysis_tree.insert(sizes_item, 'end', text=label,
+                                      values=(str(count), "arquivos", ""))
+        
+        ages_item = self.analysis_tree.insert('', 'end', text="🕒 Idade", open=True,
+                                              values=("", "", ""))
+        for label, count in age_histogram:
+            self.analysis_tree.insert(ages_item, 'end', text=label,
+                                      values=(str(count), "arquivos", ""))
+        
+        self.notifications.show_info("Mostrando histogramas de tamanho e idade")
+    
+    def get_analysis_scanner(self) -> DirectoryScanner:
+        """Scanner do último escaneamento (com as análises já coletadas)"""
+        return self.current_scanner or self.create_directory_scanner()
+    
     # Métodos de configurações
     def update_extensions(self):
         """Atualiza lista de extensões suportadas"""
@@ -1797,6 +2119,15 @@ Recursos:
         # Salvar configurações
         self.save_settings()
         
+        # Gravar alterações de perfis de exclusão ainda pendentes
+        self.exclusion_manager.flush_profiles()
+        if self.exclusion_manager.has_pending_save and not messagebox.askyesno(
+                "Confirmar", "Não foi possível salvar os perfis de exclusão. Fechar mesmo assim?"):
+            return
+        
+        # Encerrar observação de diretório
+        self.stop_directory_watch()
+        
         # Fechar aplicação
         self.root.destroy()
     
@@ -1817,7 +2148,7 @@ Recursos:
         if not dest_dir:
             return
         include_subdirs = self.include_subdirectories.get()
-        scanner = DirectoryScanner(self.get_supported_extensions(), self.exclusion_manager)
+        scanner = self.create_directory_scanner()
         try:
             self.status_bar.set_status("Clonando diretório...")
             total = scanner.clone_directory_with_exclusions(source_dir, dest_dir, include_subdirectories=include_subdirs)
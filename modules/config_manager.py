@@ -37,7 +37,10 @@ class ConfigManager:
             "encoding_fallbacks": ["utf-8", "latin-1", "cp1252", "iso-8859-1"],
             "chunk_size": 1024,
             "parallel_processing": True,
-            "max_workers": 4
+            "max_workers": 4,
+            "follow_symlinks": True,
+            "one_filesystem": False,
+            "dedupe_hardlinks": False
         },
         "output": {
             "auto_open_results": True,
@@ -71,7 +74,15 @@ class ConfigManager:
             "cache_size_mb": 100,
             "auto_cleanup": True,
             "cleanup_days": 30,
-            "performance_monitoring": False
+            "performance_monitoring": False,
+            "adaptive_rule_order": False,
+            "compact_scan_tree": False,
+            "disk_scan_store": False,
+            "content_index": True,
+            "scan_slice_seconds": 0,
+            "pending_scan": {},
+            "watch_mode": False,
+            "watch_debounce_ms": 500
         },
         "shortcuts": {
             "process_files": "Ctrl+P",
@@ -419,6 +430,12 @@ class ConfigManager:
         output_dir.mkdir(exist_ok=True)
         return output_dir
     
+    def get_cache_directory(self) -> Path:
+        """Retorna diretório de cache"""
+        cache_dir = self.config_dir / "cache"
+        cache_dir.mkdir(exist_ok=True)
+        return cache_dir
+    
     def get_next_filename(self, base_template: str, extension: str = ".txt") -> str:
         """Gera próximo nome de arquivo disponível"""
         output_dir = self.get_output_directory()
@@ -0,0 +1,259 @@
+"""
+Módulo de índice de conteúdo por trigramas para UltraTexto Pro
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime REAL,
+    readable INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS trigrams (
+    trigram TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_trigrams_file ON trigrams(file_id);
+"""
+
+def extract_trigrams(text: str) -> Set[str]:
+    """Trigramas distintos de um texto já em minúsculas"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    Trechos literais que toda correspondência da expressão regular contém.
+    A análise é conservadora: só considera o nível externo da expressão,
+    ignora o conteúdo de grupos e classes e desiste diante de alternativas.
+    Uma lista vazia significa que a busca não pode ser restringida.
+    """
+    literals = []
+    current = []
+    depth = 0
+    i = 0
+    
+    def close_run():
+        if current:
+            literals.append("".join(current))
+            current.clear()
+    
+    while i < len(pattern):
+        char = pattern[i]
+        
+        if char == '\\':
+            escaped = pattern[i + 1:i + 2]
+            if escaped.isalnum() or not escaped:
+                close_run()
+            elif depth == 0:
+                current.append(escaped)
+            i += 2
+            continue
+        
+        if char == '|':
+            return []
+        
+        if char == '[':
+            close_run()
+            i += 1
+            if pattern[i:i + 1] == '^':
+                i += 1
+            if pattern[i:i + 1] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+        elif char == '(':
+            close_run()
+            depth += 1
+        elif char == ')':
+            close_run()
+            depth = max(0, depth - 1)
+        elif char in '*?{':
+            # O caractere anterior passa a ser opcional
+            if current:
+                current.pop()
+            close_run()
+            if char == '{':
+                end = pattern.find('}', i)
+                i = end if end >= 0 else i
+        elif char in '+.^$':
+            close_run()
+        elif depth == 0:
+            current.append(char)
+        i += 1
+    
+    close_run()
+    return [literal.lower() for literal in literals if literal]
+
+class ContentIndex:
+    """
+    Índice invertido de trigramas do conteúdo de arquivos de texto, gravado
+    em SQLite. A busca consulta o índice para reduzir os candidatos e só lê
+    os arquivos que contêm todos os trigramas da consulta para confirmar.
+    """
+    
+    BATCH_SIZE = 256
+    MAX_QUERY_TRIGRAMS = 32
+    
+    def __init__(self, db_path: str, max_workers: int = 4):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max(1, max_workers)
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+    
+    @classmethod
+    def from_config(cls, config_manager) -> 'ContentIndex':
+        """Cria o índice no diretório de cache"""
+        return cls(config_manager.get_cache_directory() / "content_index.sqlite3",
+                   max_workers=config_manager.get("processing.max_workers", 4))
+    
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._connection.close()
+    
+    # Atualização
+    
+    def update(self, root_path, files: Iterable[Tuple[str, int, Optional[float]]],
+               cancelled=None) -> Tuple[int, int]:
+        """
+        Sincroniza o índice da subárvore root_path com a lista de arquivos
+        (caminho, tamanho, mtime). Só arquivos novos ou com tamanho/mtime
+        diferentes são lidos; os que sumiram da lista são removidos.
+        Retorna (arquivos indexados, arquivos removidos).
+        """
+        cancelled = cancelled or (lambda: False)
+        clause, params = self._subtree_clause(str(root_path))
+        known = {path: (file_id, size, mtime) for file_id, path, size, mtime in self._fetch(
+            f"SELECT id, path, size, mtime FROM files WHERE {clause}", params
+        )}
+        
+        changed = []
+        for path, size, mtime in files:
+            path = str(path)
+            entry = known.pop(path, None)
+            if entry is None or entry[1] != size or entry[2] != mtime:
+                changed.append((path, size, mtime))
+        
+        with self._lock:
+            self._delete([file_id for file_id, _, _ in known.values()])
+            self._connection.commit()
+        
+        indexed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="ContentIndex") as pool:
+            for start in range(0, len(changed), self.BATCH_SIZE):
+                if cancelled():
+                    break
+                batch = changed[start:start + self.BATCH_SIZE]
+                self._store(batch, pool.map(self._read_trigrams, [path for path, _, _ in batch]))
+                indexed += len(batch)
+        
+        return indexed, len(known)
+    
+    def _read_trigrams(self, path: str) -> Optional[Set[str]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return extract_trigrams(f.read().lower())
+        except (OSError, UnicodeDecodeError):
+            return None
+    
+    def _store(self, batch: List[Tuple[str, int, Optional[float]]], trigram_sets):
+        with self._lock:
+            for (path, size, mtime), trigrams in zip(batch, trigram_sets):
+                row = self._connection.execute(
+                    "SELECT id FROM files WHERE path = ?", (path,)
+                ).fetchone()
+                if row:
+                    self._delete([row[0]])
+                file_id = self._connection.execute(
+                    "INSERT INTO files (path, size, mtime, readable) VALUES (?, ?, ?, ?)",
+                    (path, size, mtime, int(trigrams is not None))
+                ).lastrowid
+                if trigrams:
+                    self._connection.executemany(
+                        "INSERT INTO trigrams (trigram, file_id) VALUES (?, ?)",
+                        [(trigram, file_id) for trigram in trigrams]
+                    )
+            self._connection.commit()
+    
+    def _delete(self, file_ids: List[int]):
+        rows = [(file_id,) for file_id in file_ids]
+        self._connection.executemany("DELETE FROM trigrams WHERE file_id = ?", rows)
+        self._connection.executemany("DELETE FROM files WHERE id = ?", rows)
+    
+    # Consulta
+    
+    def _fetch(self, query: str, params=()) -> List[Tuple]:
+        with self._lock:
+            return self._connection.execute(query, params).fetchall()
+    
+    @staticmethod
+    def _subtree_clause(root_path: str) -> Tuple[str, Tuple]:
+        """Restringe a consulta aos arquivos sob root_path (intervalo de caminhos)"""
+        root_path = root_path.rstrip(os.sep) or os.sep
+        prefix = root_path if root_path.endswith(os.sep) else root_path + os.sep
+        return ("(path = ? OR (path > ? AND path < ?))",
+                (root_path, prefix, prefix[:-1] + chr(ord(os.sep) + 1)))
+    
+    def candidates(self, root_path, query: str, regex: bool = False) -> List[str]:
+        """
+        Arquivos sob root_path que contêm todos os trigramas exigidos pela
+        consulta. Consultas curtas demais para restringir devolvem todos os
+        arquivos legíveis da subárvore.
+        """
+        literals = required_literals(query) if regex else [query.lower()]
+        trigrams = set()
+        for literal in literals:
+            trigrams |= extract_trigrams(literal)
+        
+        clause, params = self._subtree_clause(str(root_path))
+        if not trigrams:
+            rows = self._fetch(f"SELECT path FROM files WHERE readable = 1 AND {clause} "
+                               f"ORDER BY path", params)
+            return [path for path, in rows]
+        
+        # Um subconjunto dos trigramas já restringe bem e respeita o limite do SQLite
+        trigrams = sorted(trigrams)[:self.MAX_QUERY_TRIGRAMS]
+        intersection = " INTERSECT ".join(
+            ["SELECT file_id FROM trigrams WHERE trigram = ?"] * len(trigrams)
+        )
+        rows = self._fetch(
+            f"SELECT path FROM files WHERE id IN ({intersection}) AND {clause} ORDER BY path",
+            tuple(trigrams) + params
+        )
+        return [path for path, in rows]
+    
+    def search(self, root_path, query: str, regex: bool = False) -> List[str]:
+        """Arquivos sob root_path cujo conteúdo corresponde à consulta"""
+        if regex:
+            pattern = re.compile(query, re.IGNORECASE)
+            matches = lambda text: pattern.search(text) is not None
+        else:
+            query = query.lower()
+            matches = lambda text: query in text.lower()
+        
+        def verify(path: str) -> bool:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return matches(f.read())
+            except (OSError, UnicodeDecodeError):
+                return False
+        
+        candidates = self.candidates(root_path, query, regex)
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="ContentSearch") as pool:
+            return [path for path, found in zip(candidates, pool.map(verify, candidates)) if found]
@@ -3,24 +3,45 @@ Módulo de escaneamento avançado de diretórios para UltraTexto Pro
 """
 
 import os
+import re
+import math
+import stat
 import time
+from array import array
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Generator, Tuple
+from typing import Dict, List, Set, Optional, Generator, Tuple, NamedTuple
 from datetime import datetime
 import threading
-from collections import defaultdict
+import queue
+from collections import defaultdict, deque
+
+from .tree_walk import walk_depth_first, walk_tree, attach_children_dicts
+from .scan_store import SQLiteScanStore, StoredNodeView
+from .duplicate_finder import DuplicateFinder, HashCache
+from .content_index import ContentIndex
+from .name_index import NameIndex
+from .exclusion_matcher import PathMetadata
+from .scan_analytics import (ScanCollector, TopFilesCollector, TopDirectoriesCollector,
+                             SizeHistogramCollector, AgeHistogramCollector,
+                             ExtensionBytesCollector)
+
+# Busca no conteúdo: extensões sempre incluídas e tamanho máximo do arquivo
+CONTENT_SEARCH_EXTENSIONS = {'.txt', '.md', '.py', '.js', '.html', '.css', '.json'}
+CONTENT_SEARCH_MAX_SIZE = 1024 * 1024
 
 class DirectoryNode:
     """Representa um nó na árvore de diretórios"""
     
-    def __init__(self, path: str, name: str = None):
+    def __init__(self, path: str, name: str = None, is_directory: Optional[bool] = None,
+                 stat_result: Optional[os.stat_result] = None):
         self.path = Path(path)
         self.name = name or self.path.name
-        self.is_directory = self.path.is_dir()
+        self.is_directory = self.path.is_dir() if is_directory is None else is_directory
         self.size = 0
         self.file_count = 0
         self.directory_count = 0
-        self.modified_time = None
+        self._modified_time = None
+        self._info_loaded = False
         self.children: List['DirectoryNode'] = []
         self.parent: Optional['DirectoryNode'] = None
         self.is_excluded = False
@@ -28,20 +49,84 @@ class DirectoryNode:
         self.extension = self.path.suffix.lower() if not self.is_directory else ""
         self.is_supported = False
         self.depth = 0
+        self.listing_mtime_ns: Optional[int] = None
+        self.is_symlink = False
+        # (st_dev, st_ino) de diretórios listados e de arquivos com mais de um hardlink
+        self.link_key: Optional[Tuple[int, int]] = None
+        
+        # Agregados da subárvore (calculados em compute_aggregates)
+        self._aggregates_valid = False
+        self._total_size = 0
+        self._total_file_count = 0
+        self._total_directory_count = 0
+        self._extension_counts: Optional[Dict[str, int]] = None
         
         # Carregar informações do arquivo/diretório
-        self._load_info()
+        if stat_result is not None:
+            self._apply_stat(stat_result)
+        elif is_directory is None:
+            self._load_info()
+    
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry) -> 'DirectoryNode':
+        """
+        Cria nó a partir de um os.DirEntry.
+        O tipo vem do d_type em cache; stat só é feito para arquivos (tamanho).
+        A data de modificação de diretórios é carregada sob demanda.
+        """
+        try:
+            is_directory = entry.is_dir()
+        except OSError:
+            is_directory = False
+        
+        node = cls(entry.path, entry.name, is_directory=is_directory)
+        node.is_symlink = entry.is_symlink()
+        if not is_directory:
+            try:
+                node._apply_stat(entry.stat())
+            except OSError:
+                node._info_loaded = True
+        return node
+    
+    @property
+    def modified_time(self) -> Optional[datetime]:
+        """Data de modificação (carregada sob demanda)"""
+        if not self._info_loaded:
+            self._load_info()
+        return self._modified_time
+    
+    @modified_time.setter
+    def modified_time(self, value: Optional[datetime]):
+        self._modified_time = value
+        self._info_loaded = True
     
     def _load_info(self):
         """Carrega informações do arquivo/diretório"""
+        self._info_loaded = True
         try:
-            stat = self.path.stat()
-            if not self.is_directory:
-                self.size = stat.st_size
-            self.modified_time = datetime.fromtimestamp(stat.st_mtime)
+            self._apply_stat(self.path.stat())
         except (OSError, ValueError):
             pass
     
+    def _apply_stat(self, stat_result: os.stat_result):
+        """Aplica o resultado de um stat já obtido"""
+        self._info_loaded = True
+        if not self.is_directory:
+            self.size = stat_result.st_size
+            if stat_result.st_nlink > 1:
+                self.link_key = (stat_result.st_dev, stat_result.st_ino)
+        try:
+            self._modified_time = datetime.fromtimestamp(stat_result.st_mtime)
+        except (OSError, ValueError, OverflowError):
+            self._modified_time = None
+    
+    def get_exclusion_metadata(self) -> Optional[PathMetadata]:
+        """Tamanho e data já obtidos no escaneamento, para as regras de exclusão"""
+        if not self._info_loaded or self._modified_time is None:
+            return None
+        return PathMetadata(None if self.is_directory else self.size,
+                            self._modified_time.timestamp())
+    
     def add_child(self, child: 'DirectoryNode'):
         """Adiciona um filho ao nó"""
         child.parent = self
@@ -54,64 +139,480 @@ class DirectoryNode:
         else:
             self.file_count += 1
             self.size += child.size
+        
+        # Manter agregados já calculados
+        if self._aggregates_valid:
+            child.compute_aggregates()
+            self._propagate_aggregates(*child._aggregate_contribution())
+    
+    def remove_child(self, child: 'DirectoryNode'):
+        """Remove um filho do nó"""
+        self.children.remove(child)
+        child.parent = None
+        
+        # Atualizar contadores
+        if child.is_directory:
+            self.directory_count -= 1
+        else:
+            self.file_count -= 1
+            self.size -= child.size
+        
+        # Manter agregados já calculados
+        if self._aggregates_valid:
+            child.compute_aggregates()
+            size, files, directories, extensions = child._aggregate_contribution()
+            self._propagate_aggregates(
+                -size, -files, -directories,
+                {ext: -count for ext, count in extensions.items()}
+            )
+    
+    def update_size(self, size: int):
+        """Atualiza o tamanho de um arquivo mantendo os agregados"""
+        if self.is_directory:
+            return
+        
+        delta = size - self.size
+        self.size = size
+        if self._aggregates_valid:
+            self._total_size = size
+        
+        if self.parent is not None and delta:
+            self.parent.size += delta
+            if self.parent._aggregates_valid:
+                self.parent._propagate_aggregates(delta, 0, 0, {})
+    
+    def invalidate_aggregates(self):
+        """Marca os agregados deste nó e dos ancestrais para recálculo"""
+        node = self
+        while node is not None and node._aggregates_valid:
+            node._aggregates_valid = False
+            node = node.parent
+    
+    def compute_aggregates(self):
+        """
+        Calcula os agregados da subárvore em uma única passada pós-ordem.
+        Subárvores com agregados válidos são reaproveitadas.
+        """
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node._aggregates_valid:
+                continue
+            
+            if not expanded and node.children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+                continue
+            
+            if node.is_directory:
+                total_size = 0
+                total_files = node.file_count
+                total_directories = node.directory_count
+                extensions = defaultdict(int)
+                for child in node.children:
+                    total_size += child._total_size
+                    total_files += child._total_file_count
+                    total_directories += child._total_directory_count
+                    if child.is_directory:
+                        for ext, count in child._extension_counts.items():
+                            extensions[ext] += count
+                    elif child.extension:
+                        extensions[child.extension] += 1
+                
+                node._total_size = total_size
+                node._total_file_count = total_files
+                node._total_directory_count = total_directories
+                node._extension_counts = dict(extensions)
+            else:
+                node._total_size = node.size
+                node._total_file_count = node.file_count
+                node._total_directory_count = node.directory_count
+            
+            node._aggregates_valid = True
+    
+    def _aggregate_contribution(self) -> Tuple[int, int, int, Dict[str, int]]:
+        """Retorna quanto este nó soma aos agregados do pai"""
+        if self.is_directory:
+            return (self._total_size, self._total_file_count,
+                    self._total_directory_count + 1, self._extension_counts)
+        
+        extensions = {self.extension: 1} if self.extension else {}
+        return self._total_size, self._total_file_count + 1, self._total_directory_count, extensions
+    
+    def _propagate_aggregates(self, size: int, files: int, directories: int,
+                              extensions: Dict[str, int]):
+        """Aplica uma variação aos agregados deste nó e dos ancestrais válidos"""
+        node = self
+        while node is not None and node._aggregates_valid:
+            node._total_size += size
+            node._total_file_count += files
+            node._total_directory_count += directories
+            if extensions and node._extension_counts is not None:
+                for ext, count in extensions.items():
+                    new_count = node._extension_counts.get(ext, 0) + count
+                    if new_count > 0:
+                        node._extension_counts[ext] = new_count
+                    else:
+                        node._extension_counts.pop(ext, None)
+            node = node.parent
     
     def get_total_size(self) -> int:
         """Retorna o tamanho total incluindo filhos"""
-        total = self.size
-        for child in self.children:
-            total += child.get_total_size()
-        return total
+        if not self._aggregates_valid:
+            self.compute_aggregates()
+        return self._total_size
     
     def get_total_file_count(self) -> int:
         """Retorna o número total de arquivos incluindo filhos"""
-        total = self.file_count
-        for child in self.children:
-            total += child.get_total_file_count()
-        return total
+        if not self._aggregates_valid:
+            self.compute_aggregates()
+        return self._total_file_count
     
     def get_total_directory_count(self) -> int:
         """Retorna o número total de diretórios incluindo filhos"""
-        total = self.directory_count
-        for child in self.children:
-            total += child.get_total_directory_count()
-        return total
+        if not self._aggregates_valid:
+            self.compute_aggregates()
+        return self._total_directory_count
     
     def get_extension_distribution(self) -> Dict[str, int]:
         """Retorna distribuição de extensões"""
-        distribution = defaultdict(int)
-        
-        if not self.is_directory and self.extension:
-            distribution[self.extension] += 1
+        if not self.is_directory:
+            return {self.extension: 1} if self.extension else {}
         
-        for child in self.children:
-            child_dist = child.get_extension_distribution()
-            for ext, count in child_dist.items():
-                distribution[ext] += count
-        
-        return dict(distribution)
+        if not self._aggregates_valid:
+            self.compute_aggregates()
+        return dict(self._extension_counts)
     
     def find_nodes(self, predicate) -> List['DirectoryNode']:
         """Encontra nós que satisfazem o predicado"""
-        results = []
+        return [node for node in walk_depth_first([self], lambda node: node.children)
+                if predicate(node)]
+    
+    def to_dict(self, include_children: bool = True) -> Dict:
+        """Converte o nó para dicionário"""
+        data = self._node_dict()
+        if include_children:
+            attach_children_dicts(self, data)
+        return data
+    
+    def _node_dict(self) -> Dict:
+        """Campos do nó, sem os filhos"""
+        return {
+            'path': str(self.path),
+            'name': self.name,
+            'is_directory': self.is_directory,
+            'size': self.size,
+            'file_count': self.file_count,
+            'directory_count': self.directory_count,
+            'modified_time': self.modified_time.isoformat() if self.modified_time else None,
+            'is_excluded': self.is_excluded,
+            'exclusion_reason': self.exclusion_reason,
+            'extension': self.extension,
+            'is_supported': self.is_supported,
+            'depth': self.depth,
+            'total_size': self.get_total_size(),
+            'total_file_count': self.get_total_file_count(),
+            'total_directory_count': self.get_total_directory_count()
+        }
+
+def _path_suffix(name: str) -> str:
+    """Extensão do nome com a mesma regra de Path.suffix"""
+    index = name.rfind('.')
+    if 0 < index < len(name) - 1:
+        return name[index:]
+    return ""
+
+class CompactTree:
+    """
+    Árvore de escaneamento compacta em layout struct-of-arrays.
+    
+    Cada entrada ocupa uma posição em arrays paralelos (pai, nome no pool de
+    strings, tamanho, mtime, flags e extensão). As entradas são gravadas em
+    largura, de modo que os filhos de um diretório são contíguos.
+    Use root (CompactNodeView) para a API compatível com DirectoryNode.
+    """
+    
+    FLAG_DIRECTORY = 1
+    FLAG_EXCLUDED = 2
+    FLAG_SUPPORTED = 4
+    
+    def __init__(self, root_path: str):
+        self.root_path = str(root_path)
+        self.parents = array('i')
+        self.name_offsets = array('I')
+        self.name_lengths = array('H')
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.flags = array('B')
+        self.extension_ids = array('I')
+        self.reason_ids = array('I')
+        self.depths = array('H')
+        self.first_child = array('i')
+        self.child_counts = array('I')
+        self.name_pool = bytearray()
+        
+        # Tabelas de strings internadas
+        self.extensions: List[str] = [""]
+        self.reasons: List[str] = [""]
+        self._extension_index: Dict[str, int] = {"": 0}
+        self._reason_index: Dict[str, int] = {"": 0}
         
-        if predicate(self):
-            results.append(self)
+        # Agregados calculados em compute_aggregates
+        self.total_sizes = array('q')
+        self.total_file_counts = array('I')
+        self.total_directory_counts = array('I')
+    
+    def __len__(self) -> int:
+        return len(self.parents)
+    
+    def add_entry(self, parent: int, name: str, is_directory: bool, size: int = 0,
+                  mtime: float = math.nan, extension: str = "", excluded_reason: str = "",
+                  is_excluded: bool = False, is_supported: bool = False) -> int:
+        """Adiciona uma entrada e retorna seu índice"""
+        index = len(self.parents)
+        encoded = os.fsencode(name)
+        
+        self.parents.append(parent)
+        self.name_offsets.append(len(self.name_pool))
+        self.name_lengths.append(len(encoded))
+        self.name_pool += encoded
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.flags.append(
+            (self.FLAG_DIRECTORY if is_directory else 0) |
+            (self.FLAG_EXCLUDED if is_excluded else 0) |
+            (self.FLAG_SUPPORTED if is_supported else 0)
+        )
+        self.extension_ids.append(self._intern(extension, self.extensions, self._extension_index))
+        self.reason_ids.append(self._intern(excluded_reason, self.reasons, self._reason_index))
+        self.depths.append(self.depths[parent] + 1 if parent >= 0 else 0)
+        self.first_child.append(-1)
+        self.child_counts.append(0)
         
-        for child in self.children:
-            results.extend(child.find_nodes(predicate))
+        # Tamanho de diretório = soma dos arquivos diretos (como DirectoryNode)
+        if parent >= 0 and not is_directory:
+            self.sizes[parent] += size
         
+        return index
+    
+    def _intern(self, value: str, table: List[str], index: Dict[str, int]) -> int:
+        """Interna uma string em uma tabela e retorna seu id"""
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = len(table)
+            table.append(value)
+            index[value] = value_id
+        return value_id
+    
+    def get_name(self, index: int) -> str:
+        """Retorna o nome da entrada"""
+        offset = self.name_offsets[index]
+        return os.fsdecode(bytes(self.name_pool[offset:offset + self.name_lengths[index]]))
+    
+    def get_path(self, index: int) -> Path:
+        """Reconstrói o caminho completo da entrada"""
+        names = []
+        while index > 0:
+            names.append(self.get_name(index))
+            index = self.parents[index]
+        names.reverse()
+        return Path(self.root_path, *names)
+    
+    def children_range(self, index: int) -> range:
+        """Retorna o intervalo de índices dos filhos"""
+        first = self.first_child[index]
+        if first < 0:
+            return range(0)
+        return range(first, first + self.child_counts[index])
+    
+    def iter_subtree(self, index: int) -> Generator[int, None, None]:
+        """Percorre a subárvore em pré-ordem"""
+        stack = [index]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(reversed(self.children_range(current)))
+    
+    def compute_aggregates(self):
+        """Calcula totais da subárvore em uma única passada (ordem inversa)"""
+        count = len(self.parents)
+        total_sizes = array('q', bytes(8 * count))
+        total_files = array('I', bytes(4 * count))
+        total_dirs = array('I', bytes(4 * count))
+        
+        for index in range(count - 1, -1, -1):
+            if not self.flags[index] & self.FLAG_DIRECTORY:
+                total_sizes[index] = self.sizes[index]
+            parent = self.parents[index]
+            if parent >= 0:
+                total_sizes[parent] += total_sizes[index]
+                total_files[parent] += total_files[index]
+                total_dirs[parent] += total_dirs[index]
+                if self.flags[index] & self.FLAG_DIRECTORY:
+                    total_dirs[parent] += 1
+                else:
+                    total_files[parent] += 1
+        
+        self.total_sizes = total_sizes
+        self.total_file_counts = total_files
+        self.total_directory_counts = total_dirs
+    
+    def get_memory_usage(self) -> int:
+        """Retorna bytes usados pelos arrays e pelo pool de nomes"""
+        arrays = (self.parents, self.name_offsets, self.name_lengths, self.sizes,
+                  self.mtimes, self.flags, self.extension_ids, self.reason_ids,
+                  self.depths, self.first_child, self.child_counts,
+                  self.total_sizes, self.total_file_counts, self.total_directory_counts)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.name_pool)
+    
+    def node(self, index: int) -> 'CompactNodeView':
+        """Retorna a visão de uma entrada"""
+        return CompactNodeView(self, index)
+    
+    @property
+    def root(self) -> 'CompactNodeView':
+        """Visão do nó raiz"""
+        return CompactNodeView(self, 0)
+
+class CompactNodeView:
+    """Visão leve de uma entrada da CompactTree com a API de DirectoryNode"""
+    
+    __slots__ = ('tree', 'index')
+    
+    def __init__(self, tree: CompactTree, index: int):
+        self.tree = tree
+        self.index = index
+    
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, CompactNodeView) and
+                other.tree is self.tree and other.index == self.index)
+    
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+    
+    def __repr__(self) -> str:
+        return f"CompactNodeView({self.path!s})"
+    
+    @property
+    def name(self) -> str:
+        if self.index == 0:
+            return Path(self.tree.root_path).name
+        return self.tree.get_name(self.index)
+    
+    @property
+    def path(self) -> Path:
+        return self.tree.get_path(self.index)
+    
+    @property
+    def is_directory(self) -> bool:
+        return bool(self.tree.flags[self.index] & CompactTree.FLAG_DIRECTORY)
+    
+    @property
+    def is_excluded(self) -> bool:
+        return bool(self.tree.flags[self.index] & CompactTree.FLAG_EXCLUDED)
+    
+    @property
+    def is_supported(self) -> bool:
+        return bool(self.tree.flags[self.index] & CompactTree.FLAG_SUPPORTED)
+    
+    @property
+    def exclusion_reason(self) -> str:
+        return self.tree.reasons[self.tree.reason_ids[self.index]]
+    
+    @property
+    def extension(self) -> str:
+        return self.tree.extensions[self.tree.extension_ids[self.index]]
+    
+    @property
+    def size(self) -> int:
+        return self.tree.sizes[self.index]
+    
+    @property
+    def depth(self) -> int:
+        return self.tree.depths[self.index]
+    
+    @property
+    def modified_time(self) -> Optional[datetime]:
+        mtime = self.tree.mtimes[self.index]
+        if math.isnan(mtime):
+            # Diretórios têm a data carregada sob demanda
+            try:
+                mtime = self.path.stat().st_mtime
+            except (OSError, ValueError):
+                return None
+            self.tree.mtimes[self.index] = mtime
+        try:
+            return datetime.fromtimestamp(mtime)
+        except (OSError, ValueError, OverflowError):
+            return None
+    
+    @property
+    def parent(self) -> Optional['CompactNodeView']:
+        parent = self.tree.parents[self.index]
+        return CompactNodeView(self.tree, parent) if parent >= 0 else None
+    
+    @property
+    def children(self) -> List['CompactNodeView']:
+        return [CompactNodeView(self.tree, i) for i in self.tree.children_range(self.index)]
+    
+    @property
+    def file_count(self) -> int:
+        flags = self.tree.flags
+        return sum(1 for i in self.tree.children_range(self.index)
+                   if not flags[i] & CompactTree.FLAG_DIRECTORY)
+    
+    @property
+    def directory_count(self) -> int:
+        return len(self.tree.children_range(self.index)) - self.file_count
+    
+    def get_total_size(self) -> int:
+        """Retorna o tamanho total incluindo filhos"""
+        return self.tree.total_sizes[self.index]
+    
+    def get_total_file_count(self) -> int:
+        """Retorna o número total de arquivos incluindo filhos"""
+        return self.tree.total_file_counts[self.index]
+    
+    def get_total_directory_count(self) -> int:
+        """Retorna o número total de diretórios incluindo filhos"""
+        return self.tree.total_directory_counts[self.index]
+    
+    def get_extension_distribution(self) -> Dict[str, int]:
+        """Retorna distribuição de extensões"""
+        tree = self.tree
+        counts = defaultdict(int)
+        for index in tree.iter_subtree(self.index):
+            if not tree.flags[index] & CompactTree.FLAG_DIRECTORY:
+                counts[tree.extension_ids[index]] += 1
+        return {tree.extensions[ext_id]: count for ext_id, count in counts.items() if ext_id}
+    
+    def find_nodes(self, predicate) -> List['CompactNodeView']:
+        """Encontra nós que satisfazem o predicado"""
+        results = []
+        for index in self.tree.iter_subtree(self.index):
+            node = CompactNodeView(self.tree, index)
+            if predicate(node):
+                results.append(node)
         return results
     
     def to_dict(self, include_children: bool = True) -> Dict:
         """Converte o nó para dicionário"""
-        data = {
+        data = self._node_dict()
+        if include_children:
+            attach_children_dicts(self, data)
+        return data
+    
+    def _node_dict(self) -> Dict:
+        """Campos do nó, sem os filhos"""
+        modified_time = self.modified_time
+        return {
             'path': str(self.path),
             'name': self.name,
             'is_directory': self.is_directory,
             'size': self.size,
             'file_count': self.file_count,
             'directory_count': self.directory_count,
-            'modified_time': self.modified_time.isoformat() if self.modified_time else None,
+            'modified_time': modified_time.isoformat() if modified_time else None,
             'is_excluded': self.is_excluded,
             'exclusion_reason': self.exclusion_reason,
             'extension': self.extension,
@@ -121,18 +622,302 @@ class DirectoryNode:
             'total_file_count': self.get_total_file_count(),
             'total_directory_count': self.get_total_directory_count()
         }
+
+# Tipos de evento do escaneamento em fluxo (iter_scan)
+SCAN_STARTED = "scan_started"
+SCAN_NODE_ADDED = "node_added"
+SCAN_DIRECTORY_FINISHED = "directory_finished"
+SCAN_ERROR = "error"
+SCAN_FINISHED = "scan_finished"
+
+class ScanEvent(NamedTuple):
+    """Evento emitido durante o escaneamento"""
+    kind: str
+    node: DirectoryNode
+    message: str = ""
+
+class _WorkStealingQueue:
+    """
+    Fila de diretórios pendentes com um deque por worker.
+    Cada worker consome o próprio deque pelo final (LIFO) e, quando vazio,
+    rouba trabalho do início (FIFO) do deque de outro worker.
+    """
+    
+    def __init__(self, num_workers: int):
+        self._deques = [deque() for _ in range(num_workers)]
+        self._condition = threading.Condition()
+        self._pending = 0
+        self._closed = False
+    
+    def push(self, worker_id: int, item):
+        """Adiciona item ao deque do worker"""
+        with self._condition:
+            self._deques[worker_id].append(item)
+            self._pending += 1
+            self._condition.notify()
+    
+    def pop(self, worker_id: int):
+        """Retorna o próximo item ou None quando não há mais trabalho"""
+        num_workers = len(self._deques)
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                
+                own = self._deques[worker_id]
+                if own:
+                    return own.pop()
+                
+                for offset in range(1, num_workers):
+                    victim = self._deques[(worker_id + offset) % num_workers]
+                    if victim:
+                        return victim.popleft()
+                
+                if self._pending == 0:
+                    return None
+                
+                self._condition.wait()
+    
+    def task_done(self):
+        """Marca um item retirado como concluído"""
+        with self._condition:
+            self._pending -= 1
+            if self._pending == 0:
+                self._condition.notify_all()
+    
+    def close(self):
+        """Encerra a fila, liberando os workers"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+class _DirectoryListing:
+    """Listagem de um diretório lida por um worker do escaneamento paralelo"""
+    
+    __slots__ = ('stat_result', 'children', 'error')
+    
+    def __init__(self):
+        self.stat_result: Optional[os.stat_result] = None
+        # None sem erro: o diretório não foi listado (posse ainda não decidida)
+        self.children: Optional[List['DirectoryNode']] = None
+        self.error: Optional[Exception] = None
+
+class _ListingOrder:
+    """
+    Aplica as listagens lidas pelos workers do escaneamento paralelo na
+    pré-ordem do escaneamento serial. A posse de cada diretório (st_dev,
+    st_ino) é decidida nessa ordem, então links simbólicos e seus alvos
+    resultam na mesma árvore do modo serial. Os workers só reservam o
+    diretório para não listá-lo duas vezes; um nó cujo diretório está
+    reservado por outro espera a sua vez na pré-ordem e, se ficar com a
+    posse, volta à fila para ser listado.
+    """
+    
+    def __init__(self, root_node: 'DirectoryNode', apply, schedule):
+        # apply(nó, listagem, confirmado) -> True (aplicada), False (descartada)
+        # ou None (posse confirmada agora, falta listar)
+        self._apply = apply
+        self._schedule = schedule
+        self._lock = threading.Lock()
+        # Pilha dos próximos diretórios na pré-ordem (o próximo no topo)
+        self._expected: List['DirectoryNode'] = [root_node]
+        # Listagens lidas e ainda não aplicadas
+        self._ready: Dict['DirectoryNode', Optional[_DirectoryListing]] = {}
+        # (st_dev, st_ino) -> nó que reservou o diretório
+        self._claims: Dict[Tuple[int, int], 'DirectoryNode'] = {}
+        self._confirmed: Set['DirectoryNode'] = set()
+        # Subdiretórios de listagens descartadas: não precisam ser lidos
+        self._abandoned: Set['DirectoryNode'] = set()
+    
+    def claim(self, node: 'DirectoryNode', key: Tuple[int, int], admitted: bool) -> bool:
+        """
+        Reserva o diretório para a listagem do nó (a primeira reserva vence).
+        Nós com a posse já confirmada são sempre listados; os demais só se
+        admitted (a verificação prévia da política de percurso) for verdadeiro.
+        """
+        with self._lock:
+            if node in self._confirmed:
+                return True
+            return admitted and self._claims.setdefault(key, node) is node
+    
+    def is_abandoned(self, node: 'DirectoryNode') -> bool:
+        """Indica se o nó pertence a uma listagem descartada"""
+        with self._lock:
+            return node in self._abandoned
+    
+    def complete(self, node: 'DirectoryNode',
+                 listing: Optional[_DirectoryListing]) -> List['DirectoryNode']:
+        """
+        Registra a listagem lida de um diretório, aplica as que já estão na
+        vez e devolve os subdiretórios a ler.
+        """
+        with self._lock:
+            self._ready[node] = listing
+            subdirectories = self._subdirectories(listing)
+            if node in self._abandoned:
+                self._abandoned.update(subdirectories)
+                subdirectories = []
+            self._release(False)
+            return subdirectories
+    
+    def finish(self):
+        """Aplica o que restou (após cancelamento, pula os diretórios nunca listados)"""
+        with self._lock:
+            self._release(True)
+    
+    @staticmethod
+    def _subdirectories(listing: Optional[_DirectoryListing]) -> List['DirectoryNode']:
+        if listing is None or not listing.children:
+            return []
+        return [child for child in listing.children
+                if child.is_directory and not child.is_excluded]
+    
+    def _release(self, skip_missing: bool):
+        while self._expected:
+            node = self._expected[-1]
+            if node not in self._ready:
+                if not skip_missing:
+                    return
+                self._expected.pop()
+                continue
+            
+            listing = self._ready.pop(node)
+            applied = self._apply(node, listing, node in self._confirmed)
+            if applied is None:
+                if skip_missing:
+                    self._expected.pop()
+                    continue
+                self._confirmed.add(node)
+                self._schedule(node)
+                return
+            
+            self._expected.pop()
+            if applied:
+                self._expected.extend(reversed(self._subdirectories(listing)))
+            else:
+                self._abandoned.update(self._subdirectories(listing))
+
+class TraversalPolicy:
+    """
+    Política de percurso do scanner.
+    Registra o (st_dev, st_ino) de cada diretório listado para não visitar
+    os mesmos dados duas vezes (ciclos de links simbólicos, bind mounts),
+    decide se links simbólicos para diretórios são seguidos, pode restringir
+    o percurso ao sistema de arquivos da raiz e, opcionalmente, identifica
+    hardlinks para não somar os mesmos bytes mais de uma vez.
+    """
+    
+    def __init__(self, follow_symlinks: bool = True, one_filesystem: bool = False,
+                 dedupe_hardlinks: bool = False):
+        self.follow_symlinks = follow_symlinks
+        self.one_filesystem = one_filesystem
+        self.dedupe_hardlinks = dedupe_hardlinks
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Limpa o estado para um novo percurso"""
+        with self._lock:
+            self._root_device: Optional[int] = None
+            self._visited_directories: Set[Tuple[int, int]] = set()
+            self._seen_files: Set[Tuple[int, int]] = set()
+            self.skipped_symlinks = 0
+            self.skipped_loops = 0
+            self.skipped_mounts = 0
+            self.duplicate_files = 0
+            self.duplicate_bytes = 0
+    
+    def enter_directory(self, path, is_symlink: bool = False,
+                        stat_result: Optional[os.stat_result] = None) -> bool:
+        """
+        Indica se um diretório deve ser listado e o marca como visitado.
+        O primeiro diretório após reset() é a raiz do percurso.
+        """
+        if stat_result is None:
+            stat_result = os.stat(path)
+        key = (stat_result.st_dev, stat_result.st_ino)
         
-        if include_children:
-            data['children'] = [child.to_dict() for child in self.children]
+        with self._lock:
+            if self._root_device is None:
+                self._root_device = stat_result.st_dev
+            else:
+                if is_symlink and not self.follow_symlinks:
+                    self.skipped_symlinks += 1
+                    return False
+                if self.one_filesystem and stat_result.st_dev != self._root_device:
+                    self.skipped_mounts += 1
+                    return False
+            
+            if key in self._visited_directories:
+                self.skipped_loops += 1
+                return False
+            self._visited_directories.add(key)
+            return True
+    
+    def admits_directory(self, is_symlink: bool, stat_result: os.stat_result) -> bool:
+        """
+        Verificação prévia, sem marcar o diretório: falso quando
+        enter_directory certamente o recusaria depois da raiz.
+        """
+        with self._lock:
+            if self._root_device is None:
+                return True
+            if is_symlink and not self.follow_symlinks:
+                return False
+            if self.one_filesystem and stat_result.st_dev != self._root_device:
+                return False
+            return (stat_result.st_dev, stat_result.st_ino) not in self._visited_directories
+    
+    def forget_directory(self, key: Optional[Tuple[int, int]]):
+        """Remove um diretório dos visitados (ex.: apagado durante a observação)"""
+        if key is not None:
+            with self._lock:
+                self._visited_directories.discard(key)
+    
+    def count_file(self, link_key: Optional[Tuple[int, int]], size: int) -> bool:
+        """
+        Indica se os bytes de um arquivo devem ser somados.
+        Hardlinks já vistos contam como bytes duplicados evitados.
+        """
+        if not self.dedupe_hardlinks or link_key is None:
+            return True
         
-        return data
+        with self._lock:
+            if link_key in self._seen_files:
+                self.duplicate_files += 1
+                self.duplicate_bytes += size
+                return False
+            self._seen_files.add(link_key)
+            return True
+    
+    def get_statistics(self) -> Dict:
+        """Retorna os contadores do percurso"""
+        return {
+            'skipped_symlinks': self.skipped_symlinks,
+            'skipped_loops': self.skipped_loops,
+            'skipped_mounts': self.skipped_mounts,
+            'duplicate_files': self.duplicate_files,
+            'duplicate_bytes': self.duplicate_bytes
+        }
 
 class DirectoryScanner:
     """Scanner avançado de diretórios"""
     
-    def __init__(self, supported_extensions: Set[str], exclusion_manager=None):
+    def __init__(self, supported_extensions: Set[str], exclusion_manager=None,
+                 max_workers: int = 1, snapshot_store=None, checkpoint_store=None,
+                 traversal_policy: Optional[TraversalPolicy] = None,
+                 collectors: Optional[List[ScanCollector]] = None,
+                 hash_cache: Optional[HashCache] = None,
+                 content_index: Optional[ContentIndex] = None):
         self.supported_extensions = supported_extensions
         self.exclusion_manager = exclusion_manager
+        self.max_workers = max(1, max_workers or 1)
+        self.snapshot_store = snapshot_store
+        self.checkpoint_store = checkpoint_store
+        self.traversal_policy = traversal_policy or TraversalPolicy()
+        self.collectors = list(collectors or [])
+        self.hash_cache = hash_cache
+        self.content_index = content_index
         self.cancelled = False
         self.progress_callback = None
         self.status_callback = None
@@ -146,6 +931,18 @@ class DirectoryScanner:
         self.excluded_files = 0
         self.errors = []
         self.extension_distribution = defaultdict(int)
+        self.reused_directories = 0
+        self.relisted_directories = 0
+        
+        # Destino dos eventos do escaneamento em fluxo e, no modo paralelo,
+        # o reordenador que os entrega na ordem da árvore
+        self._event_sink = None
+        
+        # Raiz cuja subárvore está sincronizada com o índice de conteúdo
+        self._content_index_root: Optional[Path] = None
+        
+        # Índice de nomes da última árvore buscada (montado sob demanda)
+        self._name_index: Optional[NameIndex] = None
         
         # Thread safety
         self._lock = threading.Lock()
@@ -162,6 +959,10 @@ class DirectoryScanner:
         """Cancela o escaneamento"""
         self.cancelled = True
     
+    def _begin_operation(self):
+        """Começa um escaneamento ou análise: um cancelamento anterior não vale para ele"""
+        self.cancelled = False
+    
     def _update_progress(self, current: int, total: int, message: str = ""):
         """Atualiza o progresso"""
         if self.progress_callback:
@@ -179,11 +980,78 @@ class DirectoryScanner:
                 pass
     
     def scan_directory(self, root_path: str, include_subdirectories: bool = True,
-                      max_depth: int = -1) -> DirectoryNode:
+                      max_depth: int = -1, parallel: Optional[bool] = None) -> DirectoryNode:
         """
         Escaneia diretório e retorna árvore de nós
+        
+        Com parallel=None o modo paralelo é usado quando max_workers > 1.
+        """
+        root_node = None
+        for event in self.iter_scan(root_path, include_subdirectories, max_depth, parallel):
+            if event.kind == SCAN_FINISHED:
+                root_node = event.node
+        return root_node
+    
+    def iter_scan(self, root_path: str, include_subdirectories: bool = True,
+                  max_depth: int = -1, parallel: Optional[bool] = None,
+                  buffer_size: int = 64) -> Generator[ScanEvent, None, None]:
         """
-        self._reset_stats()
+        Escaneia diretório emitindo eventos à medida que os nós são descobertos:
+        scan_started (raiz), node_added (filhos de cada diretório, na ordem da
+        árvore), directory_finished (listagem do diretório concluída), error e,
+        por fim, scan_finished com a árvore completa e os agregados calculados.
+        
+        O escaneamento roda em uma thread produtora e os eventos passam por uma
+        fila de até buffer_size lotes (um lote por diretório): um consumidor
+        lento pausa o escaneamento em vez de acumular memória. Interromper a
+        iteração cancela o escaneamento.
+        """
+        batches = queue.Queue(maxsize=max(1, buffer_size))
+        failure = []
+        
+        def produce():
+            try:
+                self._run_scan(root_path, include_subdirectories, max_depth, parallel, batches.put)
+            except BaseException as e:
+                failure.append(e)
+            finally:
+                batches.put(None)
+        
+        producer = threading.Thread(target=produce, daemon=True, name="DirectoryScanner-producer")
+        producer.start()
+        
+        finished = False
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    finished = True
+                    break
+                yield from batch
+        finally:
+            if not finished:
+                # Consumidor desistiu: cancelar e liberar a thread produtora
+                self.cancel()
+                while batches.get() is not None:
+                    pass
+            producer.join()
+        
+        if failure:
+            raise failure[0]
+    
+    def _run_scan(self, root_path: str, include_subdirectories: bool, max_depth: int,
+                  parallel: Optional[bool], sink):
+        """Executa o escaneamento entregando lotes de eventos a sink"""
+        self._event_sink = sink
+        try:
+            self._scan_tree(root_path, include_subdirectories, max_depth, parallel)
+        finally:
+            self._event_sink = None
+    
+    def _scan_tree(self, root_path: str, include_subdirectories: bool, max_depth: int,
+                   parallel: Optional[bool]) -> DirectoryNode:
+        """Monta a árvore completa escolhendo o modo de escaneamento"""
+        self._reset_stats(root_path)
         self._update_status("Iniciando escaneamento...")
         
         root_path = Path(root_path)
@@ -195,14 +1063,380 @@ class DirectoryScanner:
         
         # Criar nó raiz
         root_node = DirectoryNode(str(root_path))
+        self._emit([ScanEvent(SCAN_STARTED, root_node)])
+        
+        if parallel is None:
+            parallel = self.max_workers > 1
+        
+        # Snapshot do escaneamento anterior (reescaneamento incremental)
+        snapshot = None
+        snapshot_key = None
+        use_snapshot = self.snapshot_store is not None and (
+            not self.exclusion_manager or self.exclusion_manager.allows_snapshot_reuse())
+        if use_snapshot:
+            snapshot_key = self.snapshot_store.make_key(
+                str(root_path),
+                self.exclusion_manager.get_profile_fingerprint() if self.exclusion_manager else "",
+                self.supported_extensions,
+                include_subdirectories=include_subdirectories,
+                max_depth=max_depth
+            )
+            snapshot = self.snapshot_store.load(snapshot_key)
+            if snapshot and snapshot.root_path != str(root_node.path):
+                snapshot = None
         
-        # Escanear recursivamente
-        self._scan_node(root_node, include_subdirectories, max_depth)
+        if snapshot:
+            self._update_status("Reaproveitando escaneamento anterior...")
+            self._scan_incremental(root_node, 0, snapshot, include_subdirectories, max_depth)
+        elif parallel and include_subdirectories:
+            self._scan_parallel(root_node, max_depth)
+        else:
+            # Escanear recursivamente
+            self._scan_node(root_node, include_subdirectories, max_depth)
+        
+        # Agregados calculados uma única vez ao final
+        root_node.compute_aggregates()
+        self._finish_collectors(root_node)
         
+        if use_snapshot and not self.cancelled:
+            self.snapshot_store.save(snapshot_key, root_node)
+        
+        self._emit([ScanEvent(SCAN_FINISHED, root_node)])
         return root_node
     
-    def _reset_stats(self):
-        """Reseta as estatísticas"""
+    def _emit(self, events: List[ScanEvent]):
+        """Entrega um lote de eventos ao consumidor do escaneamento em fluxo"""
+        if self._event_sink is not None and events:
+            self._event_sink(events)
+    
+    def _emit_listing(self, node: DirectoryNode, children: List[DirectoryNode],
+                      errors: Optional[List[ScanEvent]] = None):
+        """Emite os erros e os filhos adicionados a um diretório e o fim da sua listagem"""
+        if self._event_sink is None:
+            return
+        events = list(errors or [])
+        events.extend(ScanEvent(SCAN_NODE_ADDED, child) for child in children)
+        events.append(ScanEvent(SCAN_DIRECTORY_FINISHED, node))
+        self._event_sink(events)
+    
+    def scan_directory_budgeted(self, root_path: str, include_subdirectories: bool = True,
+                                max_depth: int = -1, max_seconds: Optional[float] = None,
+                                max_items: Optional[int] = None,
+                                resume_token: Optional[str] = None
+                                ) -> Tuple[DirectoryNode, Optional[str]]:
+        """
+        Escaneia diretório dentro de um orçamento de tempo e/ou de itens.
+        Retorna (árvore, token): se o orçamento acabar ou o escaneamento for
+        cancelado antes do fim, a árvore é parcial e o token permite continuar
+        de onde parou em outra chamada (mesmo após reiniciar o aplicativo).
+        Com o escaneamento concluído o token é None.
+        Requer checkpoint_store para gravar a fronteira de diretórios pendentes.
+        """
+        if self.checkpoint_store is None:
+            raise ValueError("Escaneamento com retomada requer um checkpoint_store")
+        
+        self._reset_stats(root_path)
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        options = {'include_subdirectories': include_subdirectories, 'max_depth': max_depth}
+        
+        checkpoint = None
+        if resume_token:
+            checkpoint = self.checkpoint_store.load(resume_token, DirectoryNode)
+            if checkpoint and (checkpoint.options != options or
+                               checkpoint.root_node.path != Path(root_path)):
+                checkpoint = None
+            if checkpoint is None:
+                self._update_status("Checkpoint não encontrado, reiniciando escaneamento...")
+        
+        if checkpoint:
+            self._update_status("Retomando escaneamento...")
+            root_node = checkpoint.root_node
+            frontier = deque(checkpoint.frontier)
+            pending = {id(node) for node in frontier}
+            for node in walk_depth_first([root_node], lambda node: node.children):
+                if node.is_directory and id(node) not in pending and not node.is_excluded:
+                    # Diretórios já listados contam como visitados
+                    try:
+                        self.traversal_policy.enter_directory(node.path)
+                    except OSError:
+                        pass
+                if node is not root_node:
+                    self._update_stats(node)
+                    self.total_items_scanned += 1
+        else:
+            self._update_status("Iniciando escaneamento...")
+            root_path = Path(root_path)
+            if not root_path.exists():
+                raise ValueError(f"Diretório não encontrado: {root_path}")
+            
+            if not root_path.is_dir():
+                raise ValueError(f"Caminho não é um diretório: {root_path}")
+            
+            root_node = DirectoryNode(str(root_path))
+            frontier = deque([root_node])
+        
+        items_at_start = self.total_items_scanned
+        while frontier:
+            if self.cancelled:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if max_items is not None and self.total_items_scanned - items_at_start >= max_items:
+                break
+            
+            node = frontier.popleft()
+            scheduled = []
+            self._scan_children(node, include_subdirectories, max_depth, scheduled.append)
+            
+            if self.cancelled:
+                # Listagem interrompida: descartar e listar de novo na retomada
+                self._discard_children(node)
+                frontier.appendleft(node)
+                break
+            
+            frontier.extend(scheduled)
+        
+        root_node.compute_aggregates()
+        self._finish_collectors(root_node)
+        
+        if not frontier:
+            if resume_token:
+                self.checkpoint_store.discard(resume_token)
+            self._update_status("Escaneamento concluído")
+            return root_node, None
+        
+        token = self.checkpoint_store.save(root_node, frontier, options, resume_token)
+        self._update_status(f"Escaneamento pausado: {len(frontier)} diretórios pendentes")
+        return root_node, token
+    
+    def _discard_children(self, node: DirectoryNode):
+        """Remove os filhos de um nó (e das estatísticas) antes de listá-lo de novo"""
+        for child in list(node.children):
+            node.remove_child(child)
+            self._record_stats(child.is_directory, child.is_excluded, child.size,
+                               child.extension, count=-1)
+            with self._lock:
+                self.total_items_scanned -= 1
+        node.listing_mtime_ns = None
+        self.traversal_policy.forget_directory(node.link_key)
+    
+    def scan_directory_compact(self, root_path: str, include_subdirectories: bool = True,
+                              max_depth: int = -1) -> CompactTree:
+        """
+        Escaneia diretório para uma CompactTree.
+        Usa uma fração da memória de DirectoryNode em árvores muito grandes;
+        tree.root oferece a mesma API de consulta de DirectoryNode.
+        """
+        self._reset_stats(root_path)
+        self._update_status("Iniciando escaneamento...")
+        
+        root_path = Path(root_path)
+        if not root_path.exists():
+            raise ValueError(f"Diretório não encontrado: {root_path}")
+        
+        if not root_path.is_dir():
+            raise ValueError(f"Caminho não é um diretório: {root_path}")
+        
+        tree = CompactTree(str(root_path))
+        try:
+            root_mtime = root_path.stat().st_mtime
+        except OSError:
+            root_mtime = math.nan
+        tree.add_entry(-1, root_path.name, True, mtime=root_mtime)
+        
+        pending = deque([(0, str(root_path), False)])
+        while pending and not self.cancelled:
+            index, dir_path, is_symlink = pending.popleft()
+            if max_depth >= 0 and tree.depths[index] >= max_depth:
+                continue
+            
+            try:
+                if not self.traversal_policy.enter_directory(dir_path, is_symlink):
+                    continue
+                
+                listing = self._read_listing(dir_path)
+                exclusions = self._evaluate_listing(dir_path, listing)
+                
+                tree.first_child[index] = len(tree)
+                for (is_directory, entry, stat_result), (is_excluded, reason) in zip(listing, exclusions):
+                    if self.cancelled:
+                        break
+                    
+                    size = 0
+                    counted_size = 0
+                    mtime = math.nan
+                    extension = ""
+                    if not is_directory:
+                        extension = _path_suffix(entry.name).lower()
+                        if stat_result is not None:
+                            size = counted_size = stat_result.st_size
+                            mtime = stat_result.st_mtime
+                            if (stat_result.st_nlink > 1 and not self.traversal_policy.count_file(
+                                    (stat_result.st_dev, stat_result.st_ino), size)):
+                                counted_size = 0
+                    
+                    child_index = tree.add_entry(
+                        index, entry.name, is_directory, size, mtime, extension, reason,
+                        is_excluded=is_excluded,
+                        is_supported=not is_directory and extension in self.supported_extensions
+                    )
+                    tree.child_counts[index] += 1
+                    
+                    self._record_stats(is_directory, is_excluded, counted_size, extension)
+                    self._count_scanned_item()
+                    
+                    if is_directory and include_subdirectories and not is_excluded:
+                        pending.append((child_index, entry.path, entry.is_symlink()))
+            
+            except PermissionError as e:
+                self.errors.append(f"Erro de permissão: {dir_path} - {e}")
+                self._update_status(f"Erro de permissão: {os.path.basename(dir_path)}")
+            
+            except Exception as e:
+                self.errors.append(f"Erro ao escanear {dir_path}: {e}")
+                self._update_status(f"Erro: {os.path.basename(dir_path)}")
+        
+        tree.compute_aggregates()
+        return tree
+    
+    def scan_directory_to_store(self, root_path: str, store: SQLiteScanStore,
+                                include_subdirectories: bool = True,
+                                max_depth: int = -1) -> StoredNodeView:
+        """
+        Escaneia diretório gravando as entradas em um SQLiteScanStore.
+        A fronteira de diretórios pendentes fica no banco, então a memória
+        não cresce com a árvore; o nó retornado oferece a mesma API de
+        consulta de DirectoryNode, lendo do banco sob demanda.
+        """
+        self._reset_stats(root_path)
+        self._update_status("Iniciando escaneamento...")
+        
+        root_path = Path(root_path)
+        if not root_path.exists():
+            raise ValueError(f"Diretório não encontrado: {root_path}")
+        
+        if not root_path.is_dir():
+            raise ValueError(f"Caminho não é um diretório: {root_path}")
+        
+        try:
+            root_mtime = root_path.stat().st_mtime
+        except OSError:
+            root_mtime = None
+        last_id = store.reset(str(root_path), root_path.name, root_mtime) - 1
+        
+        while not self.cancelled:
+            pending = store.pending_directories(last_id, max_depth)
+            if not pending:
+                break
+            
+            for directory_id, dir_path, depth in pending:
+                last_id = directory_id
+                if self.cancelled:
+                    break
+                self._store_listing(store, directory_id, dir_path, depth)
+            
+            if not include_subdirectories:
+                break
+        
+        self._update_status("Calculando totais...")
+        store.finish()
+        return store.root
+    
+    @staticmethod
+    def _read_listing(dir_path: str) -> List[Tuple[bool, os.DirEntry, Optional[os.stat_result]]]:
+        """
+        Lista um diretório como (é_diretório, entry, stat dos arquivos),
+        diretórios primeiro e em ordem alfabética
+        """
+        listing = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    is_directory = entry.is_dir()
+                except OSError:
+                    is_directory = False
+                stat_result = None
+                if not is_directory:
+                    try:
+                        stat_result = entry.stat()
+                    except OSError:
+                        pass
+                listing.append((is_directory, entry, stat_result))
+        listing.sort(key=lambda item: (not item[0], item[1].name.lower()))
+        return listing
+    
+    def _evaluate_listing(self, dir_path: str, listing) -> List[Tuple[bool, str]]:
+        """(excluído, motivo) de cada entrada da listagem, em uma avaliação por diretório"""
+        if not self.exclusion_manager:
+            return [(False, "")] * len(listing)
+        
+        manager = self.exclusion_manager
+        results = manager.evaluate_directory(dir_path, [
+            (entry.name, is_directory,
+             PathMetadata.from_stat(stat_result) if stat_result is not None else None)
+            for is_directory, entry, stat_result in listing
+        ])
+        return [(is_excluded, manager.get_exclusion_reason(reason_id))
+                for is_excluded, reason_id in results]
+    
+    def _store_listing(self, store: SQLiteScanStore, directory_id: int, dir_path: str,
+                       depth: int):
+        """Lista um diretório e grava seus filhos no store"""
+        try:
+            is_symlink = not self.traversal_policy.follow_symlinks and os.path.islink(dir_path)
+            if not self.traversal_policy.enter_directory(dir_path, is_symlink):
+                return
+            
+            listing = self._read_listing(dir_path)
+            exclusions = self._evaluate_listing(dir_path, listing)
+            
+            file_count = directory_count = direct_size = 0
+            for (is_directory, entry, stat_result), (is_excluded, reason) in zip(listing, exclusions):
+                if self.cancelled:
+                    break
+                
+                size = 0
+                counted_size = 0
+                mtime = None
+                extension = ""
+                if not is_directory:
+                    extension = _path_suffix(entry.name).lower()
+                    if stat_result is not None:
+                        size = counted_size = stat_result.st_size
+                        mtime = stat_result.st_mtime
+                        if (stat_result.st_nlink > 1 and not self.traversal_policy.count_file(
+                                (stat_result.st_dev, stat_result.st_ino), size)):
+                            counted_size = 0
+                
+                store.add_entry(
+                    directory_id, entry.name, entry.path, is_directory, depth + 1,
+                    size, mtime, extension, is_excluded=is_excluded,
+                    is_supported=not is_directory and extension in self.supported_extensions,
+                    exclusion_reason=reason
+                )
+                
+                if is_directory:
+                    directory_count += 1
+                else:
+                    file_count += 1
+                    direct_size += size
+                
+                self._record_stats(is_directory, is_excluded, counted_size, extension)
+                self._count_scanned_item()
+            
+            store.set_directory_counts(directory_id, file_count, directory_count, direct_size)
+        
+        except PermissionError as e:
+            self.errors.append(f"Erro de permissão: {dir_path} - {e}")
+            self._update_status(f"Erro de permissão: {os.path.basename(dir_path)}")
+        
+        except Exception as e:
+            self.errors.append(f"Erro ao escanear {dir_path}: {e}")
+            self._update_status(f"Erro: {os.path.basename(dir_path)}")
+    
+    def _reset_stats(self, root_path):
+        """Reseta as estatísticas para um novo escaneamento de root_path"""
+        self._begin_operation()
         self.total_items_scanned = 0
         self.total_directories = 0
         self.total_files = 0
@@ -211,9 +1445,68 @@ class DirectoryScanner:
         self.excluded_files = 0
         self.errors = []
         self.extension_distribution = defaultdict(int)
+        self.reused_directories = 0
+        self.relisted_directories = 0
+        self.traversal_policy.reset()
+        if self.exclusion_manager:
+            # Relê arquivos .gitignore e ancora os padrões de inclusão na raiz
+            self.exclusion_manager.begin_scan(root_path)
+        self._content_index_root = None
+        self._name_index = None
+        for collector in self.collectors:
+            collector.reset()
+    
+    def _finish_collectors(self, root_node: DirectoryNode):
+        """Conclui os coletores com a árvore e seus agregados já calculados"""
+        for collector in self.collectors:
+            collector.finish(root_node)
+    
+    def _get_collector(self, collector_class, root_node):
+        """Coletor de um tipo cujo resultado corresponde a root_node"""
+        for collector in self.collectors:
+            if isinstance(collector, collector_class) and collector.is_current(root_node):
+                return collector
+        return None
     
     def _scan_node(self, node: DirectoryNode, include_subdirectories: bool, max_depth: int):
-        """Escaneia um nó recursivamente"""
+        """Escaneia um nó e sua subárvore em pré-ordem (pilha explícita)"""
+        def expand(current: DirectoryNode):
+            scheduled = []
+            self._scan_children(current, include_subdirectories, max_depth, scheduled.append)
+            return scheduled
+        
+        for _ in walk_depth_first([node], expand):
+            pass
+    
+    def _scan_incremental(self, node: DirectoryNode, snapshot_index: int, snapshot,
+                          include_subdirectories: bool, max_depth: int):
+        """
+        Reescaneia um diretório a partir do snapshot.
+        Se o mtime do diretório não mudou, a listagem gravada é reaproveitada
+        sem acessar os filhos; caso contrário o diretório é listado de novo.
+        Diretórios ausentes do snapshot são escaneados normalmente.
+        """
+        def expand(item):
+            current, current_index = item
+            scheduled = []
+            if current_index is None:
+                self._scan_children(current, include_subdirectories, max_depth, scheduled.append)
+                return [(child, None) for child in scheduled]
+            
+            self._scan_from_snapshot(current, current_index, snapshot,
+                                     include_subdirectories, max_depth, scheduled.append)
+            return scheduled
+        
+        for _ in walk_depth_first([(node, snapshot_index)], expand):
+            pass
+    
+    def _scan_from_snapshot(self, node: DirectoryNode, snapshot_index: int, snapshot,
+                            include_subdirectories: bool, max_depth: int, schedule):
+        """
+        Monta os filhos de um diretório a partir do snapshot ou relistando-o.
+        Subdiretórios a percorrer são entregues a schedule como (nó, índice no
+        snapshot ou None).
+        """
         if self.cancelled:
             return
         
@@ -221,74 +1514,476 @@ class DirectoryScanner:
             return
         
         try:
-            items = list(node.path.iterdir())
-            items.sort(key=lambda x: (not x.is_dir(), x.name.lower()))
+            stat_result = os.stat(node.path)
+        except OSError:
+            stat_result = None
+        
+        if stat_result is None or not snapshot.is_reusable(snapshot_index, stat_result.st_mtime_ns):
+            self.relisted_directories += 1
+            snapshot_children = snapshot.children_of(snapshot_index)
+            self._scan_children(
+                node, include_subdirectories, max_depth,
+                lambda child: schedule((child, snapshot_children.get(child.name)))
+            )
+            return
+        
+        if not self.traversal_policy.enter_directory(node.path, node.is_symlink, stat_result):
+            return
+        node.link_key = (stat_result.st_dev, stat_result.st_ino)
+        
+        self.reused_directories += 1
+        node._apply_stat(stat_result)
+        node.listing_mtime_ns = stat_result.st_mtime_ns
+        
+        parent_path = str(node.path)
+        added = []
+        for child_index in snapshot.iter_children(snapshot_index):
+            if self.cancelled:
+                break
             
-            for item_path in items:
-                if self.cancelled:
-                    break
-                
-                # Criar nó filho
-                child_node = DirectoryNode(str(item_path))
-                child_node.depth = node.depth + 1
-                
-                # Verificar se é extensão suportada
-                if not child_node.is_directory:
-                    child_node.is_supported = child_node.extension in self.supported_extensions
-                
-                # Verificar exclusão
-                if self.exclusion_manager:
-                    should_exclude, reason = self.exclusion_manager.should_exclude_path(
-                        str(item_path), is_directory=child_node.is_directory
-                    )
-                    if should_exclude:
-                        child_node.is_excluded = True
-                        child_node.exclusion_reason = reason
-                
-                # Adicionar ao nó pai
-                node.add_child(child_node)
-                
-                # Atualizar estatísticas
-                self._update_stats(child_node)
-                
-                # Atualizar progresso
-                self.total_items_scanned += 1
-                if self.total_items_scanned % 100 == 0:
-                    self._update_progress(
-                        self.total_items_scanned, -1,
-                        f"Escaneados: {self.total_items_scanned} itens"
-                    )
-                
-                # Recursão para diretórios (se não excluído e incluir subdiretórios)
-                if (child_node.is_directory and 
-                    include_subdirectories and 
-                    not child_node.is_excluded):
-                    self._scan_node(child_node, include_subdirectories, max_depth)
+            child_node = snapshot.create_node(child_index, parent_path, DirectoryNode)
+            node.add_child(child_node)
+            self._update_stats(child_node)
+            self._count_scanned_item()
+            added.append((child_node, child_index))
         
-        except PermissionError as e:
-            error_msg = f"Erro de permissão: {node.path} - {e}"
-            self.errors.append(error_msg)
-            self._update_status(f"Erro de permissão: {node.path.name}")
+        self._emit_listing(node, [child_node for child_node, _ in added])
+        
+        for child_node, child_index in added:
+            if (child_node.is_directory and
+                include_subdirectories and
+                not child_node.is_excluded):
+                schedule((child_node, child_index))
+    
+    def _scan_parallel(self, root_node: DirectoryNode, max_depth: int):
+        """
+        Escaneia a árvore com um pool de workers e fila com roubo de trabalho.
+        Os workers só leem as listagens; elas entram na árvore (estatísticas,
+        eventos e posse dos diretórios) na pré-ordem do escaneamento serial,
+        então o resultado é o mesmo do modo serial.
+        """
+        work_queue = _WorkStealingQueue(self.max_workers)
+        work_queue.push(0, root_node)
+        listing_order = _ListingOrder(root_node, self._apply_parallel_listing,
+                                      lambda node: work_queue.push(0, node))
+        
+        def worker(worker_id: int):
+            while True:
+                node = work_queue.pop(worker_id)
+                if node is None:
+                    return
+                try:
+                    if self.cancelled:
+                        work_queue.close()
+                    elif not listing_order.is_abandoned(node):
+                        listing = self._read_parallel_listing(node, max_depth, listing_order)
+                        for child_node in listing_order.complete(node, listing):
+                            work_queue.push(worker_id, child_node)
+                finally:
+                    work_queue.task_done()
+        
+        workers = [
+            threading.Thread(target=worker, args=(worker_id,), daemon=True,
+                             name=f"DirectoryScanner-{worker_id}")
+            for worker_id in range(self.max_workers)
+        ]
+        for thread in workers:
+            thread.start()
+        try:
+            for thread in workers:
+                thread.join()
+        finally:
+            listing_order.finish()
+    
+    def _read_parallel_listing(self, node: DirectoryNode, max_depth: int,
+                               listing_order: _ListingOrder) -> Optional[_DirectoryListing]:
+        """Lê a listagem de um diretório num worker, sem alterar a árvore"""
+        if max_depth >= 0 and node.depth >= max_depth:
+            return None
         
+        listing = _DirectoryListing()
+        try:
+            stat_result = listing.stat_result = os.stat(node.path)
+            admitted = self.traversal_policy.admits_directory(node.is_symlink, stat_result)
+            if listing_order.claim(node, (stat_result.st_dev, stat_result.st_ino), admitted):
+                listing.children = self._read_children(node)
         except Exception as e:
-            error_msg = f"Erro ao escanear {node.path}: {e}"
+            listing.error = e
+        return listing
+    
+    def _apply_parallel_listing(self, node: DirectoryNode, listing: Optional[_DirectoryListing],
+                                confirmed: bool) -> Optional[bool]:
+        """
+        Aplica à árvore, na pré-ordem, a listagem lida por um worker.
+        Devolve False se o diretório não é percorrido (já visitado, por
+        exemplo), None se a posse acabou de ser confirmada e falta listá-lo
+        e True se a listagem foi aplicada.
+        """
+        if listing is None or self.cancelled:
+            return False
+        
+        errors = []
+        if listing.stat_result is None:
+            self._record_scan_error(node, listing.error, errors)
+            self._emit_listing(node, [], errors)
+            return True
+        
+        if not confirmed:
+            if not self.traversal_policy.enter_directory(node.path, node.is_symlink,
+                                                         listing.stat_result):
+                return False
+            if listing.children is None and listing.error is None:
+                return None
+        
+        listing_mtime_ns = self._begin_listing(node, listing.stat_result)
+        added = self._add_children(node, listing.children or [])
+        if listing.error is not None:
+            self._record_scan_error(node, listing.error, errors)
+        elif not self.cancelled:
+            node.listing_mtime_ns = listing_mtime_ns
+        
+        self._emit_listing(node, added, errors)
+        return True
+    
+    def _scan_children(self, node: DirectoryNode, include_subdirectories: bool,
+                       max_depth: int, schedule):
+        """
+        Lista os filhos de um diretório e os adiciona ao nó.
+        Subdiretórios a percorrer são entregues a schedule (recursão ou fila).
+        """
+        if self.cancelled:
+            return
+        
+        if max_depth >= 0 and node.depth >= max_depth:
+            return
+        
+        added = []
+        errors = []
+        try:
+            # mtime lido antes da listagem para o próximo reescaneamento
+            stat_result = os.stat(node.path)
+            if not self.traversal_policy.enter_directory(node.path, node.is_symlink, stat_result):
+                return
+            listing_mtime_ns = self._begin_listing(node, stat_result)
+            added = self._add_children(node, self._read_children(node))
+            
+            # Só listagens completas podem ser reaproveitadas
+            if not self.cancelled:
+                node.listing_mtime_ns = listing_mtime_ns
+        
+        except Exception as e:
+            self._record_scan_error(node, e, errors)
+        
+        self._emit_listing(node, added, errors)
+        
+        # Percorrer diretórios (se não excluído e incluir subdiretórios)
+        for child_node in added:
+            if (child_node.is_directory and 
+                include_subdirectories and 
+                not child_node.is_excluded):
+                schedule(child_node)
+    
+    def _begin_listing(self, node: DirectoryNode, stat_result: os.stat_result) -> Optional[int]:
+        """Marca o diretório como listado; devolve o mtime para o próximo reescaneamento"""
+        node.link_key = (stat_result.st_dev, stat_result.st_ino)
+        if not self.snapshot_store:
+            return None
+        node._apply_stat(stat_result)
+        return stat_result.st_mtime_ns
+    
+    def _read_children(self, node: DirectoryNode) -> List[DirectoryNode]:
+        """Lista e classifica os filhos de um diretório, sem adicioná-los ao nó"""
+        with os.scandir(node.path) as entries:
+            children = [DirectoryNode.from_dir_entry(entry) for entry in entries]
+        children.sort(key=lambda n: (not n.is_directory, n.name.lower()))
+        for child_node in children:
+            child_node.depth = node.depth + 1
+        self._classify_children(node, children)
+        return children
+    
+    def _add_children(self, node: DirectoryNode, children: List[DirectoryNode]) -> List[DirectoryNode]:
+        """Adiciona os filhos lidos ao nó, atualizando estatísticas e progresso"""
+        added = []
+        for child_node in children:
+            if self.cancelled:
+                break
+            
+            # Adicionar ao nó pai
+            node.add_child(child_node)
+            
+            # Atualizar estatísticas
+            self._update_stats(child_node)
+            
+            # Atualizar progresso
+            self._count_scanned_item()
+            added.append(child_node)
+        return added
+    
+    def _record_scan_error(self, node: DirectoryNode, error: Exception, errors: List[ScanEvent]):
+        """Registra um erro de listagem (lista de erros, evento e status)"""
+        if isinstance(error, PermissionError):
+            error_msg = f"Erro de permissão: {node.path} - {error}"
+            status = f"Erro de permissão: {node.path.name}"
+        else:
+            error_msg = f"Erro ao escanear {node.path}: {error}"
+            status = f"Erro: {node.path.name}"
+        with self._lock:
             self.errors.append(error_msg)
-            self._update_status(f"Erro: {node.path.name}")
+        errors.append(ScanEvent(SCAN_ERROR, node, error_msg))
+        self._update_status(status)
+    
+    def _classify_node(self, node: DirectoryNode):
+        """Marca se o nó é suportado e se deve ser excluído"""
+        # Verificar se é extensão suportada
+        if not node.is_directory:
+            node.is_supported = node.extension in self.supported_extensions
+        
+        # Verificar exclusão
+        if self.exclusion_manager:
+            should_exclude, reason = self.exclusion_manager.should_exclude_path(
+                str(node.path), is_directory=node.is_directory,
+                metadata=node.get_exclusion_metadata()
+            )
+            if should_exclude:
+                node.is_excluded = True
+                node.exclusion_reason = reason
+    
+    def _classify_children(self, parent: DirectoryNode, children: List[DirectoryNode]):
+        """_classify_node para toda a listagem de um diretório de uma vez"""
+        for child_node in children:
+            if not child_node.is_directory:
+                child_node.is_supported = child_node.extension in self.supported_extensions
+        
+        if self.exclusion_manager:
+            results = self.exclusion_manager.evaluate_directory(str(parent.path), [
+                (child_node.name, child_node.is_directory, child_node.get_exclusion_metadata())
+                for child_node in children
+            ])
+            for child_node, (should_exclude, reason_id) in zip(children, results):
+                if should_exclude:
+                    child_node.is_excluded = True
+                    child_node.exclusion_reason = self.exclusion_manager.get_exclusion_reason(reason_id)
+    
+    def _count_scanned_item(self):
+        """Incrementa o contador de itens e notifica o progresso a cada 100"""
+        with self._lock:
+            self.total_items_scanned += 1
+            scanned = self.total_items_scanned
+        
+        if scanned % 100 == 0:
+            self._update_progress(scanned, -1, f"Escaneados: {scanned} itens")
     
     def _update_stats(self, node: DirectoryNode):
         """Atualiza estatísticas com base no nó"""
+        size = node.size
+        if not node.is_directory and not self.traversal_policy.count_file(node.link_key, size):
+            size = 0
+        self._record_stats(node.is_directory, node.is_excluded, size, node.extension)
+        
+        if self.collectors:
+            with self._lock:
+                for collector in self.collectors:
+                    collector.add_node(node)
+    
+    def _record_stats(self, is_directory: bool, is_excluded: bool, size: int, extension: str,
+                      count: int = 1):
+        """Contabiliza uma entrada nas estatísticas (count=-1 desfaz)"""
         with self._lock:
-            if node.is_directory:
-                self.total_directories += 1
-                if node.is_excluded:
-                    self.excluded_directories += 1
+            if is_directory:
+                self.total_directories += count
+                if is_excluded:
+                    self.excluded_directories += count
             else:
-                self.total_files += 1
-                self.total_size += node.size
-                if node.extension:
-                    self.extension_distribution[node.extension] += 1
-                if node.is_excluded:
-                    self.excluded_files += 1
+                self.total_files += count
+                self.total_size += size * count
+                if extension:
+                    self.extension_distribution[extension] += count
+                    if self.extension_distribution[extension] <= 0:
+                        del self.extension_distribution[extension]
+                if is_excluded:
+                    self.excluded_files += count
+    
+    def watch(self, root_node: DirectoryNode, debounce: float = 0.5,
+              include_subdirectories: bool = True, max_depth: int = -1, dispatch=None):
+        """
+        Observa (inotify) os diretórios não excluídos de uma árvore escaneada
+        e aplica criações, remoções, modificações e movimentações no lugar,
+        mantendo agregados e estatísticas. Cada lote de eventos agrupado por
+        debounce é notificado pelos callbacks de status e progresso.
+        
+        dispatch, se informado, recebe a função que aplica o lote (ex.: para
+        executá-la na thread da interface). Retorna o DirectoryWatcher; use
+        stop() para encerrar a observação.
+        """
+        from .directory_watcher import DirectoryWatcher
+        
+        watched_nodes: Dict[str, DirectoryNode] = {}
+        
+        def on_events(events):
+            apply = lambda: self._apply_watch_events(
+                events, watcher, watched_nodes, include_subdirectories, max_depth
+            )
+            if dispatch:
+                dispatch(apply)
+            else:
+                apply()
+        
+        watcher = DirectoryWatcher(on_events, debounce)
+        self._watch_subtree(root_node, watcher, watched_nodes, include_subdirectories, max_depth)
+        watcher.start()
+        
+        self._update_status(f"Observando {len(watched_nodes)} diretórios")
+        return watcher
+    
+    def _watch_subtree(self, node: DirectoryNode, watcher, watched_nodes: Dict[str, DirectoryNode],
+                       include_subdirectories: bool, max_depth: int):
+        """Registra os diretórios listados da subárvore no watcher"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if max_depth >= 0 and current.depth >= max_depth:
+                continue
+            
+            if watcher.add_directory(str(current.path)):
+                watched_nodes[str(current.path)] = current
+            
+            if include_subdirectories:
+                stack.extend(child for child in current.children
+                             if child.is_directory and not child.is_excluded)
+    
+    def _apply_watch_events(self, events, watcher, watched_nodes: Dict[str, DirectoryNode],
+                            include_subdirectories: bool, max_depth: int):
+        """
+        Aplica um lote de eventos. Cada entrada afetada é conferida uma única
+        vez contra o disco, então a ordem e a repetição dos eventos do lote
+        não importam (uma movimentação vira remoção na origem e criação no
+        destino). Se a fila do kernel transbordou, todos os diretórios
+        observados são conferidos.
+        """
+        from .directory_watcher import IN_Q_OVERFLOW
+        
+        entries: Dict[Tuple[str, str], None] = {}
+        overflow = False
+        for event in events:
+            if event.mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif event.name and event.directory in watched_nodes:
+                entries[(event.directory, event.name)] = None
+        
+        if overflow:
+            for directory, node in list(watched_nodes.items()):
+                names = {child.name for child in node.children}
+                try:
+                    names.update(os.listdir(directory))
+                except OSError:
+                    pass
+                for name in names:
+                    entries[(directory, name)] = None
+        
+        changes = 0
+        child_maps: Dict[str, Dict[str, DirectoryNode]] = {}
+        for directory, name in entries:
+            parent = watched_nodes.get(directory)
+            if parent is None:
+                continue
+            
+            children = child_maps.get(directory)
+            if children is None:
+                children = child_maps[directory] = {child.name: child for child in parent.children}
+            
+            if self._refresh_watched_entry(parent, name, children, watcher, watched_nodes,
+                                           include_subdirectories, max_depth):
+                changes += 1
+        
+        if changes:
+            # Resultados coletados no escaneamento não valem para a árvore alterada
+            self._name_index = None
+            for collector in self.collectors:
+                collector.reset()
+            
+            self._update_progress(self.total_items_scanned, -1,
+                                  f"Árvore atualizada: {changes} alterações")
+            self._update_status(f"Alterações detectadas: {changes} itens atualizados")
+    
+    def _refresh_watched_entry(self, parent: DirectoryNode, name: str,
+                               children: Dict[str, DirectoryNode], watcher,
+                               watched_nodes: Dict[str, DirectoryNode],
+                               include_subdirectories: bool, max_depth: int) -> bool:
+        """Sincroniza uma entrada de um diretório observado com o disco"""
+        path = os.path.join(str(parent.path), name)
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            stat_result = None
+        
+        node = children.get(name)
+        is_directory = stat_result is not None and stat.S_ISDIR(stat_result.st_mode)
+        
+        if node is not None and (stat_result is None or node.is_directory != is_directory):
+            self._unwatch_child(parent, node, watcher, watched_nodes)
+            del children[name]
+            if stat_result is None:
+                return True
+            node = None
+        
+        if stat_result is None:
+            return False
+        
+        if node is not None:
+            if is_directory or (node.size == stat_result.st_size and
+                                node.modified_time == datetime.fromtimestamp(stat_result.st_mtime)):
+                return False
+            
+            delta = stat_result.st_size - node.size
+            node.update_size(stat_result.st_size)
+            node.modified_time = datetime.fromtimestamp(stat_result.st_mtime)
+            
+            # Regras de tamanho/data podem mudar a exclusão
+            was_excluded = node.is_excluded
+            node.is_excluded = False
+            node.exclusion_reason = ""
+            self._classify_node(node)
+            
+            with self._lock:
+                self.total_size += delta
+                if node.is_excluded != was_excluded:
+                    self.excluded_files += 1 if node.is_excluded else -1
+            return True
+        
+        node = DirectoryNode(path, name, is_directory=is_directory, stat_result=stat_result)
+        node.depth = parent.depth + 1
+        self._classify_node(node)
+        parent.add_child(node)
+        parent.children.sort(key=lambda n: (not n.is_directory, n.name.lower()))
+        children[name] = node
+        self._update_stats(node)
+        self._count_scanned_item()
+        
+        if is_directory and include_subdirectories and not node.is_excluded:
+            self._scan_node(node, include_subdirectories, max_depth)
+            self._watch_subtree(node, watcher, watched_nodes, include_subdirectories, max_depth)
+        return True
+    
+    def _unwatch_child(self, parent: DirectoryNode, node: DirectoryNode, watcher,
+                       watched_nodes: Dict[str, DirectoryNode]):
+        """Remove um filho (e sua subárvore) da árvore, das estatísticas e do watcher"""
+        parent.remove_child(node)
+        
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._record_stats(current.is_directory, current.is_excluded, current.size,
+                               current.extension, count=-1)
+            with self._lock:
+                self.total_items_scanned -= 1
+            
+            if current.is_directory:
+                path = str(current.path)
+                if watched_nodes.pop(path, None) is not None:
+                    watcher.remove_directory(path)
+                # O inode pode ser reaproveitado por um novo diretório
+                self.traversal_policy.forget_directory(current.link_key)
+                stack.extend(current.children)
     
     def generate_tree_text(self, root_node: DirectoryNode, 
                           show_excluded: bool = True,
@@ -297,16 +1992,11 @@ class DirectoryScanner:
         """Gera representação textual da árvore"""
         lines = []
         items_count = 0
+        include = None if show_excluded else (lambda node: not node.is_excluded)
         
-        def _add_node_text(node: DirectoryNode, prefix: str = "", is_last: bool = True):
-            nonlocal items_count
-            
+        for node, prefix, is_last in walk_tree(root_node, lambda node: node.children, include):
             if items_count >= max_items:
-                return
-            
-            # Pular itens excluídos se não deve mostrar
-            if node.is_excluded and not show_excluded:
-                return
+                break
             
             # Determinar ícone e formatação
             if node.is_directory:
@@ -334,7 +2024,6 @@ class DirectoryScanner:
             
             # Determinar prefixo da linha
             current_prefix = "└── " if is_last else "├── "
-            next_prefix = prefix + ("    " if is_last else "│   ")
             
             # Adicionar linha
             line = f"{prefix}{current_prefix}{icon} {name}{size_info}"
@@ -343,17 +2032,6 @@ class DirectoryScanner:
             
             lines.append(line)
             items_count += 1
-            
-            # Adicionar filhos
-            if node.children and items_count < max_items:
-                for i, child in enumerate(node.children):
-                    if items_count >= max_items:
-                        break
-                    is_child_last = i == len(node.children) - 1
-                    _add_node_text(child, next_prefix, is_child_last)
-        
-        # Adicionar nó raiz
-        _add_node_text(root_node)
         
         # Adicionar indicador se truncado
         if items_count >= max_items:
@@ -364,16 +2042,16 @@ class DirectoryScanner:
     def generate_tree_items_for_export(self, root_node: DirectoryNode,
                                      show_excluded: bool = True) -> List[Dict]:
         """Gera lista de itens da árvore para exportação"""
-        items = []
+        return list(self.iter_tree_items_for_export(root_node, show_excluded))
+    
+    def iter_tree_items_for_export(self, root_node: DirectoryNode,
+                                   show_excluded: bool = True) -> Generator[Dict, None, None]:
+        """Gera os itens da árvore para exportação um a um (em pré-ordem)"""
+        include = None if show_excluded else (lambda node: not node.is_excluded)
         
-        def _add_node_items(node: DirectoryNode, prefix: str = "", is_last: bool = True):
-            # Pular itens excluídos se não deve mostrar
-            if node.is_excluded and not show_excluded:
-                return
-            
+        for node, prefix, is_last in walk_tree(root_node, lambda node: node.children, include):
             # Determinar prefixo da linha
             current_prefix = "└── " if is_last else "├── "
-            next_prefix = prefix + ("    " if is_last else "│   ")
             
             # Adicionar item
             item = {
@@ -388,16 +2066,7 @@ class DirectoryScanner:
                 'depth': node.depth,
                 'prefix': prefix + current_prefix
             }
-            items.append(item)
-            
-            # Adicionar filhos
-            if node.children:
-                for i, child in enumerate(node.children):
-                    is_child_last = i == len(node.children) - 1
-                    _add_node_items(child, next_prefix, is_child_last)
-        
-        _add_node_items(root_node)
-        return items
+            yield item
     
     def get_statistics(self) -> Dict:
         """Retorna estatísticas do escaneamento"""
@@ -411,88 +2080,246 @@ class DirectoryScanner:
             'errors_count': len(self.errors),
             'errors': self.errors,
             'extension_distribution': dict(self.extension_distribution),
-            'supported_extensions': list(self.supported_extensions)
+            'supported_extensions': list(self.supported_extensions),
+            'reused_directories': self.reused_directories,
+            'relisted_directories': self.relisted_directories,
+            **self.traversal_policy.get_statistics()
         }
     
     def search_nodes(self, root_node: DirectoryNode, query: str,
-                    search_in_content: bool = False) -> List[DirectoryNode]:
-        """Busca nós que correspondem à consulta"""
-        query = query.lower()
-        results = []
+                    search_in_content: bool = False, regex: bool = False) -> List[DirectoryNode]:
+        """
+        Busca nós que correspondem à consulta (ou à expressão regular, com
+        regex=True). Nome, caminho e extensão são buscados pelo índice de
+        nomes da árvore; com um índice de conteúdo, a busca no conteúdo só lê
+        os arquivos que o índice aponta como candidatos. O índice é
+        sincronizado com a árvore na primeira busca no conteúdo após o
+        escaneamento, e não ao fim de cada escaneamento.
+        """
+        if regex:
+            pattern = re.compile(query, re.IGNORECASE)
+            matches = lambda text: pattern.search(text) is not None
+        else:
+            query_lower = query.lower()
+            matches = lambda text: query_lower in text.lower()
+        
+        content_extensions = self.get_content_search_extensions()
+        content_matches = None
+        if (search_in_content and self.content_index and not isinstance(root_node, StoredNodeView)
+                and not self._is_content_indexed(root_node)):
+            self.update_content_index(root_node)
+        if search_in_content and self._is_content_indexed(root_node):
+            content_matches = set(self.content_index.search(root_node.path, query, regex))
+        
+        if isinstance(root_node, StoredNodeView):
+            if regex:
+                results = [node for node in root_node.store.search(root_node, "")
+                           if matches(node.path_text)]
+            else:
+                results = root_node.store.search(root_node, query)
+            if search_in_content:
+                found = {node.id for node in results}
+                for node in root_node.store.content_candidates(root_node, content_extensions,
+                                                               CONTENT_SEARCH_MAX_SIZE):
+                    if node.id in found:
+                        continue
+                    if (node.path_text in content_matches if content_matches is not None
+                            else self._file_contains(node.path, matches)):
+                        results.append(node)
+            return results
+        
+        if not regex:
+            # Nome, caminho e extensão pelo índice de nomes
+            name_index = self.get_name_index(root_node)
+            if not search_in_content:
+                return name_index.substring(query)
+            name_matches = set(name_index.substring_indexes(query))
+            return [node for index, node in enumerate(name_index.nodes)
+                    if index in name_matches or
+                    self._content_matches(node, matches, content_extensions, content_matches)]
         
         def _search_predicate(node: DirectoryNode) -> bool:
             # Buscar no nome
-            if query in node.name.lower():
+            if matches(node.name):
                 return True
             
             # Buscar no caminho
-            if query in str(node.path).lower():
+            if matches(str(node.path)):
                 return True
             
             # Buscar na extensão
-            if query in node.extension.lower():
+            if matches(node.extension):
                 return True
             
             # Buscar no conteúdo (apenas para arquivos pequenos de texto)
-            if (search_in_content and 
-                not node.is_directory and 
-                node.size < 1024 * 1024 and  # Máximo 1MB
-                node.extension in {'.txt', '.md', '.py', '.js', '.html', '.css', '.json'}):
-                try:
-                    with open(node.path, 'r', encoding='utf-8') as f:
-                        content = f.read().lower()
-                        if query in content:
-                            return True
-                except:
-                    pass
-            
-            return False
+            return (search_in_content and
+                    self._content_matches(node, matches, content_extensions, content_matches))
         
         return root_node.find_nodes(_search_predicate)
     
+    def _content_matches(self, node: DirectoryNode, matches, content_extensions: Set[str],
+                         content_matches: Optional[Set[str]]) -> bool:
+        """Busca no conteúdo de um arquivo pequeno de texto (pelo índice, se houver)"""
+        if (node.is_directory or node.size >= CONTENT_SEARCH_MAX_SIZE or
+                node.extension not in content_extensions):
+            return False
+        if content_matches is not None:
+            return str(node.path) in content_matches
+        return self._file_contains(node.path, matches)
+    
+    def get_name_index(self, root_node: DirectoryNode) -> NameIndex:
+        """Índice de nomes da árvore de root_node, reaproveitado entre buscas"""
+        if self._name_index is None or self._name_index.root_node is not root_node:
+            self._name_index = NameIndex(root_node)
+        return self._name_index
+    
+    def _file_contains(self, path: Path, matches) -> bool:
+        """Indica se o conteúdo de um arquivo de texto satisfaz matches(texto)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return matches(f.read())
+        except:
+            return False
+    
+    def get_content_search_extensions(self) -> Set[str]:
+        """Extensões cujo conteúdo entra na busca e no índice de conteúdo"""
+        return CONTENT_SEARCH_EXTENSIONS | set(self.supported_extensions)
+    
+    def update_content_index(self, root_node: DirectoryNode) -> Tuple[int, int]:
+        """
+        Sincroniza o índice de conteúdo com os arquivos de texto da árvore.
+        Arquivos com tamanho e data de modificação inalterados não são relidos.
+        Retorna (arquivos indexados, arquivos removidos do índice).
+        """
+        if not self.content_index:
+            return 0, 0
+        
+        self._begin_operation()
+        content_extensions = self.get_content_search_extensions()
+        files = root_node.find_nodes(
+            lambda n: (not n.is_directory and n.size < CONTENT_SEARCH_MAX_SIZE and
+                       n.extension in content_extensions)
+        )
+        
+        self._update_status(f"Indexando conteúdo de {len(files)} arquivos...")
+        indexed, removed = self.content_index.update(
+            root_node.path,
+            [(node.path, node.size,
+              node.modified_time.timestamp() if node.modified_time else None) for node in files],
+            cancelled=lambda: self.cancelled
+        )
+        if not self.cancelled:
+            self._content_index_root = Path(root_node.path)
+        return indexed, removed
+    
+    def _is_content_indexed(self, root_node: DirectoryNode) -> bool:
+        """Indica se a subárvore de root_node está sincronizada com o índice"""
+        if not self.content_index or self._content_index_root is None:
+            return False
+        path = Path(root_node.path)
+        return path == self._content_index_root or self._content_index_root in path.parents
+    
     def get_largest_files(self, root_node: DirectoryNode, count: int = 10) -> List[DirectoryNode]:
         """Retorna os maiores arquivos"""
+        if isinstance(root_node, StoredNodeView):
+            return root_node.store.largest_files(root_node, count)
+        
+        collector = self._get_collector(TopFilesCollector, root_node)
+        if collector and collector.k >= count:
+            return collector.result(count)
+        
         files = root_node.find_nodes(lambda n: not n.is_directory and not n.is_excluded)
         files.sort(key=lambda n: n.size, reverse=True)
         return files[:count]
     
     def get_largest_directories(self, root_node: DirectoryNode, count: int = 10) -> List[DirectoryNode]:
         """Retorna os maiores diretórios"""
+        if isinstance(root_node, StoredNodeView):
+            return root_node.store.largest_directories(root_node, count)
+        
+        collector = self._get_collector(TopDirectoriesCollector, root_node)
+        if collector and collector.k >= count:
+            return collector.result(count)
+        
         directories = root_node.find_nodes(lambda n: n.is_directory and not n.is_excluded)
         directories.sort(key=lambda n: n.get_total_size(), reverse=True)
         return directories[:count]
     
+    def get_size_histogram(self, root_node: DirectoryNode) -> List[Tuple[int, int, int]]:
+        """Retorna o histograma de tamanhos de arquivo (faixas de potências de 2)"""
+        return self._collected(SizeHistogramCollector, root_node).result()
+    
+    def get_age_histogram(self, root_node: DirectoryNode) -> List[Tuple[str, int]]:
+        """Retorna o histograma de idade dos arquivos"""
+        return self._collected(AgeHistogramCollector, root_node).result()
+    
+    def get_extension_bytes(self, root_node: DirectoryNode) -> Dict[str, int]:
+        """Retorna o total de bytes por extensão"""
+        return self._collected(ExtensionBytesCollector, root_node).result()
+    
+    def _collected(self, collector_class, root_node):
+        """Coletor já preenchido no escaneamento ou, na falta dele, um recalculado"""
+        collector = self._get_collector(collector_class, root_node)
+        if collector is None:
+            collector = collector_class()
+            for node in walk_depth_first(root_node.children, lambda node: node.children):
+                collector.add_node(node)
+            collector.finish(root_node)
+        return collector
+    
     def get_files_by_extension(self, root_node: DirectoryNode, extension: str) -> List[DirectoryNode]:
         """Retorna arquivos de uma extensão específica"""
         extension = extension.lower()
         if not extension.startswith('.'):
             extension = '.' + extension
         
+        if isinstance(root_node, StoredNodeView):
+            return root_node.store.files_by_extension(root_node, extension)
+        
         return root_node.find_nodes(
             lambda n: not n.is_directory and n.extension == extension and not n.is_excluded
         )
     
     def get_empty_directories(self, root_node: DirectoryNode) -> List[DirectoryNode]:
         """Retorna diretórios vazios"""
+        if isinstance(root_node, StoredNodeView):
+            return root_node.store.empty_directories(root_node)
+        
         return root_node.find_nodes(
             lambda n: n.is_directory and len(n.children) == 0 and not n.is_excluded
         )
     
     def get_duplicate_names(self, root_node: DirectoryNode) -> Dict[str, List[DirectoryNode]]:
         """Retorna arquivos/diretórios com nomes duplicados"""
+        if isinstance(root_node, StoredNodeView):
+            return root_node.store.duplicate_names(root_node)
+        
         name_map = defaultdict(list)
         
-        def _collect_names(node: DirectoryNode):
+        for node in walk_depth_first([root_node], lambda node: node.children):
             if not node.is_excluded:
                 name_map[node.name.lower()].append(node)
-            for child in node.children:
-                _collect_names(child)
-        
-        _collect_names(root_node)
         
         # Retornar apenas nomes com duplicatas
         return {name: nodes for name, nodes in name_map.items() if len(nodes) > 1}
     
+    def get_duplicate_files(self, root_node: DirectoryNode,
+                            min_size: int = 1) -> List[List[DirectoryNode]]:
+        """
+        Retorna grupos de arquivos com conteúdo idêntico, do grupo que mais
+        ocupa espaço repetido para o que menos ocupa
+        """
+        self._begin_operation()
+        files = root_node.find_nodes(
+            lambda n: not n.is_directory and not n.is_excluded and n.size >= min_size
+        )
+        
+        finder = DuplicateFinder(max_workers=self.max_workers, hash_cache=self.hash_cache)
+        groups = finder.find(files, status_callback=self._update_status,
+                             cancelled=lambda: self.cancelled)
+        self.errors.extend(finder.errors)
+        return groups
+    
     def _format_file_size(self, size_bytes: int) -> str:
         """Formata tamanho do arquivo"""
         if size_bytes == 0:
@@ -522,9 +2349,21 @@ class DirectoryScanner:
             raise ValueError(f"Diretório de origem inválido: {source_path}")
         
         total_copied = 0
-        for root, dirs, files in os.walk(source_path):
+        policy = self.traversal_policy
+        policy.reset()
+        if self.exclusion_manager:
+            self.exclusion_manager.begin_scan(source_path)
+        for root, dirs, files in os.walk(source_path, followlinks=policy.follow_symlinks):
             rel_root = Path(root).relative_to(source_path)
             dest_root = dest_path / rel_root
+            # Ciclos, links simbólicos e outros sistemas de arquivos (conforme a política)
+            try:
+                entered = policy.enter_directory(root, os.path.islink(root))
+            except OSError:
+                entered = False
+            if not entered:
+                dirs.clear()
+                continue
             # Verificar exclusão do diretório atual
             if self.exclusion_manager:
                 should_exclude, _ = self.exclusion_manager.should_exclude_path(str(root), is_directory=True)
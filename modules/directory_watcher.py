@@ -0,0 +1,253 @@
+"""
+Módulo de observação de diretórios (inotify) para UltraTexto Pro
+"""
+
+import os
+import sys
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Máscaras de eventos do inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT_HEADER = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+_libc = None
+
+def _load_libc():
+    """Carrega a libc com as funções do inotify ou retorna None"""
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+                _libc = libc
+            except (OSError, AttributeError):
+                pass
+    return _libc or None
+
+def is_watch_supported() -> bool:
+    """Indica se o modo de observação está disponível nesta plataforma"""
+    return _load_libc() is not None
+
+class WatchEvent(NamedTuple):
+    """Evento de alteração em um diretório observado"""
+    directory: str
+    name: str
+    mask: int
+    cookie: int
+    
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, self.name) if self.name else self.directory
+    
+    @property
+    def is_directory(self) -> bool:
+        return bool(self.mask & IN_ISDIR)
+
+class Inotify:
+    """Interface mínima ao inotify do Linux via ctypes"""
+    
+    def __init__(self):
+        self._libc = _load_libc()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, "inotify não disponível nesta plataforma")
+        
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+    
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Observa um diretório e retorna o descritor do watch"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+    
+    def rm_watch(self, wd: int):
+        """Remove um watch (erros são ignorados: o diretório pode já ter sumido)"""
+        self._libc.inotify_rm_watch(self.fd, wd)
+    
+    def read_events(self, timeout: Optional[float]) -> List[tuple]:
+        """Lê eventos pendentes como (wd, mask, cookie, nome)"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        
+        try:
+            data = os.read(self.fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+        
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append((wd, mask, cookie, os.fsdecode(name)))
+        return events
+    
+    def close(self):
+        """Fecha o descritor do inotify"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class DirectoryWatcher:
+    """
+    Observa um conjunto de diretórios e entrega os eventos em lotes.
+    Rajadas de eventos (ex.: git checkout) são agrupadas: o lote só é
+    entregue após debounce segundos sem eventos novos, ou no máximo
+    após max_delay segundos desde o primeiro evento do lote.
+    """
+    
+    def __init__(self, callback: Callable[[List[WatchEvent]], None],
+                 debounce: float = 0.5, max_delay: Optional[float] = None):
+        self.callback = callback
+        self.debounce = debounce
+        self.max_delay = max_delay if max_delay is not None else debounce * 10
+        self._inotify = Inotify()
+        self._paths: Dict[int, str] = {}
+        self._watches: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def watched_directories(self) -> List[str]:
+        """Diretórios observados no momento"""
+        with self._lock:
+            return list(self._watches)
+    
+    def add_directory(self, path: str) -> bool:
+        """Passa a observar um diretório"""
+        path = str(path)
+        try:
+            wd = self._inotify.add_watch(path)
+        except OSError:
+            return False
+        
+        with self._lock:
+            old_path = self._paths.get(wd)
+            if old_path is not None and old_path != path:
+                self._watches.pop(old_path, None)
+            self._paths[wd] = path
+            self._watches[path] = wd
+        return True
+    
+    def remove_directory(self, path: str, recursive: bool = False):
+        """Deixa de observar um diretório (e, opcionalmente, seus subdiretórios)"""
+        path = str(path)
+        prefix = os.path.join(path, '')
+        with self._lock:
+            paths = [path]
+            if recursive:
+                paths.extend(p for p in self._watches if p.startswith(prefix))
+            for watched_path in paths:
+                wd = self._watches.pop(watched_path, None)
+                if wd is None:
+                    continue
+                self._paths.pop(wd, None)
+                self._inotify.rm_watch(wd)
+    
+    def start(self):
+        """Inicia a thread de observação"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Para a observação e libera o inotify"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self._inotify.close()
+    
+    def _run(self):
+        """Laço de leitura com agrupamento de eventos"""
+        batch: List[WatchEvent] = []
+        first_event = last_event = 0.0
+        
+        while not self._stop_event.is_set():
+            if batch:
+                now = time.monotonic()
+                timeout = min(last_event + self.debounce, first_event + self.max_delay) - now
+                if timeout <= 0:
+                    self._deliver(batch)
+                    batch = []
+                    continue
+            else:
+                timeout = 0.5
+            
+            try:
+                raw_events = self._inotify.read_events(min(timeout, 0.5))
+            except (OSError, ValueError):
+                break
+            
+            if not raw_events:
+                continue
+            
+            now = time.monotonic()
+            if not batch:
+                first_event = now
+            last_event = now
+            
+            with self._lock:
+                for wd, mask, cookie, name in raw_events:
+                    if mask & IN_Q_OVERFLOW:
+                        batch.append(WatchEvent("", "", mask, cookie))
+                        continue
+                    
+                    directory = self._paths.get(wd)
+                    if directory is None:
+                        continue
+                    
+                    if mask & IN_IGNORED:
+                        self._paths.pop(wd, None)
+                        if self._watches.get(directory) == wd:
+                            del self._watches[directory]
+                        continue
+                    
+                    batch.append(WatchEvent(directory, name, mask, cookie))
+        
+        if batch and not self._stop_event.is_set():
+            self._deliver(batch)
+    
+    def _deliver(self, batch: List[WatchEvent]):
+        """Entrega um lote ao callback"""
+        try:
+            self.callback(batch)
+        except Exception as e:
+            print(f"Erro ao aplicar eventos de observação: {e}")
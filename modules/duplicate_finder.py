@@ -0,0 +1,226 @@
+"""
+Módulo de detecção de arquivos com conteúdo duplicado para UltraTexto Pro
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+PARTIAL_HASH_SIZE = 64 * 1024
+READ_BUFFER_SIZE = 1024 * 1024
+
+class HashCache:
+    """
+    Cache de hashes de arquivos por (dispositivo, inode, tamanho, mtime).
+    Arquivos inalterados não são lidos de novo em um novo escaneamento.
+    """
+    
+    def __init__(self, cache_path: Optional[str] = None, max_entries: int = 200000):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+    
+    @classmethod
+    def from_config(cls, config_manager) -> 'HashCache':
+        """Cria o cache no diretório de cache"""
+        return cls(config_manager.get_cache_directory() / "file_hashes.json")
+    
+    @staticmethod
+    def make_key(stat_result: os.stat_result) -> str:
+        return (f"{stat_result.st_dev}:{stat_result.st_ino}:"
+                f"{stat_result.st_size}:{stat_result.st_mtime_ns}")
+    
+    def get(self, key: str, kind: str) -> Optional[str]:
+        """Retorna o hash 'partial' ou 'full' gravado para a chave"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.get(kind) if entry else None
+    
+    def put(self, key: str, kind: str, digest: str):
+        """Grava um hash"""
+        with self._lock:
+            entry = self._entries.pop(key, None) or {}
+            entry[kind] = digest
+            # Reinserir mantém as entradas usadas por último no fim
+            self._entries[key] = entry
+            self._dirty = True
+    
+    def load(self):
+        """Carrega o cache do disco"""
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Erro ao carregar cache de hashes: {e}")
+    
+    def save(self):
+        """Grava o cache, descartando as entradas mais antigas acima do limite"""
+        if not self.cache_path or not self._dirty:
+            return
+        
+        with self._lock:
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                for key in list(self._entries)[:overflow]:
+                    del self._entries[key]
+            data = dict(self._entries)
+            self._dirty = False
+        
+        temp_path = self.cache_path.with_suffix('.tmp')
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            print(f"Erro ao salvar cache de hashes: {e}")
+
+class DuplicateFinder:
+    """
+    Encontra arquivos de conteúdo idêntico em três etapas:
+    agrupamento por tamanho, hash do primeiro e do último bloco de 64 KB e,
+    só para os candidatos restantes, hash do arquivo inteiro.
+    As leituras rodam em um pool de threads.
+    """
+    
+    def __init__(self, max_workers: int = 4, hash_cache: Optional[HashCache] = None,
+                 partial_size: int = PARTIAL_HASH_SIZE, buffer_size: int = READ_BUFFER_SIZE):
+        self.max_workers = max(1, max_workers)
+        self.hash_cache = hash_cache
+        self.partial_size = partial_size
+        self.buffer_size = buffer_size
+        self.errors: List[str] = []
+        self.bytes_read = 0
+        self._lock = threading.Lock()
+    
+    def find(self, nodes: Iterable, status_callback: Optional[Callable[[str], None]] = None,
+             cancelled: Optional[Callable[[], bool]] = None) -> List[List]:
+        """
+        Agrupa os nós de arquivo com conteúdo idêntico.
+        Retorna os grupos ordenados pelos bytes que podem ser liberados.
+        """
+        cancelled = cancelled or (lambda: False)
+        status = status_callback or (lambda message: None)
+        
+        # Etapa 1: tamanho (hardlinks do mesmo arquivo contam uma vez)
+        by_size = defaultdict(list)
+        seen_links = set()
+        for node in nodes:
+            link_key = getattr(node, 'link_key', None)
+            if link_key is not None:
+                if link_key in seen_links:
+                    continue
+                seen_links.add(link_key)
+            by_size[node.size].append(node)
+        candidates = [group for group in by_size.values() if len(group) > 1]
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="DuplicateFinder") as pool:
+            # Etapa 2: início e fim do arquivo
+            status(f"Comparando início e fim de {sum(map(len, candidates))} arquivos...")
+            candidates = self._regroup(pool, candidates, self._partial_hash, cancelled)
+            
+            # Etapa 3: arquivo inteiro (desnecessária se o hash parcial já cobriu tudo)
+            pending = [group for group in candidates if group[0].size > 2 * self.partial_size]
+            complete = [group for group in candidates if group[0].size <= 2 * self.partial_size]
+            status(f"Calculando hash completo de {sum(map(len, pending))} arquivos...")
+            complete.extend(self._regroup(pool, pending, self._full_hash, cancelled))
+        
+        if self.hash_cache:
+            self.hash_cache.save()
+        
+        complete.sort(key=lambda group: group[0].size * (len(group) - 1), reverse=True)
+        return complete
+    
+    def _regroup(self, pool: ThreadPoolExecutor, groups: List[List], hash_function,
+                 cancelled: Callable[[], bool]) -> List[List]:
+        """Subdivide cada grupo pelo hash e mantém os subgrupos com mais de um arquivo"""
+        if cancelled():
+            return []
+        
+        nodes = [node for group in groups for node in group]
+        digests = pool.map(hash_function, nodes)
+        
+        by_digest = defaultdict(list)
+        for node, digest in zip(nodes, digests):
+            if digest is not None and not cancelled():
+                by_digest[(node.size, digest)].append(node)
+        return [group for group in by_digest.values() if len(group) > 1]
+    
+    def _cached_hash(self, node, kind: str, compute) -> Optional[str]:
+        """Hash do cache quando o arquivo não mudou; senão calcula e grava"""
+        try:
+            stat_result = os.stat(node.path)
+            if stat_result.st_size != node.size:
+                return None
+            
+            key = HashCache.make_key(stat_result) if self.hash_cache else None
+            if key:
+                digest = self.hash_cache.get(key, kind)
+                if digest:
+                    return digest
+            
+            digest = compute(node.path, stat_result.st_size)
+            if key:
+                self.hash_cache.put(key, kind, digest)
+            return digest
+        
+        except OSError as e:
+            with self._lock:
+                self.errors.append(f"Erro ao ler {node.path}: {e}")
+            return None
+    
+    def _partial_hash(self, node) -> Optional[str]:
+        return self._cached_hash(node, 'partial', self._hash_ends)
+    
+    def _full_hash(self, node) -> Optional[str]:
+        return self._cached_hash(node, 'full', self._hash_whole)
+    
+    def _hash_ends(self, path, size: int) -> str:
+        """Hash do primeiro e do último bloco (o arquivo inteiro se for pequeno)"""
+        digest = hashlib.blake2b()
+        with open(path, 'rb', buffering=0) as f:
+            head = f.read(self.partial_size)
+            digest.update(head)
+            read = len(head)
+            if size > 2 * self.partial_size:
+                f.seek(size - self.partial_size)
+                tail = f.read(self.partial_size)
+            else:
+                tail = f.read()
+            digest.update(tail)
+            read += len(tail)
+        self._count_bytes(read)
+        return digest.hexdigest()
+    
+    def _hash_whole(self, path, size: int) -> str:
+        """Hash do arquivo inteiro lido em blocos grandes"""
+        digest = hashlib.blake2b()
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        read = 0
+        with open(path, 'rb', buffering=0) as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                digest.update(view[:count])
+                read += count
+        self._count_bytes(read)
+        return digest.hexdigest()
+    
+    def _count_bytes(self, count: int):
+        with self._lock:
+            self.bytes_read += count
@@ -0,0 +1,113 @@
+"""
+Módulo de cache de decisões de exclusão para UltraTexto Pro
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+class ExclusionDecisionCache:
+    """
+    Cache LRU de decisões de exclusão (motivo, ou "" quando o caminho não
+    é excluído) por caminho. Vale para uma impressão digital de perfil por
+    vez: quando as regras mudam, a impressão muda e o cache é esvaziado.
+    Com cache_path, as decisões são gravadas em disco e recarregadas se o
+    perfil for o mesmo.
+    """
+    
+    def __init__(self, max_entries: int = 200000, cache_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.fingerprint: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+    
+    @classmethod
+    def from_config(cls, config_manager) -> 'ExclusionDecisionCache':
+        """Cria o cache persistente no diretório de cache"""
+        return cls(cache_path=config_manager.get_cache_directory() / "exclusion_decisions.json")
+    
+    def set_fingerprint(self, fingerprint: str):
+        """Passa a valer para outro perfil; as decisões anteriores são descartadas"""
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            self.fingerprint = fingerprint
+            self._entries.clear()
+            self._dirty = False
+        self.load()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Motivo gravado para a chave, ou None se a decisão não estiver no cache"""
+        with self._lock:
+            reason = self._entries.get(key)
+            if reason is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return reason
+    
+    def put(self, key: str, reason: str):
+        """Grava uma decisão, descartando a usada há mais tempo acima do limite"""
+        with self._lock:
+            self._entries[key] = reason
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+    
+    def clear(self):
+        """Esvazia o cache"""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_statistics(self) -> dict:
+        """Acertos, faltas e tamanho do cache"""
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+    
+    def load(self):
+        """Carrega do disco as decisões do perfil atual"""
+        if not self.cache_path or self.fingerprint is None:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Erro ao carregar cache de exclusões: {e}")
+            return
+        
+        if data.get('fingerprint') != self.fingerprint:
+            return
+        with self._lock:
+            for key, reason in data.get('entries', [])[-self.max_entries:]:
+                self._entries.setdefault(key, reason)
+    
+    def save(self):
+        """Grava as decisões em disco (arquivo temporário e troca atômica)"""
+        if not self.cache_path or not self._dirty:
+            return
+        
+        with self._lock:
+            data = {'fingerprint': self.fingerprint, 'entries': list(self._entries.items())}
+            self._dirty = False
+        
+        temp_path = self.cache_path.with_suffix('.tmp')
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            print(f"Erro ao salvar cache de exclusões: {e}")
@@ -6,16 +6,47 @@ import os
 import re
 import json
 import fnmatch
+import hashlib
+import time
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Tuple, Set, Optional
 from datetime import datetime, timedelta
 
+from .exclusion_cache import ExclusionDecisionCache
+from .exclusion_matcher import CompiledExclusionMatcher, PathMetadata, normalize_path
+from .exclusion_profiler import RuleProfiler
+from .ignore_files import IgnoreFileTree
+from .include_filter import IncludeFilter
+
+# Regras cujas decisões dependem do relógio ou de arquivos do disco: não são
+# reaproveitadas entre escaneamentos (cache de decisões e snapshots)
+VOLATILE_RULE_TYPES = frozenset({'date', 'gitignore'})
+
 class ExclusionRule:
     """Classe para representar uma regra de exclusão"""
     
+    # Alterar um destes campos depois de criada a regra (por exemplo
+    # habilitar/desabilitar) marca o perfil dono como modificado, o que
+    # invalida o matcher compilado e o cache de decisões desse perfil
+    _TRACKED_FIELDS = frozenset({'rule_type', 'pattern', 'description', 'case_sensitive', 'enabled'})
+    
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._TRACKED_FIELDS:
+            profile = self.__dict__.get('_profile')
+            if profile is not None:
+                profile.mark_modified()
+    
     def __init__(self, rule_type: str, pattern: str, description: str = "", 
                  case_sensitive: bool = False, enabled: bool = True):
-        self.rule_type = rule_type  # 'file', 'folder', 'extension', 'regex', 'size', 'date'
+        # Perfil que contém a regra (definido ao entrar no perfil)
+        self._profile: Optional['ExclusionProfile'] = None
+        # 'file', 'folder', 'folder_substring', 'extension', 'regex', 'wildcard', 'size', 'date',
+        # 'gitignore' (padrão = nome dos arquivos de exclusão, ex.: .gitignore),
+        # 'include' (padrão de inclusão relativo à raiz do escaneamento, ex.: src/**/*.py)
+        self.rule_type = rule_type
         self.pattern = pattern
         self.description = description
         self.case_sensitive = case_sensitive
@@ -56,17 +87,30 @@ class ExclusionProfile:
         self.rules: List[ExclusionRule] = []
         self.created_at = datetime.now()
         self.modified_at = datetime.now()
+        # Incrementada a cada alteração das regras ou de seus campos (invalida o matcher compilado)
+        self.version = 0
+    
+    def mark_modified(self):
+        """Registra uma alteração nas regras do perfil"""
+        self.modified_at = datetime.now()
+        self.version += 1
     
     def add_rule(self, rule: ExclusionRule):
         """Adiciona uma regra ao perfil"""
+        rule._profile = self
         self.rules.append(rule)
-        self.modified_at = datetime.now()
+        self.mark_modified()
     
     def remove_rule(self, index: int):
         """Remove uma regra do perfil"""
         if 0 <= index < len(self.rules):
             del self.rules[index]
-            self.modified_at = datetime.now()
+            self.mark_modified()
+    
+    def bind_rules(self):
+        """Associa as regras ao perfil, para que alterações nelas o marquem como modificado"""
+        for rule in self.rules:
+            rule._profile = self
     
     def get_enabled_rules(self) -> List[ExclusionRule]:
         """Retorna apenas as regras habilitadas"""
@@ -87,6 +131,7 @@ class ExclusionProfile:
         """Cria perfil a partir de dicionário"""
         profile = cls(data['name'], data.get('description', ''))
         profile.rules = [ExclusionRule.from_dict(rule_data) for rule_data in data.get('rules', [])]
+        profile.bind_rules()
         if 'created_at' in data:
             profile.created_at = datetime.fromisoformat(data['created_at'])
         if 'modified_at' in data:
@@ -96,14 +141,53 @@ class ExclusionProfile:
 class ExclusionManager:
     """Gerenciador avançado de exclusões"""
     
-    def __init__(self, config_dir: str = "config"):
+    def __init__(self, config_dir: str = "config", save_delay: float = 0.5):
         self.config_dir = Path(config_dir)
         self.config_dir.mkdir(exist_ok=True)
         self.profiles_file = self.config_dir / "exclusion_profiles.json"
         
+        # Gravação adiada dos perfis: as alterações feitas em até save_delay
+        # segundos viram uma única gravação (0 grava a cada alteração)
+        self.save_delay = save_delay
+        self._profiles_lock = threading.RLock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_pending = False
+        self._batch_depth = 0
+        
         self.profiles: Dict[str, ExclusionProfile] = {}
         self.current_profile: Optional[ExclusionProfile] = None
         
+        # Matcher compilado do perfil atual e a (perfil, versão) de que foi gerado
+        self._matcher: Optional[CompiledExclusionMatcher] = None
+        self._matcher_key: Optional[Tuple[ExclusionProfile, int]] = None
+        # Escaneamentos em paralelo avaliam de várias threads: recompilação e
+        # novos motivos acontecem sob estas travas
+        self._matcher_lock = threading.RLock()
+        self._reasons_lock = threading.Lock()
+        
+        # Motivos de exclusão internados: o id 0 é "não excluído"
+        self._reasons: List[str] = [""]
+        self._reason_ids: Dict[str, int] = {"": 0}
+        self._include_reason_id = self._intern_reason("Fora dos padrões de inclusão")
+        
+        # Padrões de inclusão do perfil atual, relativos à raiz do escaneamento
+        self._include_filter: Optional[IncludeFilter] = None
+        self._scan_root: Optional[str] = None
+        
+        # Cache de decisões por caminho; _cache_mode diz se o perfil atual pode
+        # usar o cache ('path', 'size' com o tamanho na chave, ou None)
+        self.decision_cache: Optional[ExclusionDecisionCache] = ExclusionDecisionCache()
+        self._cache_mode: Optional[str] = None
+        
+        # Perfil de desempenho por regra (None quando desligado)
+        self.profiler: Optional[RuleProfiler] = None
+        
+        # Amostras da ordem adaptativa do matcher (None quando desligada)
+        self._adaptive_sample_size: Optional[int] = None
+        
+        # Arquivos de exclusão por diretório das regras 'gitignore', por (nome, maiúsculas)
+        self._ignore_trees: Dict[Tuple[str, bool], IgnoreFileTree] = {}
+        
         # Carregar perfis salvos
         self.load_profiles()
         
@@ -188,9 +272,10 @@ class ExclusionManager:
         for rule in common_exclusions:
             default_profile.add_rule(rule)
         
-        self.profiles["Padrão"] = default_profile
-        self.current_profile = default_profile
-        self.save_profiles()
+        with self._profiles_lock:
+            self.profiles["Padrão"] = default_profile
+            self.current_profile = default_profile
+        self.schedule_save()
     
     def create_profile(self, name: str, description: str = "") -> ExclusionProfile:
         """Cria um novo perfil"""
@@ -198,8 +283,9 @@ class ExclusionManager:
             raise ValueError(f"Perfil '{name}' já existe")
         
         profile = ExclusionProfile(name, description)
-        self.profiles[name] = profile
-        self.save_profiles()
+        with self._profiles_lock:
+            self.profiles[name] = profile
+        self.schedule_save()
         return profile
     
     def delete_profile(self, name: str):
@@ -210,13 +296,14 @@ class ExclusionManager:
         if name == "Padrão":
             raise ValueError("Não é possível excluir o perfil padrão")
         
-        del self.profiles[name]
-        
-        # Se era o perfil atual, voltar para o padrão
-        if self.current_profile and self.current_profile.name == name:
-            self.current_profile = self.profiles.get("Padrão")
+        with self._profiles_lock:
+            del self.profiles[name]
+            
+            # Se era o perfil atual, voltar para o padrão
+            if self.current_profile and self.current_profile.name == name:
+                self.current_profile = self.profiles.get("Padrão")
         
-        self.save_profiles()
+        self.schedule_save()
     
     def set_current_profile(self, name: str):
         """Define o perfil atual"""
@@ -228,32 +315,332 @@ class ExclusionManager:
     def add_rule_to_current_profile(self, rule: ExclusionRule):
         """Adiciona regra ao perfil atual"""
         if self.current_profile:
-            self.current_profile.add_rule(rule)
-            self.save_profiles()
+            with self._profiles_lock:
+                self.current_profile.add_rule(rule)
+            self.schedule_save()
     
     def remove_rule_from_current_profile(self, index: int):
         """Remove regra do perfil atual"""
         if self.current_profile:
-            self.current_profile.remove_rule(index)
-            self.save_profiles()
+            with self._profiles_lock:
+                self.current_profile.remove_rule(index)
+            self.schedule_save()
+    
+    def get_profile_fingerprint(self) -> str:
+        """Retorna hash do conteúdo das regras ativas do perfil atual"""
+        if not self.current_profile:
+            return ""
+        
+        rules_data = [
+            [rule.rule_type, rule.pattern, rule.description, rule.case_sensitive]
+            for rule in self.current_profile.get_enabled_rules()
+        ]
+        encoded = json.dumps(rules_data, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()
+    
+    def allows_snapshot_reuse(self) -> bool:
+        """
+        Indica se as decisões gravadas num escaneamento anterior continuam
+        válidas. Regras 'gitignore' leem arquivos que podem ser editados sem
+        mudar o mtime do diretório nem a impressão digital do perfil, e regras
+        'date' são relativas ao momento do escaneamento.
+        """
+        if not self.current_profile:
+            return True
+        return not any(rule.rule_type in VOLATILE_RULE_TYPES
+                       for rule in self.current_profile.get_enabled_rules())
     
-    def should_exclude_path(self, file_path: str, is_directory: bool = False) -> Tuple[bool, str]:
+    def should_exclude_path(self, file_path: str, is_directory: bool = False,
+                            metadata: Optional[PathMetadata] = None) -> Tuple[bool, str]:
         """
         Verifica se um caminho deve ser excluído
+        metadata traz tamanho/data já obtidos pelo chamador (evita novo stat)
         Retorna (should_exclude, reason)
         """
         if not self.current_profile:
             return False, ""
         
-        path_obj = Path(file_path)
+        reason_id = self._path_reason_id(self.get_matcher(), file_path, is_directory, metadata)
+        return reason_id != 0, self._reasons[reason_id]
+    
+    def should_exclude_paths(self, entries) -> List[Tuple[bool, str]]:
+        """
+        Versão em lote de should_exclude_path para entradas
+        (caminho, é_diretório, metadados ou None)
+        """
+        if not self.current_profile:
+            return [(False, "") for _ in entries]
+        
+        matcher = self.get_matcher()
+        return [(reason_id != 0, self._reasons[reason_id])
+                for reason_id in (self._path_reason_id(matcher, file_path, is_directory, metadata)
+                                  for file_path, is_directory, metadata in entries)]
+    
+    def evaluate_directory(self, parent_path: str, entries) -> List[Tuple[bool, int]]:
+        """
+        Avalia de uma vez a listagem de um diretório: entries traz
+        (nome, é_diretório, metadados ou None) de cada filho de parent_path.
+        Retorna (excluído, id do motivo) por entrada; get_exclusion_reason
+        converte o id no texto do motivo, que não é formatado por entrada.
+        """
+        if not self.current_profile:
+            return [(False, 0)] * len(entries)
+        
+        matcher = self.get_matcher()
+        if not self._cache_usable():
+            return self._evaluate_listing(matcher, parent_path, entries)
+        
+        cache = self.decision_cache
+        parent_str = normalize_path(parent_path)
+        prefix = parent_str if parent_str.endswith(os.sep) else parent_str + os.sep
+        keys = [self._decision_key(prefix + name, is_directory, metadata)
+                for name, is_directory, metadata in entries]
+        
+        results = [None] * len(entries)
+        pending = []
+        for position, key in enumerate(keys):
+            reason = cache.get(key) if key is not None else None
+            if reason is None:
+                pending.append(position)
+            else:
+                reason_id = self._intern_reason(reason)
+                results[position] = (reason_id != 0, reason_id)
+        
+        if pending:
+            computed = self._evaluate_listing(matcher, parent_path,
+                                              [entries[position] for position in pending])
+            for position, result in zip(pending, computed):
+                results[position] = result
+                if keys[position] is not None:
+                    cache.put(keys[position], self._reasons[result[1]])
+        return results
+    
+    def _evaluate_listing(self, matcher: CompiledExclusionMatcher, parent_path: str,
+                          entries) -> List[Tuple[bool, int]]:
+        reason_ids = matcher.reason_ids
+        if self.profiler is not None:
+            indexes = [self._match_index(matcher, os.path.join(parent_path, name), is_directory, metadata)
+                       for name, is_directory, metadata in entries]
+        else:
+            indexes = matcher.match_listing(parent_path, entries)
+        results = [(reason_ids[index] != 0, reason_ids[index]) for index in indexes]
         
-        for rule in self.current_profile.get_enabled_rules():
-            if self._matches_rule(path_obj, rule, is_directory):
-                return True, f"Regra: {rule.description or rule.pattern}"
+        # Padrões de inclusão: o caminho relativo do pai é calculado uma vez
+        relative_parent = self._relative_to_scan_root(parent_path)
+        if relative_parent is not None:
+            prefix = relative_parent + '/' if relative_parent else ''
+            include_filter = self._include_filter
+            for position, ((name, is_directory, _), (excluded, _)) in enumerate(zip(entries, results)):
+                if not excluded and include_filter.is_excluded(prefix + name, is_directory):
+                    results[position] = (True, self._include_reason_id)
+        return results
+    
+    def get_exclusion_reason(self, reason_id: int) -> str:
+        """Texto do motivo de exclusão de um id devolvido por evaluate_directory"""
+        return self._reasons[reason_id]
+    
+    def _path_reason_id(self, matcher: CompiledExclusionMatcher, file_path, is_directory: bool,
+                        metadata: Optional[PathMetadata]) -> int:
+        """Id do motivo de exclusão de um caminho: regras do perfil e depois padrões de inclusão"""
+        key = None
+        if self._cache_usable():
+            key = self._decision_key(normalize_path(file_path), is_directory, metadata)
+            if key is not None:
+                reason = self.decision_cache.get(key)
+                if reason is not None:
+                    return self._intern_reason(reason)
+        
+        reason_id = matcher.reason_ids[self._match_index(matcher, file_path, is_directory, metadata)]
+        if reason_id == 0:
+            relative = self._relative_to_scan_root(file_path)
+            if relative and self._include_filter.is_excluded(relative, is_directory):
+                reason_id = self._include_reason_id
         
-        return False, ""
+        if key is not None:
+            self.decision_cache.put(key, self._reasons[reason_id])
+        return reason_id
+    
+    def _relative_to_scan_root(self, path) -> Optional[str]:
+        """
+        Caminho relativo à raiz do escaneamento, separado por '/', se houver
+        padrões de inclusão e o caminho estiver sob a raiz; senão None
+        """
+        root = self._scan_root
+        if self._include_filter is None or root is None:
+            return None
+        path = os.path.abspath(path)
+        if path == root:
+            return ''
+        prefix = root if root.endswith(os.sep) else root + os.sep
+        if not path.startswith(prefix):
+            return None
+        relative = path[len(prefix):]
+        return relative.replace(os.sep, '/') if os.sep != '/' else relative
     
-    def _matches_rule(self, path: Path, rule: ExclusionRule, is_directory: bool) -> bool:
+    def begin_scan(self, root_path):
+        """
+        Prepara um novo escaneamento de root_path: os arquivos .gitignore são
+        relidos e os padrões de inclusão passam a ser relativos a essa raiz
+        """
+        # Compila o matcher antes de o escaneamento (talvez em paralelo) começar
+        if self.current_profile:
+            self.get_matcher()
+        self.clear_ignore_files()
+        self._scan_root = os.path.abspath(root_path)
+        if self._include_filter is not None:
+            self._include_filter.clear()
+            self._update_cache_fingerprint()
+    
+    def _match_index(self, matcher: CompiledExclusionMatcher, file_path, is_directory: bool,
+                     metadata: Optional[PathMetadata]) -> int:
+        """
+        Posição da regra que exclui o caminho. Com o perfil de desempenho
+        ligado, as regras são avaliadas uma a uma na ordem do perfil e cada
+        avaliação é cronometrada; a decisão é a mesma do matcher compilado.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return matcher.match_index(file_path, is_directory, metadata)
+        
+        path = Path(file_path)
+        samples = []
+        found = len(matcher.rules)
+        for index, rule in enumerate(matcher.rules):
+            if rule.rule_type == 'include':
+                continue
+            start = time.perf_counter_ns()
+            hit = self._matches_rule(path, rule, is_directory, metadata)
+            samples.append((rule, hit, time.perf_counter_ns() - start))
+            if hit:
+                found = index
+                break
+        profiler.record(samples)
+        return found
+    
+    def enable_profiling(self, enabled: bool = True):
+        """Liga ou desliga a contagem de avaliações, acertos e tempo por regra"""
+        if not enabled:
+            self.profiler = None
+        elif self.profiler is None:
+            self.profiler = RuleProfiler()
+    
+    def reset_profiling(self):
+        """Zera os contadores do perfil de desempenho"""
+        if self.profiler is not None:
+            self.profiler.reset()
+    
+    def export_profiling_report(self, file_path: str):
+        """Grava em JSON o relatório do perfil de desempenho das regras"""
+        if self.profiler is None:
+            raise ValueError("Perfil de desempenho das regras não está ligado")
+        self.profiler.export_report(file_path)
+    
+    def enable_adaptive_ordering(self, enabled: bool = True, sample_size: int = 2000):
+        """
+        Liga ou desliga a ordem adaptativa do matcher: as primeiras
+        sample_size avaliações medem custo e seletividade de cada etapa e a
+        avaliação passa a seguir a ordem de menor custo esperado. A ordem das
+        regras no perfil e o motivo informado não mudam.
+        """
+        self._adaptive_sample_size = sample_size if enabled else None
+        # Recompila: o matcher atual pode estar na outra ordem
+        self._matcher_key = None
+    
+    def get_ignore_tree(self, file_name: str = ".gitignore",
+                        case_sensitive: bool = True) -> IgnoreFileTree:
+        """Arquivos de exclusão com o nome dado, carregados sob demanda e reaproveitados"""
+        key = (file_name or ".gitignore", bool(case_sensitive))
+        tree = self._ignore_trees.get(key)
+        if tree is None:
+            # setdefault: threads que chegam juntas recebem a mesma árvore
+            tree = self._ignore_trees.setdefault(key, IgnoreFileTree(*key))
+        return tree
+    
+    def clear_ignore_files(self):
+        """Descarta os arquivos de exclusão carregados; são relidos na próxima avaliação"""
+        for tree in self._ignore_trees.values():
+            tree.clear()
+    
+    def _intern_reason(self, reason: str) -> int:
+        reason_id = self._reason_ids.get(reason)
+        if reason_id is None:
+            with self._reasons_lock:
+                reason_id = self._reason_ids.get(reason)
+                if reason_id is None:
+                    # O texto entra na lista antes de o id ficar visível a outras threads
+                    self._reasons.append(reason)
+                    reason_id = self._reason_ids[reason] = len(self._reasons) - 1
+        return reason_id
+    
+    def get_matcher(self) -> CompiledExclusionMatcher:
+        """Matcher compilado do perfil atual, refeito só quando as regras mudam"""
+        profile = self.current_profile
+        key = self._matcher_key
+        if key is not None and key[0] is profile and key[1] == profile.version:
+            return self._matcher
+        
+        with self._matcher_lock:
+            # Outra thread pode ter recompilado enquanto esta esperava
+            key = self._matcher_key
+            if key is not None and key[0] is profile and key[1] == profile.version:
+                return self._matcher
+            
+            # Regras inseridas direto na lista também passam a avisar o perfil
+            profile.bind_rules()
+            matcher = CompiledExclusionMatcher(profile.get_enabled_rules(), self._matches_rule)
+            # Posição da regra -> id do motivo; a última posição é "nenhuma regra".
+            # Fica no próprio matcher, então quem o obteve usa os motivos das mesmas regras
+            matcher.reason_ids = [
+                self._intern_reason(f"Regra: {rule.description or rule.pattern}")
+                for rule in matcher.rules
+            ] + [0]
+            self._include_filter = IncludeFilter.from_rules(matcher.rules)
+            if self._adaptive_sample_size:
+                matcher.enable_adaptive_order(self._adaptive_sample_size)
+            
+            # Regras de data dependem do relógio e .gitignore do disco: sem cache
+            rule_types = {rule.rule_type for rule in matcher.rules}
+            if rule_types & VOLATILE_RULE_TYPES:
+                self._cache_mode = None
+            else:
+                self._cache_mode = 'size' if 'size' in rule_types else 'path'
+            
+            self._update_cache_fingerprint()
+            self._matcher = matcher
+            self._matcher_key = (profile, profile.version)
+        return matcher
+    
+    def _update_cache_fingerprint(self):
+        """Associa o cache de decisões às regras atuais (e à raiz, com padrões de inclusão)"""
+        if self.decision_cache is None or self._cache_mode is None or not self.current_profile:
+            return
+        fingerprint = self.get_profile_fingerprint()
+        if self._include_filter is not None:
+            fingerprint += f"|{self._scan_root}"
+        self.decision_cache.set_fingerprint(fingerprint)
+    
+    def _cache_usable(self) -> bool:
+        """Se as decisões do perfil atual podem vir do cache (nunca com o perfil de desempenho ligado)"""
+        return self._cache_mode is not None and self.decision_cache is not None and self.profiler is None
+    
+    def _decision_key(self, path_str: str, is_directory: bool,
+                      metadata: Optional[PathMetadata]) -> Optional[str]:
+        """Chave do cache para um caminho já normalizado, ou None se faltar o tamanho"""
+        if is_directory:
+            return 'd' + path_str
+        if self._cache_mode == 'size':
+            if metadata is None or metadata.size is None:
+                return None
+            return f"f{path_str}|{metadata.size}"
+        return 'f' + path_str
+    
+    def save_decision_cache(self):
+        """Grava em disco o cache de decisões (se for persistente)"""
+        if self.decision_cache is not None:
+            self.decision_cache.save()
+    
+    def _matches_rule(self, path: Path, rule: ExclusionRule, is_directory: bool,
+                      metadata: Optional[PathMetadata] = None) -> bool:
         """Verifica se um caminho corresponde a uma regra"""
         pattern = rule.pattern
         if not rule.case_sensitive:
@@ -268,7 +655,16 @@ class ExclusionManager:
             return not is_directory and (path_str == pattern or name == pattern)
         
         elif rule.rule_type == 'folder':
-            return is_directory and (path_str == pattern or name == pattern or pattern in path_str)
+            # Compara componentes do caminho: 'env' não exclui 'environment'
+            if not is_directory:
+                return False
+            if path_str == pattern or name == pattern:
+                return True
+            return os.sep in pattern and path_str.endswith(os.sep + pattern)
+        
+        elif rule.rule_type == 'folder_substring':
+            # Semântica antiga, por trecho do caminho (opcional)
+            return is_directory and pattern in path_str
         
         elif rule.rule_type == 'extension':
             if is_directory:
@@ -288,18 +684,27 @@ class ExclusionManager:
         elif rule.rule_type == 'wildcard':
             return fnmatch.fnmatch(path_str, pattern)
         
+        elif rule.rule_type == 'gitignore':
+            return self.get_ignore_tree(rule.pattern, rule.case_sensitive).is_ignored(path, is_directory)
+        
         elif rule.rule_type == 'size':
             if is_directory:
                 return False
             try:
-                file_size = path.stat().st_size
+                if metadata is not None and metadata.size is not None:
+                    file_size = metadata.size
+                else:
+                    file_size = path.stat().st_size
                 return self._matches_size_pattern(file_size, pattern)
             except (OSError, ValueError):
                 return False
         
         elif rule.rule_type == 'date':
             try:
-                file_mtime = datetime.fromtimestamp(path.stat().st_mtime)
+                if metadata is not None and metadata.mtime is not None:
+                    file_mtime = datetime.fromtimestamp(metadata.mtime)
+                else:
+                    file_mtime = datetime.fromtimestamp(path.stat().st_mtime)
                 return self._matches_date_pattern(file_mtime, pattern)
             except (OSError, ValueError):
                 return False
@@ -447,6 +852,7 @@ class ExclusionManager:
         excluded = []
         included = []
         count = 0
+        self.begin_scan(root_path)
         
         for root, dirs, files in os.walk(root_path):
             if count >= max_items:
@@ -490,19 +896,134 @@ class ExclusionManager:
             'truncated': count >= max_items
         }
     
-    def save_profiles(self):
-        """Salva os perfis no arquivo de configuração"""
-        try:
-            data = {
-                'profiles': {name: profile.to_dict() for name, profile in self.profiles.items()},
-                'current_profile': self.current_profile.name if self.current_profile else None
-            }
+    def save_profiles(self) -> bool:
+        """
+        Salva os perfis no arquivo de configuração imediatamente. A gravação
+        passa por um arquivo temporário sincronizado com o disco e trocado
+        pelo definitivo, então uma falha no meio não corrompe o arquivo.
+        Se a gravação falhar, as alterações continuam pendentes para uma
+        nova tentativa (flush_profiles). Retorna se gravou.
+        """
+        # A trava cobre também a escrita: gravações concorrentes não se
+        # intercalam e uma versão antiga nunca substitui uma mais nova
+        with self._profiles_lock:
+            self._cancel_scheduled_save()
+            self._save_pending = False
+            temp_path = self.profiles_file.with_suffix('.tmp')
+            try:
+                data = {
+                    'profiles': {name: profile.to_dict() for name, profile in self.profiles.items()},
+                    'current_profile': self.current_profile.name if self.current_profile else None
+                }
+                
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.profiles_file)
+                self._sync_config_dir()
+                return True
             
-            with open(self.profiles_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            except Exception as e:
+                print(f"Erro ao salvar perfis: {e}")
+                self._save_pending = True
+                try:
+                    temp_path.unlink()
+                except OSError:
+                    pass
+                return False
+    
+    def _sync_config_dir(self):
+        """Sincroniza a entrada do diretório após a troca (onde o sistema permitir)"""
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        try:
+            fd = os.open(self.config_dir, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def schedule_save(self):
+        """
+        Agenda a gravação dos perfis para daqui a save_delay segundos. As
+        alterações feitas até lá entram na mesma gravação; dentro de
+        batch_updates a gravação fica para o fim do lote.
+        """
+        with self._profiles_lock:
+            self._save_pending = True
+            if self._batch_depth or self._save_timer is not None:
+                return
+            if self.save_delay > 0:
+                self._save_timer = threading.Timer(self.save_delay, self.flush_profiles)
+                self._save_timer.start()
+                return
+        self.save_profiles()
+    
+    def flush_profiles(self) -> bool:
+        """Grava agora as alterações pendentes (fora de um lote); retorna se gravou"""
+        with self._profiles_lock:
+            if self._save_timer is threading.current_thread():
+                self._save_timer = None
+            if not self._save_pending or self._batch_depth:
+                return False
+        return self.save_profiles()
+    
+    @property
+    def has_pending_save(self) -> bool:
+        """Se há alterações nos perfis ainda não gravadas"""
+        return self._save_pending
+    
+    def _cancel_scheduled_save(self):
+        timer = self._save_timer
+        self._save_timer = None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+    
+    @contextmanager
+    def batch_updates(self):
+        """
+        Agrupa alterações em massa (por exemplo importar centenas de regras):
+        os perfis são gravados uma única vez, ao fim do lote. Se o bloco
+        lançar uma exceção, os perfis voltam ao estado do início do lote e
+        nada é gravado por ele.
+        """
+        with self._profiles_lock:
+            snapshot = (
+                {name: profile.to_dict() for name, profile in self.profiles.items()},
+                self.current_profile.name if self.current_profile else None,
+                self._save_pending
+            )
+            self._batch_depth += 1
         
-        except Exception as e:
-            print(f"Erro ao salvar perfis: {e}")
+        try:
+            yield self
+        except BaseException:
+            with self._profiles_lock:
+                self._batch_depth -= 1
+                self._restore_profiles(*snapshot)
+                # Alterações anteriores ao lote continuam pendentes
+                resume = not self._batch_depth and self._save_pending and self._save_timer is None
+            if resume:
+                self.schedule_save()
+            raise
+        
+        with self._profiles_lock:
+            self._batch_depth -= 1
+            if self._batch_depth:
+                return
+        self.flush_profiles()
+    
+    def _restore_profiles(self, profiles_data: Dict[str, Dict], current_name: Optional[str],
+                          save_pending: bool):
+        """Reconstrói os perfis a partir de um retrato tirado por batch_updates"""
+        self.profiles = {name: ExclusionProfile.from_dict(data) for name, data in profiles_data.items()}
+        self.current_profile = self.profiles.get(current_name) if current_name else None
+        self._save_pending = save_pending
     
     def load_profiles(self):
         """Carrega os perfis do arquivo de configuração"""
@@ -550,8 +1071,9 @@ class ExclusionManager:
             profile.name = f"{original_name} ({counter})"
             counter += 1
         
-        self.profiles[profile.name] = profile
-        self.save_profiles()
+        with self._profiles_lock:
+            self.profiles[profile.name] = profile
+        self.schedule_save()
         
         return profile.name
     
@@ -571,7 +1093,12 @@ class ExclusionManager:
             'total_rules': total_rules,
             'enabled_rules': enabled_rules,
             'rule_types': rule_types,
-            'current_profile': self.current_profile.name if self.current_profile else None
+            'current_profile': self.current_profile.name if self.current_profile else None,
+            'rule_profile': self.profiler.get_report() if self.profiler is not None else None,
+            'adaptive_order': (self._matcher.get_adaptive_order()
+                               if self._adaptive_sample_size and self._matcher is not None else None),
+            'decision_cache': (self.decision_cache.get_statistics()
+                               if self.decision_cache is not None else None)
         }
 
     def apply_auto_exclusions(self, config_manager=None):
@@ -596,13 +1123,14 @@ class ExclusionManager:
                         ExclusionRule('folder', 'env', 'Ambiente virtual Python (env)'),
                     ]
                     
-                    for rule in missing_exclusions:
-                        # Verificar se já não existe
-                        if not any(existing.pattern == rule.pattern and existing.rule_type == rule.rule_type 
-                                  for existing in default_profile.rules):
-                            default_profile.add_rule(rule)
+                    with self._profiles_lock:
+                        for rule in missing_exclusions:
+                            # Verificar se já não existe
+                            if not any(existing.pattern == rule.pattern and existing.rule_type == rule.rule_type 
+                                      for existing in default_profile.rules):
+                                default_profile.add_rule(rule)
                     
-                    self.save_profiles()
+                    self.schedule_save()
             
             # Garantir que o perfil padrão está ativo
             if not self.current_profile or self.current_profile.name != "Padrão":
@@ -0,0 +1,528 @@
+"""
+Módulo de avaliação compilada de regras de exclusão para UltraTexto Pro
+"""
+
+import os
+import re
+import time
+import fnmatch
+import threading
+from pathlib import Path, PurePath
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .exclusion_profiler import RuleProfiler
+
+_SEPARATOR = re.escape(os.sep)
+
+# Caminhos que str(Path(caminho)) escreveria de outro jeito
+_NEEDS_NORMALIZATION = re.compile(
+    rf"^$|^\.{_SEPARATOR}|{_SEPARATOR}{_SEPARATOR}|{_SEPARATOR}\.{_SEPARATOR}|"
+    rf"{_SEPARATOR}\.$|.{_SEPARATOR}$"
+)
+
+# Construções que não sobrevivem à junção de várias expressões em uma só
+# (referências a grupos por número ou nome, flags globais, condicionais)
+_UNSAFE_TO_COMBINE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(|\(\?[aiLmsux]+\)")
+
+class PathMetadata(NamedTuple):
+    """
+    Metadados de uma entrada já obtidos pelo chamador. Regras de tamanho e
+    data usam estes valores em vez de fazer um novo stat; campos None são
+    obtidos com um único stat, compartilhado por todas as regras.
+    """
+    size: Optional[int] = None
+    mtime: Optional[float] = None
+    inode: Optional[int] = None
+    
+    @classmethod
+    def from_stat(cls, stat_result: os.stat_result) -> 'PathMetadata':
+        return cls(stat_result.st_size, stat_result.st_mtime, stat_result.st_ino)
+
+def normalize_path(path) -> str:
+    """Equivale a str(Path(path)), sem criar um Path para caminhos já normalizados"""
+    if isinstance(path, PurePath):
+        return str(path)
+    text = os.fspath(path)
+    if (os.altsep and os.altsep in text) or _NEEDS_NORMALIZATION.search(text):
+        return str(Path(text))
+    return text
+
+def path_suffix(name: str) -> str:
+    """Equivale a Path(name).suffix"""
+    index = name.rfind('.')
+    if 0 < index < len(name) - 1:
+        return name[index:]
+    return ''
+
+class _PatternGroup:
+    """
+    Expressões de várias regras unidas em uma alternância com grupos
+    nomeados pela posição da regra. Em re.match a primeira alternativa que
+    casa vence, ou seja, a regra de menor posição.
+    """
+    
+    def __init__(self, flags: int = 0):
+        self.flags = flags
+        self._entries: List[Tuple[int, str]] = []
+        self._combined = None
+        self._separate: List[Tuple[int, re.Pattern]] = []
+    
+    def add(self, index: int, source: str):
+        self._entries.append((index, source))
+    
+    @property
+    def first_index(self) -> Optional[int]:
+        """Menor posição de regra do grupo, ou None se estiver vazio"""
+        return min((index for index, _ in self._entries), default=None)
+    
+    def compile(self):
+        combined = []
+        for index, source in self._entries:
+            try:
+                compiled = re.compile(source, self.flags)
+            except re.error:
+                # Expressão inválida nunca corresponde (como na avaliação regra a regra)
+                continue
+            if _UNSAFE_TO_COMBINE.search(source):
+                self._separate.append((index, compiled))
+            else:
+                combined.append(f"(?P<r{index}>{source})")
+        if combined:
+            self._combined = re.compile("|".join(combined), self.flags)
+    
+    def first_match(self, subject: str, best: int) -> int:
+        """Menor posição de regra (abaixo de best) cuja expressão casa com subject"""
+        if self._combined is not None:
+            match = self._combined.match(subject)
+            if match:
+                best = min(best, int(match.lastgroup[1:]))
+        for index, compiled in self._separate:
+            if index >= best:
+                break
+            if compiled.match(subject):
+                return index
+        return best
+
+class _Stage:
+    """
+    Uma etapa da avaliação compilada na ordem adaptativa: uma estrutura de
+    busca (nomes, extensões, alternância) ou uma regra avaliada sozinha.
+    first_index é a menor posição de regra que a etapa pode devolver; se
+    outra etapa já achou uma regra anterior, esta é pulada.
+    """
+    
+    __slots__ = ('label', 'first_index', 'run')
+    
+    def __init__(self, label: str, first_index: int, run: Callable):
+        self.label = label
+        self.first_index = first_index
+        self.run = run
+
+class _StageContext:
+    """Caminho em avaliação e o que as etapas calculam sob demanda para ele"""
+    
+    __slots__ = ('path_str', 'is_directory', 'metadata', '_path')
+    
+    def __init__(self, path_str: str, is_directory: bool, metadata: Optional[PathMetadata]):
+        self.path_str = path_str
+        self.is_directory = is_directory
+        self.metadata = metadata
+        self._path = None
+    
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = Path(self.path_str)
+        return self._path
+
+class CompiledExclusionMatcher:
+    """
+    Regras habilitadas de um perfil pré-processadas para avaliação rápida.
+    Nomes de arquivo, de pasta e extensões viram dicionários, trechos de
+    pasta um pré-filtro por expressão única, regex e curingas alternâncias
+    compiladas. O resultado é
+    a mesma regra que a avaliação em ordem encontraria primeiro; regras de
+    tamanho e data, que dependem de stat, e regras gitignore só são
+    avaliadas se vierem antes da melhor regra já encontrada.
+    
+    Na ordem adaptativa (enable_adaptive_order) as etapas da avaliação são
+    medidas nas primeiras avaliações e depois reordenadas pelo custo
+    esperado. Como cada etapa só devolve regras de posição menor que a
+    melhor já encontrada, a regra escolhida continua a de menor posição.
+    """
+    
+    def __init__(self, rules: List,
+                 evaluate_rule: Callable[[Path, object, bool, Optional[PathMetadata]], bool]):
+        self.rules = list(rules)
+        self._evaluate_rule = evaluate_rule
+        # Id do motivo de exclusão por posição de regra, mais 0 ("nenhuma
+        # regra") no fim; preenchido pelo gerenciador que criou o matcher
+        self.reason_ids: List[int] = [0] * (len(self.rules) + 1)
+        
+        self._file_names: Dict[bool, Dict[str, int]] = {True: {}, False: {}}
+        self._extensions: Dict[bool, Dict[str, int]] = {True: {}, False: {}}
+        self._folder_names: Dict[bool, Dict[str, int]] = {True: {}, False: {}}
+        self._folder_suffixes: Dict[bool, List[Tuple[int, str]]] = {True: [], False: []}
+        self._folders: Dict[bool, List[Tuple[int, str]]] = {True: [], False: []}
+        self._regexes = {True: _PatternGroup(0), False: _PatternGroup(re.IGNORECASE)}
+        self._wildcards = {True: _PatternGroup(0), False: _PatternGroup(0)}
+        self._stat_rules: List[int] = []
+        self._date_rules = set()
+        # Regras avaliadas uma a uma por evaluate_rule, em ordem
+        self._deferred_rules: List[int] = []
+        
+        for index, rule in enumerate(self.rules):
+            case_sensitive = bool(rule.case_sensitive)
+            pattern = rule.pattern if case_sensitive else rule.pattern.lower()
+            
+            if rule.rule_type == 'file':
+                self._file_names[case_sensitive].setdefault(pattern, index)
+            elif rule.rule_type == 'folder':
+                # Nome da pasta (ou caminho completo); com separador, também o final do caminho
+                self._folder_names[case_sensitive].setdefault(pattern, index)
+                if os.sep in pattern:
+                    self._folder_suffixes[case_sensitive].append((index, os.sep + pattern))
+            elif rule.rule_type == 'folder_substring':
+                self._folders[case_sensitive].append((index, pattern))
+            elif rule.rule_type == 'extension':
+                extensions = self._extensions[case_sensitive]
+                extensions.setdefault(pattern, index)
+                extensions.setdefault(f".{pattern.lstrip('.')}", index)
+            elif rule.rule_type == 'regex':
+                self._regexes[case_sensitive].add(index, pattern)
+            elif rule.rule_type == 'wildcard':
+                self._wildcards[case_sensitive].add(index, fnmatch.translate(os.path.normcase(pattern)))
+            elif rule.rule_type in ('size', 'date'):
+                self._stat_rules.append(index)
+                self._deferred_rules.append(index)
+                if rule.rule_type == 'date':
+                    self._date_rules.add(index)
+            elif rule.rule_type == 'gitignore':
+                self._deferred_rules.append(index)
+        
+        for group in list(self._regexes.values()) + list(self._wildcards.values()):
+            group.compile()
+        
+        # Passadas necessárias: com e/ou sem distinção de maiúsculas
+        self._case_modes = sorted({bool(rule.case_sensitive) for rule in self.rules
+                                   if rule.rule_type not in ('size', 'date', 'gitignore', 'include')})
+        
+        # Pré-filtro: só percorre as regras de trecho de pasta se alguma ocorrer no caminho
+        self._folder_filters = {
+            case_sensitive: re.compile("|".join(re.escape(pattern) for _, pattern in folders))
+            for case_sensitive, folders in self._folders.items() if folders
+        }
+        
+        # Ordem adaptativa das etapas, por tipo de entrada (None: ordem fixa de _first_rule)
+        self._stage_orders: Optional[Dict[bool, List[_Stage]]] = None
+        self._stage_profilers: Dict[bool, RuleProfiler] = {}
+        self._samples_left = 0
+        # Protege a contagem de amostras e a troca de ordem (escaneamento em paralelo)
+        self._stage_lock = threading.Lock()
+        self._stage_order_optimized = False
+    
+    def match(self, file_path, is_directory: bool = False,
+              metadata: Optional[PathMetadata] = None):
+        """Primeira regra que exclui o caminho, ou None"""
+        index = self.match_index(file_path, is_directory, metadata)
+        return self.rules[index] if index < len(self.rules) else None
+    
+    def match_index(self, file_path, is_directory: bool = False,
+                    metadata: Optional[PathMetadata] = None) -> int:
+        """Posição da primeira regra que exclui o caminho (len(rules) se nenhuma)"""
+        path_str = normalize_path(file_path)
+        return self._first_rule(path_str, path_str.rpartition(os.sep)[2], None,
+                                is_directory, metadata)
+    
+    def match_listing(self, parent_path, entries: Iterable[Tuple[str, bool, Optional[PathMetadata]]]
+                      ) -> List[int]:
+        """
+        match_index para cada (nome, é_diretório, metadados) da listagem de
+        parent_path. O caminho do pai é normalizado e convertido para
+        minúsculas uma única vez para toda a listagem.
+        """
+        parent_str = normalize_path(parent_path)
+        prefix = parent_str if parent_str.endswith(os.sep) else parent_str + os.sep
+        prefix_lower = prefix.lower() if False in self._case_modes else None
+        first_rule = self._first_rule
+        return [first_rule(prefix + name, name, prefix_lower, is_directory, metadata)
+                for name, is_directory, metadata in entries]
+    
+    def _first_rule(self, path_str: str, name: str, prefix_lower: Optional[str],
+                    is_directory: bool, metadata: Optional[PathMetadata]) -> int:
+        best = len(self.rules)
+        
+        for case_sensitive in self._case_modes:
+            if case_sensitive:
+                subject_path, subject_name = path_str, name
+            elif prefix_lower is not None:
+                subject_name = name.lower()
+                subject_path = prefix_lower + subject_name
+            else:
+                subject_path, subject_name = path_str.lower(), name.lower()
+            
+            if is_directory:
+                folder_names = self._folder_names[case_sensitive]
+                if folder_names:
+                    best = min(best, folder_names.get(subject_path, best),
+                               folder_names.get(subject_name, best))
+                for index, suffix in self._folder_suffixes[case_sensitive]:
+                    if index >= best:
+                        break
+                    if subject_path.endswith(suffix):
+                        best = index
+                        break
+                
+                folder_filter = self._folder_filters.get(case_sensitive)
+                if folder_filter is not None and folder_filter.search(subject_path):
+                    for index, pattern in self._folders[case_sensitive]:
+                        if index >= best:
+                            break
+                        if pattern in subject_path:
+                            best = index
+                            break
+            else:
+                file_names = self._file_names[case_sensitive]
+                if file_names:
+                    best = min(best, file_names.get(subject_path, best),
+                               file_names.get(subject_name, best))
+                
+                extensions = self._extensions[case_sensitive]
+                if extensions:
+                    best = min(best, extensions.get(path_suffix(subject_name), best))
+            
+            best = self._regexes[case_sensitive].first_match(subject_path, best)
+            best = self._wildcards[case_sensitive].first_match(os.path.normcase(subject_path), best)
+        
+        reachable = [index for index in self._deferred_rules if index < best]
+        if reachable:
+            path_obj = Path(path_str)
+            stat_reachable = [index for index in self._stat_rules if index < best]
+            if stat_reachable:
+                metadata = self._complete_metadata(path_obj, stat_reachable, is_directory, metadata)
+            for index in reachable:
+                if self._evaluate_rule(path_obj, self.rules[index], is_directory, metadata):
+                    best = index
+                    break
+        
+        return best
+    
+    def _complete_metadata(self, path: Path, indexes: List[int], is_directory: bool,
+                           metadata: Optional[PathMetadata]) -> Optional[PathMetadata]:
+        """Faz um único stat se alguma regra alcançável precisar de um campo ausente"""
+        needs_mtime = any(index in self._date_rules for index in indexes)
+        needs_size = not is_directory and len(self._date_rules.intersection(indexes)) < len(indexes)
+        if metadata is not None:
+            needs_mtime = needs_mtime and metadata.mtime is None
+            needs_size = needs_size and metadata.size is None
+        if not (needs_mtime or needs_size):
+            return metadata
+        
+        try:
+            stat_result = path.stat()
+        except (OSError, ValueError):
+            return metadata
+        if metadata is None:
+            return PathMetadata.from_stat(stat_result)
+        return PathMetadata(
+            metadata.size if metadata.size is not None else stat_result.st_size,
+            metadata.mtime if metadata.mtime is not None else stat_result.st_mtime,
+            metadata.inode if metadata.inode is not None else stat_result.st_ino
+        )
+    
+    def enable_adaptive_order(self, sample_size: int = 2000):
+        """
+        Passa a avaliar por etapas: as próximas sample_size avaliações de
+        cada tipo de entrada executam e cronometram todas as etapas; depois
+        elas são ordenadas pelo custo médio dividido pela taxa de acerto,
+        para que as etapas baratas e seletivas descartem as demais cedo
+        """
+        stages = self._build_stages()
+        self._stage_orders = {
+            is_directory: [stage for applies_to, stage in stages if applies_to in (None, is_directory)]
+            for is_directory in (True, False)
+        }
+        self._stage_profilers = {True: RuleProfiler(), False: RuleProfiler()}
+        self._samples_left = max(1, sample_size)
+        self._stage_order_optimized = False
+        self._first_rule = self._first_rule_adaptive
+    
+    def get_adaptive_order(self) -> Optional[Dict]:
+        """Ordem atual das etapas com as medições de cada uma, ou None se desligada"""
+        if self._stage_orders is None:
+            return None
+        
+        def describe(stage: _Stage, profiler: RuleProfiler) -> Dict:
+            evaluations, hits, total_ns = profiler.get_counters(stage)
+            return {
+                'stage': stage.label,
+                'first_rule': stage.first_index,
+                'evaluations': evaluations,
+                'hits': hits,
+                'mean_ns': total_ns / evaluations if evaluations else 0.0
+            }
+        
+        return {
+            'optimized': self._stage_order_optimized,
+            'samples_remaining': max(0, self._samples_left),
+            'directories': [describe(stage, self._stage_profilers[True])
+                            for stage in self._stage_orders[True]],
+            'files': [describe(stage, self._stage_profilers[False])
+                      for stage in self._stage_orders[False]]
+        }
+    
+    def _build_stages(self) -> List[Tuple[Optional[bool], _Stage]]:
+        """Etapas da avaliação com o tipo de entrada a que se aplicam (None: ambos)"""
+        stages = []
+        
+        def add(applies_to: Optional[bool], label: str, first_index: Optional[int], run: Callable):
+            if first_index is not None:
+                stages.append((applies_to, _Stage(label, first_index, run)))
+        
+        for case_sensitive in self._case_modes:
+            suffix = '' if case_sensitive else ' (sem maiúsculas)'
+            for applies_to, kind, names in ((True, 'folder', self._folder_names[case_sensitive]),
+                                            (False, 'file', self._file_names[case_sensitive])):
+                add(applies_to, kind + suffix, min(names.values(), default=None),
+                    self._names_stage(case_sensitive, names))
+            
+            extensions = self._extensions[case_sensitive]
+            add(False, 'extension' + suffix, min(extensions.values(), default=None),
+                self._extensions_stage(case_sensitive, extensions))
+            
+            folder_suffixes = self._folder_suffixes[case_sensitive]
+            add(True, 'folder_path' + suffix, folder_suffixes[0][0] if folder_suffixes else None,
+                self._folder_suffixes_stage(case_sensitive, folder_suffixes))
+            
+            folders = self._folders[case_sensitive]
+            add(True, 'folder_substring' + suffix, folders[0][0] if folders else None,
+                self._folder_substrings_stage(case_sensitive, folders))
+            
+            regexes = self._regexes[case_sensitive]
+            add(None, 'regex' + suffix, regexes.first_index,
+                self._group_stage(case_sensitive, regexes, False))
+            wildcards = self._wildcards[case_sensitive]
+            add(None, 'wildcard' + suffix, wildcards.first_index,
+                self._group_stage(case_sensitive, wildcards, True))
+        
+        for index in self._deferred_rules:
+            rule = self.rules[index]
+            add(None, f"{rule.rule_type}: {rule.pattern}", index, self._deferred_stage(index))
+        return stages
+    
+    @staticmethod
+    def _names_stage(case_sensitive: bool, names: Dict[str, int]) -> Callable:
+        def run(subjects, context, best):
+            subject_path, subject_name = subjects[case_sensitive]
+            return min(best, names.get(subject_path, best), names.get(subject_name, best))
+        return run
+    
+    @staticmethod
+    def _extensions_stage(case_sensitive: bool, extensions: Dict[str, int]) -> Callable:
+        def run(subjects, context, best):
+            return min(best, extensions.get(path_suffix(subjects[case_sensitive][1]), best))
+        return run
+    
+    @staticmethod
+    def _folder_suffixes_stage(case_sensitive: bool, folder_suffixes: List[Tuple[int, str]]) -> Callable:
+        def run(subjects, context, best):
+            subject_path = subjects[case_sensitive][0]
+            for index, suffix in folder_suffixes:
+                if index >= best:
+                    break
+                if subject_path.endswith(suffix):
+                    return index
+            return best
+        return run
+    
+    def _folder_substrings_stage(self, case_sensitive: bool, folders: List[Tuple[int, str]]) -> Callable:
+        # Sem regras de trecho não há pré-filtro, mas a etapa também não é criada
+        folder_filter = self._folder_filters.get(case_sensitive)
+        
+        def run(subjects, context, best):
+            subject_path = subjects[case_sensitive][0]
+            if not folder_filter.search(subject_path):
+                return best
+            for index, pattern in folders:
+                if index >= best:
+                    break
+                if pattern in subject_path:
+                    return index
+            return best
+        return run
+    
+    @staticmethod
+    def _group_stage(case_sensitive: bool, group: _PatternGroup, normcase: bool) -> Callable:
+        def run(subjects, context, best):
+            subject_path = subjects[case_sensitive][0]
+            return group.first_match(os.path.normcase(subject_path) if normcase else subject_path, best)
+        return run
+    
+    def _deferred_stage(self, index: int) -> Callable:
+        rule = self.rules[index]
+        needs_stat = index in self._stat_rules
+        
+        def run(subjects, context, best):
+            if needs_stat:
+                # O primeiro stat preenche todos os campos e serve às demais regras
+                context.metadata = self._complete_metadata(context.path, [index], context.is_directory,
+                                                           context.metadata)
+            if self._evaluate_rule(context.path, rule, context.is_directory, context.metadata):
+                return index
+            return best
+        return run
+    
+    def _first_rule_adaptive(self, path_str: str, name: str, prefix_lower: Optional[str],
+                             is_directory: bool, metadata: Optional[PathMetadata]) -> int:
+        subjects = {True: (path_str, name)}
+        if False in self._case_modes:
+            lower_name = name.lower()
+            subjects[False] = (prefix_lower + lower_name if prefix_lower is not None else path_str.lower(),
+                               lower_name)
+        context = _StageContext(path_str, is_directory, metadata)
+        stages = self._stage_orders[is_directory]
+        best = len(self.rules)
+        
+        if self._samples_left > 0:
+            return self._sample_stages(stages, subjects, context)
+        
+        for stage in stages:
+            if stage.first_index < best:
+                best = stage.run(subjects, context, best)
+        return best
+    
+    def _sample_stages(self, stages: List[_Stage], subjects: Dict, context: _StageContext) -> int:
+        """Executa todas as etapas sem descarte, medindo acerto e tempo de cada uma"""
+        none = len(self.rules)
+        best = none
+        samples = []
+        for stage in stages:
+            start = time.perf_counter_ns()
+            found = stage.run(subjects, context, none)
+            samples.append((stage, found < none, time.perf_counter_ns() - start))
+            best = min(best, found)
+        self._stage_profilers[context.is_directory].record(samples)
+        
+        with self._stage_lock:
+            self._samples_left -= 1
+            if self._samples_left <= 0 and not self._stage_order_optimized:
+                self._optimize_stage_order()
+                self._stage_order_optimized = True
+        return best
+    
+    def _optimize_stage_order(self):
+        """
+        Ordena as etapas pelo custo médio por acerto: a ordem que minimiza o
+        custo esperado de testes independentes encerrados pelo primeiro
+        acerto. Etapas que nunca acertaram vão para o fim, as baratas antes.
+        """
+        for is_directory, stages in self._stage_orders.items():
+            profiler = self._stage_profilers[is_directory]
+            
+            def rank(stage: _Stage):
+                evaluations, hits, total_ns = profiler.get_counters(stage)
+                if not hits:
+                    return (1, total_ns / evaluations if evaluations else 0.0, stage.first_index)
+                return (0, total_ns / hits, stage.first_index)
+            
+            self._stage_orders[is_directory] = sorted(stages, key=rank)
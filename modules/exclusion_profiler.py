@@ -0,0 +1,83 @@
+"""
+Módulo de perfil de desempenho das regras de exclusão para UltraTexto Pro
+"""
+
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+class RuleProfiler:
+    """
+    Contadores por regra de exclusão: avaliações, acertos e tempo total em
+    nanossegundos. As amostras de cada caminho avaliado são somadas aos
+    contadores de uma vez, sob trava, então o perfil pode ser usado pelos
+    escaneamentos em paralelo.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # regra -> [avaliações, acertos, nanossegundos]
+        self._counters: Dict[object, List[int]] = {}
+        self.paths_evaluated = 0
+        self.started_at = datetime.now()
+    
+    def record(self, samples: List[Tuple[object, bool, int]]):
+        """Soma as amostras (regra, acertou, nanossegundos) da avaliação de um caminho"""
+        with self._lock:
+            self.paths_evaluated += 1
+            for rule, hit, elapsed_ns in samples:
+                counters = self._counters.get(rule)
+                if counters is None:
+                    counters = self._counters[rule] = [0, 0, 0]
+                counters[0] += 1
+                counters[1] += hit
+                counters[2] += elapsed_ns
+    
+    def reset(self):
+        """Zera os contadores"""
+        with self._lock:
+            self._counters.clear()
+            self.paths_evaluated = 0
+            self.started_at = datetime.now()
+    
+    def get_counters(self, rule) -> Tuple[int, int, int]:
+        """(avaliações, acertos, nanossegundos) de uma regra"""
+        with self._lock:
+            return tuple(self._counters.get(rule, (0, 0, 0)))
+    
+    def get_rule_statistics(self) -> List[Dict]:
+        """Uma entrada por regra avaliada, da que consumiu mais tempo para a que consumiu menos"""
+        with self._lock:
+            counters = [(rule, list(values)) for rule, values in self._counters.items()]
+        
+        statistics = []
+        for rule, (evaluations, hits, total_ns) in counters:
+            statistics.append({
+                'rule_type': rule.rule_type,
+                'pattern': rule.pattern,
+                'description': rule.description,
+                'evaluations': evaluations,
+                'hits': hits,
+                'hit_rate': hits / evaluations if evaluations else 0.0,
+                'total_ns': total_ns,
+                'mean_ns': total_ns / evaluations if evaluations else 0.0
+            })
+        statistics.sort(key=lambda entry: entry['total_ns'], reverse=True)
+        return statistics
+    
+    def get_report(self) -> Dict:
+        """Relatório completo do perfil"""
+        rules = self.get_rule_statistics()
+        return {
+            'started_at': self.started_at.isoformat(),
+            'generated_at': datetime.now().isoformat(),
+            'paths_evaluated': self.paths_evaluated,
+            'total_ns': sum(entry['total_ns'] for entry in rules),
+            'rules': rules
+        }
+    
+    def export_report(self, file_path: str):
+        """Grava o relatório em JSON"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.get_report(), f, indent=2, ensure_ascii=False)
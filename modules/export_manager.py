@@ -10,6 +10,8 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import base64
 
+from .tree_walk import walk_depth_first
+
 class ExportManager:
     """Gerenciador de exportação em múltiplos formatos"""
     
@@ -434,21 +436,27 @@ class ExportManager:
         return str(output_path)
     
     def _dict_to_xml(self, data: Any, parent: ET.Element):
-        """Converte dicionário para elementos XML recursivamente"""
-        if isinstance(data, dict):
-            for key, value in data.items():
-                # Sanitizar nome do elemento
-                element_name = str(key).replace(' ', '_').replace('-', '_')
-                element = ET.SubElement(parent, element_name)
-                self._dict_to_xml(value, element)
-        
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                item_element = ET.SubElement(parent, f"item_{i}")
-                self._dict_to_xml(item, item_element)
+        """Converte dicionário para elementos XML (pilha explícita, sem recursão)"""
+        def expand(item):
+            value, element = item
+            if isinstance(value, dict):
+                children = []
+                for key, child in value.items():
+                    # Sanitizar nome do elemento
+                    element_name = str(key).replace(' ', '_').replace('-', '_')
+                    children.append((child, ET.SubElement(element, element_name)))
+                return children
+            
+            elif isinstance(value, list):
+                return [(child, ET.SubElement(element, f"item_{i}"))
+                        for i, child in enumerate(value)]
+            
+            else:
+                element.text = str(value) if value is not None else ""
+                return None
         
-        else:
-            parent.text = str(data) if data is not None else ""
+        for _ in walk_depth_first([(data, parent)], expand):
+            pass
     
     def export_directory_structure_to_html(self, structure_data: Dict, output_path: str) -> str:
         """Exporta estrutura de diretórios para HTML interativo"""
@@ -3,13 +3,17 @@ Módulo de processamento de arquivos para UltraTexto Pro
 """
 
 import os
+import stat
 import time
 from pathlib import Path
-from typing import List, Dict, Set, Optional, Callable, Generator
+from typing import List, Dict, Set, Optional, Callable, Generator, Tuple
 from datetime import datetime
 import threading
 import queue
 
+from .tree_walk import walk_depth_first
+from .exclusion_matcher import PathMetadata
+
 class FileInfo:
     """Classe para armazenar informações de um arquivo"""
     
@@ -22,12 +26,15 @@ class FileInfo:
         self.is_directory = False
         self.is_excluded = False
         self.exclusion_reason = ""
+        # Resultado do stat, repassado às regras de exclusão de tamanho/data
+        self.metadata: Optional[PathMetadata] = None
         
         try:
-            stat = self.path.stat()
-            self.size = stat.st_size
-            self.modified_time = datetime.fromtimestamp(stat.st_mtime)
-            self.is_directory = self.path.is_dir()
+            stat_result = self.path.stat()
+            self.size = stat_result.st_size
+            self.modified_time = datetime.fromtimestamp(stat_result.st_mtime)
+            self.is_directory = stat.S_ISDIR(stat_result.st_mode)
+            self.metadata = PathMetadata.from_stat(stat_result)
         except (OSError, ValueError):
             pass
     
@@ -142,6 +149,8 @@ class FileProcessor:
         Escaneia diretório e retorna informações dos arquivos
         """
         self._update_status("Escaneando diretório...")
+        if self.exclusion_manager:
+            self.exclusion_manager.begin_scan(root_path)
         
         root_path = Path(root_path)
         if not root_path.exists():
@@ -155,22 +164,17 @@ class FileProcessor:
                 if self.cancelled:
                     break
                 
-                # Verificar diretórios para exclusão
+                # Verificar exclusões da listagem inteira de uma vez
+                dir_infos = [FileInfo(os.path.join(root, dir_name)) for dir_name in dirs]
+                file_infos = [FileInfo(os.path.join(root, file_name)) for file_name in files]
+                self._mark_exclusions(root, [(file_info, True) for file_info in dir_infos] +
+                                      [(file_info, False) for file_info in file_infos])
+                
                 dirs_to_remove = []
-                for dir_name in dirs:
-                    dir_path = os.path.join(root, dir_name)
-                    file_info = FileInfo(dir_path)
-                    
-                    # Verificar exclusão
-                    if self.exclusion_manager:
-                        should_exclude, reason = self.exclusion_manager.should_exclude_path(
-                            dir_path, is_directory=True
-                        )
-                        if should_exclude:
-                            file_info.is_excluded = True
-                            file_info.exclusion_reason = reason
-                            dirs_to_remove.append(dir_name)
-                            self.stats.excluded_directories += 1
+                for dir_name, file_info in zip(dirs, dir_infos):
+                    if file_info.is_excluded:
+                        dirs_to_remove.append(dir_name)
+                        self.stats.excluded_directories += 1
                     
                     self.stats.total_directories += 1
                     yield file_info
@@ -184,22 +188,12 @@ class FileProcessor:
                     dirs.remove(dir_name)
                 
                 # Processar arquivos
-                for file_name in files:
+                for file_info in file_infos:
                     if self.cancelled:
                         break
                     
-                    file_path = os.path.join(root, file_name)
-                    file_info = FileInfo(file_path)
-                    
-                    # Verificar exclusão
-                    if self.exclusion_manager:
-                        should_exclude, reason = self.exclusion_manager.should_exclude_path(
-                            file_path, is_directory=False
-                        )
-                        if should_exclude:
-                            file_info.is_excluded = True
-                            file_info.exclusion_reason = reason
-                            self.stats.excluded_files += 1
+                    if file_info.is_excluded:
+                        self.stats.excluded_files += 1
                     
                     self.stats.total_files += 1
                     self.stats.total_size += file_info.size
@@ -214,24 +208,19 @@ class FileProcessor:
         else:
             # Apenas o diretório raiz
             try:
-                for item in root_path.iterdir():
+                file_infos = [FileInfo(item) for item in root_path.iterdir()]
+                self._mark_exclusions(root_path, [(file_info, file_info.is_directory)
+                                                  for file_info in file_infos])
+                
+                for file_info in file_infos:
                     if self.cancelled:
                         break
                     
-                    file_info = FileInfo(item)
-                    
-                    # Verificar exclusão
-                    if self.exclusion_manager:
-                        should_exclude, reason = self.exclusion_manager.should_exclude_path(
-                            str(item), is_directory=file_info.is_directory
-                        )
-                        if should_exclude:
-                            file_info.is_excluded = True
-                            file_info.exclusion_reason = reason
-                            if file_info.is_directory:
-                                self.stats.excluded_directories += 1
-                            else:
-                                self.stats.excluded_files += 1
+                    if file_info.is_excluded:
+                        if file_info.is_directory:
+                            self.stats.excluded_directories += 1
+                        else:
+                            self.stats.excluded_files += 1
                     
                     if file_info.is_directory:
                         self.stats.total_directories += 1
@@ -249,6 +238,20 @@ class FileProcessor:
             except PermissionError as e:
                 self.stats.errors.append(f"Erro de permissão: {e}")
     
+    def _mark_exclusions(self, parent_path, entries: List[Tuple[FileInfo, bool]]):
+        """Avalia as exclusões da listagem de um diretório de uma vez e marca os excluídos"""
+        if not self.exclusion_manager or not entries:
+            return
+        
+        results = self.exclusion_manager.evaluate_directory(str(parent_path), [
+            (file_info.name, is_directory, file_info.metadata)
+            for file_info, is_directory in entries
+        ])
+        for (file_info, _), (should_exclude, reason_id) in zip(entries, results):
+            if should_exclude:
+                file_info.is_excluded = True
+                file_info.exclusion_reason = self.exclusion_manager.get_exclusion_reason(reason_id)
+    
     def process_files_content(self, root_path: str, output_path: str, 
                             include_subdirectories: bool = True) -> str:
         """
@@ -416,75 +419,99 @@ class FileProcessor:
     
     def _write_directory_tree(self, output_file, current_path: str, prefix: str,
                             include_subdirectories: bool, include_files: bool):
-        """Escreve árvore de diretórios recursivamente"""
-        try:
-            items = list(Path(current_path).iterdir())
-            items.sort(key=lambda x: (not x.is_dir(), x.name.lower()))
+        """Escreve árvore de diretórios em pré-ordem (pilha explícita, sem recursão)"""
+        def list_directory(directory: str, directory_prefix: str):
+            try:
+                items = list(Path(directory).iterdir())
+                items.sort(key=lambda x: (not x.is_dir(), x.name.lower()))
+            except PermissionError:
+                output_file.write(f"{directory_prefix}├── ❌ [ERRO: Sem permissão de acesso]\n")
+                self.stats.errors.append(f"Erro de permissão: {directory}")
+                return None
+            except Exception as e:
+                output_file.write(f"{directory_prefix}├── ❌ [ERRO: {str(e)}]\n")
+                self.stats.errors.append(f"Erro ao acessar {directory}: {e}")
+                return None
             
-            for i, item in enumerate(items):
-                if self.cancelled:
-                    break
-                
-                is_last = i == len(items) - 1
-                current_prefix = "└── " if is_last else "├── "
-                next_prefix = prefix + ("    " if is_last else "│   ")
-                
-                file_info = FileInfo(item)
-                
-                # Verificar exclusão
-                if self.exclusion_manager:
-                    should_exclude, reason = self.exclusion_manager.should_exclude_path(
-                        str(item), is_directory=file_info.is_directory
-                    )
-                    if should_exclude:
-                        file_info.is_excluded = True
-                        file_info.exclusion_reason = reason
-                
-                if file_info.is_directory:
-                    self.stats.total_directories += 1
-                    if file_info.is_excluded:
-                        self.stats.excluded_directories += 1
-                        icon = "📁❌"
-                    else:
-                        icon = "📁"
-                    
-                    output_file.write(f"{prefix}{current_prefix}{icon} {file_info.name}/")
-                    if file_info.is_excluded:
-                        output_file.write(f" [EXCLUÍDO: {file_info.exclusion_reason}]")
-                    output_file.write("\n")
-                    
-                    # Recursão para subdiretórios (se não excluído e incluir subdiretórios)
-                    if include_subdirectories and not file_info.is_excluded:
-                        self._write_directory_tree(output_file, str(item), next_prefix,
+            last_index = len(items) - 1
+            return [(item, directory_prefix, i == last_index) for i, item in enumerate(items)]
+        
+        def expand(entry):
+            if entry is root:
+                return list_directory(current_path, prefix)
+            
+            item, item_prefix, is_last = entry
+            try:
+                descend = self._write_tree_entry(output_file, item, item_prefix, is_last,
                                                  include_subdirectories, include_files)
-                
-                elif include_files:
-                    self.stats.total_files += 1
-                    self.stats.total_size += file_info.size
-                    self.stats.found_extensions.add(file_info.extension)
-                    
-                    if file_info.is_excluded:
-                        self.stats.excluded_files += 1
-                        icon = "📄❌"
-                    elif file_info.extension in self.supported_extensions:
-                        icon = "📄✅"
-                    else:
-                        icon = "📄"
-                    
-                    size_str = self._format_file_size(file_info.size)
-                    output_file.write(f"{prefix}{current_prefix}{icon} {file_info.name} ({size_str})")
-                    
-                    if file_info.is_excluded:
-                        output_file.write(f" [EXCLUÍDO: {file_info.exclusion_reason}]")
-                    
-                    output_file.write("\n")
+            except Exception as e:
+                output_file.write(f"{item_prefix}├── ❌ [ERRO: {str(e)}]\n")
+                self.stats.errors.append(f"Erro ao acessar {item}: {e}")
+                return None
+            
+            if descend:
+                return list_directory(str(item), item_prefix + ("    " if is_last else "│   "))
+            return None
         
-        except PermissionError:
-            output_file.write(f"{prefix}├── ❌ [ERRO: Sem permissão de acesso]\n")
-            self.stats.errors.append(f"Erro de permissão: {current_path}")
-        except Exception as e:
-            output_file.write(f"{prefix}├── ❌ [ERRO: {str(e)}]\n")
-            self.stats.errors.append(f"Erro ao acessar {current_path}: {e}")
+        root = (current_path,)
+        for _ in walk_depth_first([root], expand):
+            if self.cancelled:
+                break
+    
+    def _write_tree_entry(self, output_file, item: Path, prefix: str, is_last: bool,
+                          include_subdirectories: bool, include_files: bool) -> bool:
+        """Escreve a linha de uma entrada; retorna se o diretório deve ser percorrido"""
+        current_prefix = "└── " if is_last else "├── "
+        file_info = FileInfo(item)
+        
+        # Verificar exclusão
+        if self.exclusion_manager:
+            should_exclude, reason = self.exclusion_manager.should_exclude_path(
+                str(item), is_directory=file_info.is_directory,
+                metadata=file_info.metadata
+            )
+            if should_exclude:
+                file_info.is_excluded = True
+                file_info.exclusion_reason = reason
+        
+        if file_info.is_directory:
+            self.stats.total_directories += 1
+            if file_info.is_excluded:
+                self.stats.excluded_directories += 1
+                icon = "📁❌"
+            else:
+                icon = "📁"
+            
+            output_file.write(f"{prefix}{current_prefix}{icon} {file_info.name}/")
+            if file_info.is_excluded:
+                output_file.write(f" [EXCLUÍDO: {file_info.exclusion_reason}]")
+            output_file.write("\n")
+            
+            # Percorrer subdiretórios (se não excluído e incluir subdiretórios)
+            return include_subdirectories and not file_info.is_excluded
+        
+        if include_files:
+            self.stats.total_files += 1
+            self.stats.total_size += file_info.size
+            self.stats.found_extensions.add(file_info.extension)
+            
+            if file_info.is_excluded:
+                self.stats.excluded_files += 1
+                icon = "📄❌"
+            elif file_info.extension in self.supported_extensions:
+                icon = "📄✅"
+            else:
+                icon = "📄"
+            
+            size_str = self._format_file_size(file_info.size)
+            output_file.write(f"{prefix}{current_prefix}{icon} {file_info.name} ({size_str})")
+            
+            if file_info.is_excluded:
+                output_file.write(f" [EXCLUÍDO: {file_info.exclusion_reason}]")
+            
+            output_file.write("\n")
+        
+        return False
     
     def _format_file_size(self, size_bytes: int) -> str:
         """Formata tamanho do arquivo"""
@@ -0,0 +1,247 @@
+"""
+Módulo de arquivos de exclusão no formato .gitignore para UltraTexto Pro
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+def translate_ignore_pattern(pattern: str) -> str:
+    """
+    Converte um padrão de .gitignore (sem '!' inicial e sem '/' final) em
+    expressão regular sobre caminhos relativos separados por '/'.
+    '*' e '?' não atravessam '/'; '**' entre separadores atravessa.
+    """
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == '*':
+            end = i + 1
+            while end < n and pattern[end] == '*':
+                end += 1
+            at_start = i == 0 or pattern[i - 1] == '/'
+            at_end = end == n or pattern[end] == '/'
+            if end - i >= 2 and at_start and at_end:
+                if end == n:
+                    # 'dir/**': tudo dentro de dir
+                    parts.append('.+')
+                else:
+                    # '**/': nenhum ou vários diretórios
+                    parts.append('(?:.*/)?')
+                    end += 1
+            else:
+                parts.append('[^/]*')
+            i = end
+            continue
+        
+        if char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = i + 1
+            if end < n and pattern[end] in '!^':
+                end += 1
+            if end < n and pattern[end] == ']':
+                end += 1
+            while end < n and pattern[end] != ']':
+                end += 1
+            if end >= n:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                parts.append(f'[{body}]')
+                i = end
+        elif char == '\\' and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return ''.join(parts)
+
+def parse_ignore_line(line: str) -> Optional[Tuple[str, bool, bool]]:
+    """
+    Uma linha de .gitignore como (expressão, negado, só diretórios), ou
+    None para linhas vazias e comentários
+    """
+    line = line.rstrip('\r\n')
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        # Espaço final escapado faz parte do padrão
+        stripped += ' '
+    line = stripped
+    if not line or line.startswith('#'):
+        return None
+    
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    directory_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+    
+    # Com '/' no início ou no meio o padrão é relativo ao arquivo; sem, vale em qualquer nível
+    anchored = '/' in line
+    if line.startswith('/'):
+        line = line[1:]
+    regex = translate_ignore_pattern(line)
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+    return regex + r'\Z', negated, directory_only
+
+class IgnoreFile:
+    """
+    Padrões de um arquivo de exclusão, compilados uma vez. Como no git, o
+    último padrão que corresponde decide; as expressões ficam em uma
+    alternância em ordem inversa, então a primeira alternativa que casa é
+    esse padrão.
+    """
+    
+    def __init__(self, directory: str, lines: List[str], case_sensitive: bool = True):
+        self.directory = directory
+        self._prefix_length = len(directory.rstrip(os.sep)) + 1
+        flags = 0 if case_sensitive else re.IGNORECASE
+        
+        patterns = []
+        for line in lines:
+            parsed = parse_ignore_line(line)
+            if parsed is None:
+                continue
+            try:
+                re.compile(parsed[0], flags)
+            except re.error:
+                continue
+            patterns.append(parsed)
+        self.pattern_count = len(patterns)
+        
+        self._negated = [negated for _, negated, _ in patterns]
+        indexed = list(enumerate(patterns))[::-1]
+        self._any = self._combine([(index, regex) for index, (regex, _, _) in indexed], flags)
+        self._files = self._combine([(index, regex) for index, (regex, _, directory_only) in indexed
+                                     if not directory_only], flags)
+    
+    @staticmethod
+    def _combine(entries: List[Tuple[int, str]], flags: int):
+        if not entries:
+            return None
+        return re.compile("|".join(f"(?P<p{index}>{regex})" for index, regex in entries), flags)
+    
+    @classmethod
+    def load(cls, file_path: str, case_sensitive: bool = True) -> Optional['IgnoreFile']:
+        """Lê o arquivo; None se ele não existir ou não puder ser lido"""
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+        return cls(os.path.dirname(file_path), lines, case_sensitive)
+    
+    def match(self, path: str, is_directory: bool) -> Optional[bool]:
+        """
+        Decisão deste arquivo para um caminho absoluto sob seu diretório:
+        True (ignorado), False (reincluído por '!') ou None (nenhum padrão)
+        """
+        compiled = self._any if is_directory else self._files
+        if compiled is None:
+            return None
+        relative = path[self._prefix_length:]
+        if os.sep != '/':
+            relative = relative.replace(os.sep, '/')
+        found = compiled.match(relative)
+        if not found:
+            return None
+        return not self._negated[int(found.lastgroup[1:])]
+
+class IgnoreFileTree:
+    """
+    Arquivos de exclusão (por exemplo .gitignore) descobertos sob demanda,
+    diretório a diretório, conforme os caminhos são avaliados. Cada
+    diretório guarda as camadas de arquivos que valem para ele (as do pai
+    mais a sua), até a raiz do repositório; a camada mais profunda com uma
+    decisão vence. Um caminho dentro de um diretório ignorado também é
+    ignorado, como no git.
+    """
+    
+    def __init__(self, file_name: str = ".gitignore", case_sensitive: bool = True):
+        self.file_name = file_name
+        self.case_sensitive = case_sensitive
+        self._layers: Dict[str, Tuple[IgnoreFile, ...]] = {}
+        self._ignored_directories: Dict[str, bool] = {}
+        self._repository_roots: Dict[str, bool] = {}
+        # Diretórios novos são carregados sob a trava: no escaneamento em
+        # paralelo cada arquivo é lido uma vez e as camadas são consistentes
+        self._lock = threading.RLock()
+    
+    def clear(self):
+        """Descarta os arquivos carregados (para reler após alterações)"""
+        with self._lock:
+            self._layers.clear()
+            self._ignored_directories.clear()
+            self._repository_roots.clear()
+    
+    @property
+    def files_loaded(self) -> int:
+        """Quantidade de arquivos de exclusão encontrados até agora"""
+        with self._lock:
+            return len({id(layer) for layers in self._layers.values() for layer in layers})
+    
+    def _is_repository_root(self, directory: str) -> bool:
+        is_root = self._repository_roots.get(directory)
+        if is_root is None:
+            is_root = self._repository_roots[directory] = os.path.exists(
+                os.path.join(directory, '.git'))
+        return is_root
+    
+    def _layers_for(self, directory: str) -> Tuple[IgnoreFile, ...]:
+        """Arquivos de exclusão que valem dentro do diretório, do mais raso ao mais profundo"""
+        layers = self._layers.get(directory)
+        if layers is not None:
+            return layers
+        
+        with self._lock:
+            layers = self._layers.get(directory)
+            if layers is None:
+                parent = os.path.dirname(directory)
+                if parent == directory or self._is_repository_root(directory):
+                    layers = ()
+                else:
+                    layers = self._layers_for(parent)
+                own = IgnoreFile.load(os.path.join(directory, self.file_name), self.case_sensitive)
+                if own is not None:
+                    layers = layers + (own,)
+                self._layers[directory] = layers
+            return layers
+    
+    def _decide(self, path: str, is_directory: bool) -> bool:
+        for layer in reversed(self._layers_for(os.path.dirname(path))):
+            decision = layer.match(path, is_directory)
+            if decision is not None:
+                return decision
+        return False
+    
+    def _is_directory_ignored(self, directory: str) -> bool:
+        ignored = self._ignored_directories.get(directory)
+        if ignored is not None:
+            return ignored
+        
+        with self._lock:
+            ignored = self._ignored_directories.get(directory)
+            if ignored is None:
+                parent = os.path.dirname(directory)
+                if parent == directory or self._is_repository_root(directory):
+                    ignored = False
+                else:
+                    ignored = self._is_directory_ignored(parent) or self._decide(directory, True)
+                self._ignored_directories[directory] = ignored
+            return ignored
+    
+    def is_ignored(self, path, is_directory: bool = False) -> bool:
+        """Se o caminho é ignorado pelos arquivos de exclusão acima dele"""
+        path = os.path.abspath(path)
+        if is_directory:
+            return self._is_directory_ignored(path)
+        return self._is_directory_ignored(os.path.dirname(path)) or self._decide(path, False)
@@ -0,0 +1,120 @@
+"""
+Módulo de padrões de inclusão para UltraTexto Pro
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .ignore_files import translate_ignore_pattern
+
+# Situação de um diretório diante dos padrões de inclusão
+DIRECTORY_INCLUDED = 0      # um padrão casa com o diretório ou um ancestral: tudo abaixo entra
+DIRECTORY_POSSIBLE = 1      # algum padrão ainda pode casar com algo abaixo
+DIRECTORY_EXCLUDED = 2      # nenhum padrão pode casar abaixo: não há por que descer
+
+class _IncludePattern:
+    """
+    Um padrão de inclusão com a expressão completa e a de cada componente.
+    Como no .gitignore, um padrão sem '/' (ex.: *.py) vale em qualquer
+    nível; com '/' no início ou no meio, é relativo à raiz.
+    """
+    
+    def __init__(self, pattern: str, case_sensitive: bool):
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = pattern.replace('\\', '/')
+        anchored = '/' in pattern.rstrip('/')
+        pattern = pattern.strip('/')
+        if not anchored:
+            pattern = '**/' + pattern
+        self.pattern = pattern
+        self.regex = re.compile(translate_ignore_pattern(pattern) + r'\Z', flags)
+        self.segments = pattern.split('/')
+        self._segment_regexes = [
+            None if segment == '**' else re.compile(translate_ignore_pattern(segment) + r'\Z', flags)
+            for segment in self.segments
+        ]
+    
+    def may_contain(self, parts: List[str]) -> bool:
+        """
+        Análise estática do prefixo: se algo dentro do diretório de
+        componentes parts ainda pode casar com o padrão
+        """
+        for index, part in enumerate(parts):
+            if index < len(self.segments) and self.segments[index] == '**':
+                # '**' casa com qualquer quantidade de diretórios
+                return True
+            if index >= len(self.segments) - 1:
+                # O último componente do padrão é o próprio item, não um diretório acima dele
+                return False
+            if not self._segment_regexes[index].match(part):
+                return False
+        return True
+
+class IncludeFilter:
+    """
+    Padrões de inclusão (por exemplo src/**/*.py) relativos à raiz do
+    escaneamento; padrões sem '/' (por exemplo *.py) valem em qualquer nível. Com algum padrão, só entram os itens que casam com um
+    deles ou estão dentro de um diretório que casa; diretórios em que
+    nenhum padrão pode casar são descartados pela análise dos prefixos,
+    sem que a travessia desça neles.
+    """
+    
+    def __init__(self, patterns: List[Tuple[str, bool]]):
+        # (padrão, diferencia maiúsculas); padrões inválidos são ignorados
+        self.patterns = []
+        for pattern, case_sensitive in patterns:
+            try:
+                self.patterns.append(_IncludePattern(pattern, case_sensitive))
+            except re.error:
+                continue
+        self._directory_states: Dict[str, int] = {}
+        # Situações novas são calculadas sob a trava (escaneamento em paralelo)
+        self._lock = threading.RLock()
+    
+    @classmethod
+    def from_rules(cls, rules: List) -> Optional['IncludeFilter']:
+        """Filtro das regras 'include' habilitadas, ou None se não houver"""
+        patterns = [(rule.pattern, rule.case_sensitive) for rule in rules
+                    if rule.rule_type == 'include' and rule.enabled]
+        return cls(patterns) if patterns else None
+    
+    def clear(self):
+        """Descarta as situações de diretório calculadas (ao trocar a raiz)"""
+        with self._lock:
+            self._directory_states.clear()
+    
+    def directory_state(self, relative_dir: str) -> int:
+        """Situação do diretório ('' é a raiz), calculada uma vez por diretório"""
+        state = self._directory_states.get(relative_dir)
+        if state is not None:
+            return state
+        
+        with self._lock:
+            state = self._directory_states.get(relative_dir)
+            if state is not None:
+                return state
+            
+            if not relative_dir:
+                state = DIRECTORY_POSSIBLE
+            else:
+                parent_state = self.directory_state(relative_dir.rpartition('/')[0])
+                if parent_state != DIRECTORY_POSSIBLE:
+                    state = parent_state
+                elif any(pattern.regex.match(relative_dir) for pattern in self.patterns):
+                    state = DIRECTORY_INCLUDED
+                else:
+                    parts = relative_dir.split('/')
+                    state = (DIRECTORY_POSSIBLE if any(pattern.may_contain(parts) for pattern in self.patterns)
+                             else DIRECTORY_EXCLUDED)
+            self._directory_states[relative_dir] = state
+            return state
+    
+    def is_excluded(self, relative_path: str, is_directory: bool) -> bool:
+        """Se o item (caminho relativo à raiz, separado por '/') fica de fora"""
+        state = self.directory_state(relative_path.rpartition('/')[0])
+        if state != DIRECTORY_POSSIBLE:
+            return state == DIRECTORY_EXCLUDED
+        if is_directory:
+            return self.directory_state(relative_path) == DIRECTORY_EXCLUDED
+        return not any(pattern.regex.match(relative_path) for pattern in self.patterns)
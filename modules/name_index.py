@@ -0,0 +1,123 @@
+"""
+Módulo de índice de nomes e caminhos para UltraTexto Pro
+"""
+
+import os
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List
+
+from .tree_walk import walk_depth_first
+
+_EMPTY = array('I')
+
+class NameIndex:
+    """
+    Índice de nomes de uma árvore de escaneamento, montado uma vez por
+    escaneamento. Os nós ficam em pré-ordem, então a subárvore de cada nó é
+    um intervalo contíguo; os nomes distintos em minúsculas ficam em um pool
+    com listas de trigramas (busca por trecho) e uma ordenação (busca por
+    prefixo). Um trecho sem separador está no caminho de um nó se e só se
+    está no nome do nó ou de algum ancestral, então a busca no caminho vira
+    a união das subárvores dos nomes encontrados.
+    """
+    
+    def __init__(self, root_node):
+        self.root_node = root_node
+        self.nodes: List = []
+        self.names: List[str] = []
+        self._root_path = str(root_node.path).lower()
+        
+        parents = array('l')
+        name_ids: Dict[str, int] = {}
+        self._name_nodes: List[array] = []
+        
+        def expand(item):
+            node, _ = item
+            index = len(self.nodes) - 1
+            return [(child, index) for child in node.children]
+        
+        for node, parent_index in walk_depth_first([(root_node, -1)], expand):
+            name = node.name.lower()
+            name_id = name_ids.get(name)
+            if name_id is None:
+                name_id = name_ids[name] = len(self.names)
+                self.names.append(name)
+                self._name_nodes.append(array('I'))
+            self._name_nodes[name_id].append(len(self.nodes))
+            parents.append(parent_index)
+            self.nodes.append(node)
+        
+        # Fim (exclusivo) da subárvore de cada nó em pré-ordem
+        self._subtree_end = array('I', range(1, len(self.nodes) + 1))
+        for index in range(len(self.nodes) - 1, 0, -1):
+            parent_index = parents[index]
+            if self._subtree_end[index] > self._subtree_end[parent_index]:
+                self._subtree_end[parent_index] = self._subtree_end[index]
+        
+        self._trigrams: Dict[str, array] = {}
+        for name_id, name in enumerate(self.names):
+            for trigram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                postings = self._trigrams.get(trigram)
+                if postings is None:
+                    postings = self._trigrams[trigram] = array('I')
+                postings.append(name_id)
+        
+        self._sorted_ids = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self._sorted_names = [self.names[name_id] for name_id in self._sorted_ids]
+    
+    def __len__(self) -> int:
+        return len(self.nodes)
+    
+    def _names_containing(self, query: str) -> List[int]:
+        """Nomes distintos que contêm o trecho (já em minúsculas)"""
+        if len(query) < 3:
+            return [name_id for name_id, name in enumerate(self.names) if query in name]
+        
+        postings = sorted((self._trigrams.get(query[i:i + 3], _EMPTY)
+                           for i in range(len(query) - 2)), key=len)
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(other)
+        return [name_id for name_id in candidates if query in self.names[name_id]]
+    
+    def substring_indexes(self, query: str) -> Iterator[int]:
+        """Posições em pré-ordem dos nós cujo caminho contém o trecho"""
+        query = query.lower()
+        if query in self._root_path:
+            return iter(range(len(self.nodes)))
+        
+        if os.sep in query or (os.altsep and os.altsep in query):
+            # Trecho que atravessa componentes: comparação direta com o caminho
+            return (index for index, node in enumerate(self.nodes)
+                    if query in str(node.path).lower())
+        
+        starts = sorted(index for name_id in self._names_containing(query)
+                        for index in self._name_nodes[name_id])
+        return self._merge_subtrees(starts)
+    
+    def _merge_subtrees(self, starts: List[int]) -> Iterator[int]:
+        covered = 0
+        for start in starts:
+            end = self._subtree_end[start]
+            if end <= covered:
+                continue
+            yield from range(max(start, covered), end)
+            covered = end
+    
+    def substring(self, query: str) -> List:
+        """Nós cujo caminho (nome, extensão ou ancestrais) contém o trecho"""
+        return [self.nodes[index] for index in self.substring_indexes(query)]
+    
+    def prefix(self, query: str) -> List:
+        """Nós cujo nome começa com o prefixo, em pré-ordem"""
+        query = query.lower()
+        position = bisect_left(self._sorted_names, query)
+        indexes = []
+        while (position < len(self._sorted_names) and
+               self._sorted_names[position].startswith(query)):
+            indexes.extend(self._name_nodes[self._sorted_ids[position]])
+            position += 1
+        return [self.nodes[index] for index in sorted(indexes)]
@@ -0,0 +1,194 @@
+"""
+Módulo de análises coletadas durante o escaneamento para UltraTexto Pro
+"""
+
+import heapq
+import itertools
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .tree_walk import walk_depth_first
+
+class ScanCollector:
+    """
+    Coletor alimentado pelo DirectoryScanner durante o percurso.
+    add_node recebe cada entrada escaneada (arquivos e diretórios) e finish
+    é chamado com a raiz quando os agregados da árvore estão calculados.
+    """
+    
+    def __init__(self):
+        self.root_node = None
+    
+    def reset(self):
+        """Prepara o coletor para um novo escaneamento"""
+        self.root_node = None
+    
+    def add_node(self, node):
+        """Contabiliza uma entrada escaneada"""
+    
+    def finish(self, root_node):
+        """Conclui a coleta da árvore de root_node"""
+        self.root_node = root_node
+    
+    def is_current(self, root_node) -> bool:
+        """Indica se o resultado corresponde à árvore de root_node"""
+        return self.root_node is not None and self.root_node is root_node
+
+class _TopKHeap:
+    """Heap mínimo limitado aos k maiores itens"""
+    
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[int, int, object]] = []
+        self._counter = itertools.count()
+    
+    def push(self, key: int, item):
+        # Em empates prevalece o item visto primeiro (como numa ordenação estável)
+        entry = (key, -next(self._counter), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+    
+    def items(self) -> List:
+        """Itens do maior para o menor"""
+        return [item for _, _, item in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+class TopFilesCollector(ScanCollector):
+    """Maiores arquivos não excluídos (heap limitado a k)"""
+    
+    def __init__(self, k: int = 100):
+        super().__init__()
+        self.k = k
+        self._top = _TopKHeap(k)
+    
+    def reset(self):
+        super().reset()
+        self._top = _TopKHeap(self.k)
+    
+    def add_node(self, node):
+        if not node.is_directory and not node.is_excluded:
+            self._top.push(node.size, node)
+    
+    def result(self, count: Optional[int] = None) -> List:
+        return self._top.items()[:count]
+
+class TopDirectoriesCollector(ScanCollector):
+    """
+    Maiores diretórios não excluídos pelo tamanho total da subárvore.
+    O total só é conhecido após os agregados, então a seleção é feita em
+    finish, percorrendo apenas os diretórios.
+    """
+    
+    def __init__(self, k: int = 100):
+        super().__init__()
+        self.k = k
+        self._top = _TopKHeap(k)
+    
+    def reset(self):
+        super().reset()
+        self._top = _TopKHeap(self.k)
+    
+    def finish(self, root_node):
+        top = _TopKHeap(self.k)
+        directories = lambda node: [child for child in node.children if child.is_directory]
+        for node in walk_depth_first([root_node], directories):
+            if not node.is_excluded:
+                top.push(node.get_total_size(), node)
+        self._top = top
+        super().finish(root_node)
+    
+    def result(self, count: Optional[int] = None) -> List:
+        return self._top.items()[:count]
+
+class SizeHistogramCollector(ScanCollector):
+    """Histograma de tamanhos de arquivo em faixas de potências de 2"""
+    
+    def __init__(self):
+        super().__init__()
+        self._buckets: Dict[int, int] = defaultdict(int)
+    
+    def reset(self):
+        super().reset()
+        self._buckets = defaultdict(int)
+    
+    def add_node(self, node):
+        if not node.is_directory:
+            # Faixa i cobre [2^(i-1), 2^i); a faixa 0 são arquivos vazios
+            self._buckets[node.size.bit_length()] += 1
+    
+    def result(self) -> List[Tuple[int, int, int]]:
+        """Lista de (limite inferior, limite superior exclusivo, arquivos)"""
+        return [((1 << (bucket - 1)) if bucket else 0, 1 << bucket if bucket else 1, count)
+                for bucket, count in sorted(self._buckets.items())]
+
+class AgeHistogramCollector(ScanCollector):
+    """Histograma da idade dos arquivos pela data de modificação"""
+    
+    BUCKETS = (
+        ("1 dia", 1),
+        ("1 semana", 7),
+        ("1 mês", 30),
+        ("1 ano", 365),
+    )
+    
+    def __init__(self):
+        super().__init__()
+        self.reset()
+    
+    def reset(self):
+        super().reset()
+        self._now = datetime.now()
+        self._counts = [0] * (len(self.BUCKETS) + 2)
+    
+    def add_node(self, node):
+        if node.is_directory:
+            return
+        
+        modified_time = node.modified_time
+        if modified_time is None:
+            self._counts[-1] += 1
+            return
+        
+        age_days = (self._now - modified_time).total_seconds() / 86400
+        for index, (_, days) in enumerate(self.BUCKETS):
+            if age_days < days:
+                self._counts[index] += 1
+                return
+        self._counts[len(self.BUCKETS)] += 1
+    
+    def result(self) -> List[Tuple[str, int]]:
+        """Lista de (faixa, arquivos)"""
+        labels = [f"até {label}" for label, _ in self.BUCKETS]
+        labels.append(f"mais de {self.BUCKETS[-1][0]}")
+        labels.append("data desconhecida")
+        return list(zip(labels, self._counts))
+
+class ExtensionBytesCollector(ScanCollector):
+    """Total de bytes por extensão"""
+    
+    def __init__(self):
+        super().__init__()
+        self._bytes: Dict[str, int] = defaultdict(int)
+    
+    def reset(self):
+        super().reset()
+        self._bytes = defaultdict(int)
+    
+    def add_node(self, node):
+        if not node.is_directory:
+            self._bytes[node.extension] += node.size
+    
+    def result(self) -> Dict[str, int]:
+        return dict(self._bytes)
+
+def default_collectors(k: int = 100) -> List[ScanCollector]:
+    """Conjunto de coletores usado pela aba de análises"""
+    return [
+        TopFilesCollector(k),
+        TopDirectoriesCollector(k),
+        SizeHistogramCollector(),
+        AgeHistogramCollector(),
+        ExtensionBytesCollector()
+    ]
@@ -0,0 +1,329 @@
+"""
+Módulo de snapshots de escaneamento em disco para UltraTexto Pro
+"""
+
+import os
+import json
+import hashlib
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Iterable
+from datetime import datetime
+
+# Bits do campo de flags de cada registro
+FLAG_DIRECTORY = 1
+FLAG_EXCLUDED = 2
+FLAG_SUPPORTED = 4
+
+# Posições dos campos em cada registro
+PARENT, NAME, FLAGS, SIZE, MTIME, REASON, DIR_MTIME_NS, ENTRY_COUNT = range(8)
+
+SNAPSHOT_VERSION = 1
+
+def tree_to_records(root_node, node_indexes: Optional[Dict[int, int]] = None) -> Dict:
+    """
+    Serializa uma árvore de DirectoryNode em registros planos (pré-ordem).
+    Cada registro: [pai, nome, flags, tamanho, mtime, motivo, mtime_ns do
+    diretório no momento da listagem, número de entradas listadas].
+    Se node_indexes for informado, recebe {id(nó): índice do registro}.
+    """
+    records = []
+    reasons = [""]
+    reason_index = {"": 0}
+    
+    stack = [(root_node, -1)]
+    while stack:
+        node, parent = stack.pop()
+        
+        flags = ((FLAG_DIRECTORY if node.is_directory else 0) |
+                 (FLAG_EXCLUDED if node.is_excluded else 0) |
+                 (FLAG_SUPPORTED if node.is_supported else 0))
+        
+        reason_id = reason_index.get(node.exclusion_reason)
+        if reason_id is None:
+            reason_id = len(reasons)
+            reasons.append(node.exclusion_reason)
+            reason_index[node.exclusion_reason] = reason_id
+        
+        mtime = None
+        if not node.is_directory and node.modified_time:
+            mtime = node.modified_time.timestamp()
+        
+        index = len(records)
+        if node_indexes is not None:
+            node_indexes[id(node)] = index
+        records.append([
+            parent, node.name, flags, node.size if not node.is_directory else 0, mtime,
+            reason_id, node.listing_mtime_ns, len(node.children)
+        ])
+        
+        stack.extend((child, index) for child in reversed(node.children))
+    
+    return {'reasons': reasons, 'entries': records}
+
+class ScanSnapshot:
+    """Snapshot carregado de um escaneamento anterior"""
+    
+    def __init__(self, root_path: str, reasons: List[str], entries: List[List]):
+        self.root_path = root_path
+        self.reasons = reasons
+        self.entries = entries
+        self._children: Optional[Dict[int, Dict[str, int]]] = None
+    
+    def children_of(self, index: int) -> Dict[str, int]:
+        """Retorna {nome: índice} dos filhos de um registro"""
+        if self._children is None:
+            children: Dict[int, Dict[str, int]] = {}
+            for child_index, entry in enumerate(self.entries):
+                parent = entry[PARENT]
+                if parent >= 0:
+                    children.setdefault(parent, {})[entry[NAME]] = child_index
+            self._children = children
+        return self._children.get(index, {})
+    
+    def is_reusable(self, index: int, mtime_ns: int) -> bool:
+        """
+        Indica se a listagem gravada de um diretório ainda é válida:
+        mesmo mtime e listagem completa (todas as entradas gravadas).
+        """
+        entry = self.entries[index]
+        return (entry[DIR_MTIME_NS] is not None and
+                entry[DIR_MTIME_NS] == mtime_ns and
+                entry[ENTRY_COUNT] == len(self.children_of(index)))
+    
+    def iter_children(self, index: int) -> Iterable[int]:
+        """Índices dos filhos na ordem gravada"""
+        return self.children_of(index).values()
+    
+    def create_node(self, index: int, parent_path: str, node_class):
+        """Cria um DirectoryNode a partir de um registro, sem acessar o disco"""
+        entry = self.entries[index]
+        flags = entry[FLAGS]
+        is_directory = bool(flags & FLAG_DIRECTORY)
+        
+        node = node_class(os.path.join(parent_path, entry[NAME]), entry[NAME],
+                          is_directory=is_directory)
+        node.is_excluded = bool(flags & FLAG_EXCLUDED)
+        node.is_supported = bool(flags & FLAG_SUPPORTED)
+        node.exclusion_reason = self.reasons[entry[REASON]]
+        
+        if not is_directory:
+            node.size = entry[SIZE]
+            if entry[MTIME] is not None:
+                node.modified_time = datetime.fromtimestamp(entry[MTIME])
+        
+        return node
+    
+    def build_tree(self, node_class) -> List:
+        """Recria a árvore inteira; retorna os nós na ordem dos registros"""
+        nodes = []
+        for index, entry in enumerate(self.entries):
+            parent = entry[PARENT]
+            if parent < 0:
+                node = node_class(self.root_path, is_directory=True)
+            else:
+                node = self.create_node(index, str(nodes[parent].path), node_class)
+                nodes[parent].add_child(node)
+            node.listing_mtime_ns = entry[DIR_MTIME_NS]
+            nodes.append(node)
+        return nodes
+
+class ScanCheckpoint(NamedTuple):
+    """Escaneamento parcial carregado de um checkpoint"""
+    root_node: object
+    frontier: List
+    options: Dict
+
+class ScanCheckpointStore:
+    """
+    Checkpoints de escaneamentos interrompidos, um arquivo por token.
+    Cada checkpoint guarda a árvore parcial e a fronteira de diretórios
+    ainda não listados, permitindo continuar o escaneamento depois.
+    """
+    
+    def __init__(self, checkpoint_dir: str):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    
+    @classmethod
+    def from_config(cls, config_manager) -> 'ScanCheckpointStore':
+        """Cria o armazenamento de checkpoints no diretório de cache"""
+        return cls(config_manager.get_cache_directory() / "scans" / "checkpoints")
+    
+    def _checkpoint_path(self, token: str) -> Optional[Path]:
+        if not token or not all(c in "0123456789abcdef" for c in token):
+            return None
+        return self.checkpoint_dir / f"resume_{token}.json"
+    
+    def save(self, root_node, frontier: Iterable, options: Dict,
+             token: Optional[str] = None) -> str:
+        """Grava a árvore parcial e a fronteira; retorna o token de retomada"""
+        token = token if self._checkpoint_path(token) else uuid.uuid4().hex
+        checkpoint_path = self._checkpoint_path(token)
+        temp_path = checkpoint_path.with_suffix('.tmp')
+        
+        node_indexes: Dict[int, int] = {}
+        data = tree_to_records(root_node, node_indexes)
+        data['version'] = SNAPSHOT_VERSION
+        data['root_path'] = str(root_node.path)
+        data['frontier'] = [node_indexes[id(node)] for node in frontier]
+        data['options'] = options
+        data['created_at'] = datetime.now().isoformat()
+        
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, checkpoint_path)
+        except Exception:
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            raise
+        
+        return token
+    
+    def load(self, token: str, node_class) -> Optional[ScanCheckpoint]:
+        """Carrega um checkpoint ou retorna None"""
+        checkpoint_path = self._checkpoint_path(token)
+        if checkpoint_path is None:
+            return None
+        
+        try:
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            if data.get('version') != SNAPSHOT_VERSION:
+                return None
+            
+            snapshot = ScanSnapshot(data['root_path'], data['reasons'], data['entries'])
+            nodes = snapshot.build_tree(node_class)
+            return ScanCheckpoint(nodes[0], [nodes[index] for index in data['frontier']],
+                                  data.get('options', {}))
+        
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Erro ao carregar checkpoint: {e}")
+            return None
+    
+    def discard(self, token: str):
+        """Remove um checkpoint"""
+        checkpoint_path = self._checkpoint_path(token)
+        if checkpoint_path is not None:
+            try:
+                checkpoint_path.unlink()
+            except OSError:
+                pass
+
+class ScanSnapshotStore:
+    """
+    Armazena snapshots de escaneamento em disco, um arquivo por chave
+    (diretório raiz + perfil de exclusão + opções do escaneamento).
+    Snapshots antigos são removidos quando o total passa do limite.
+    """
+    
+    def __init__(self, cache_dir: str, max_size_mb: float = 100):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+    
+    @classmethod
+    def from_config(cls, config_manager) -> Optional['ScanSnapshotStore']:
+        """Cria o armazenamento a partir das configurações avançadas de cache"""
+        if not config_manager.get("advanced.cache_enabled", True):
+            return None
+        
+        return cls(config_manager.get_cache_directory() / "scans",
+                   config_manager.get("advanced.cache_size_mb", 100))
+    
+    def make_key(self, root_path: str, profile_fingerprint: str = "",
+                 supported_extensions: Iterable[str] = (), **options) -> str:
+        """Gera a chave do snapshot"""
+        key_data = {
+            'root_path': str(Path(root_path).resolve()),
+            'profile': profile_fingerprint,
+            'supported_extensions': sorted(supported_extensions),
+            'options': options
+        }
+        encoded = json.dumps(key_data, sort_keys=True).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()
+    
+    def _snapshot_path(self, key: str) -> Path:
+        return self.cache_dir / f"scan_{key}.json"
+    
+    def load(self, key: str) -> Optional[ScanSnapshot]:
+        """Carrega um snapshot ou retorna None"""
+        snapshot_path = self._snapshot_path(key)
+        try:
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            if data.get('version') != SNAPSHOT_VERSION:
+                return None
+            
+            # Marcar como usado recentemente
+            os.utime(snapshot_path, None)
+            
+            return ScanSnapshot(data['root_path'], data['reasons'], data['entries'])
+        
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Erro ao carregar snapshot: {e}")
+            return None
+    
+    def save(self, key: str, root_node):
+        """Grava o snapshot de uma árvore e aplica o limite de tamanho"""
+        snapshot_path = self._snapshot_path(key)
+        temp_path = snapshot_path.with_suffix('.tmp')
+        
+        try:
+            data = tree_to_records(root_node)
+            data['version'] = SNAPSHOT_VERSION
+            data['root_path'] = str(root_node.path)
+            data['created_at'] = datetime.now().isoformat()
+            
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, snapshot_path)
+        
+        except Exception as e:
+            print(f"Erro ao salvar snapshot: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return
+        
+        self.evict(keep=snapshot_path)
+    
+    def evict(self, keep: Optional[Path] = None):
+        """Remove os snapshots usados há mais tempo até caber no limite"""
+        try:
+            snapshots = []
+            for snapshot_path in self.cache_dir.glob("scan_*.json"):
+                stat = snapshot_path.stat()
+                snapshots.append((stat.st_mtime, stat.st_size, snapshot_path))
+            
+            total_size = sum(size for _, size, _ in snapshots)
+            snapshots.sort()
+            
+            for _, size, snapshot_path in snapshots:
+                if total_size <= self.max_size_bytes:
+                    break
+                if snapshot_path == keep:
+                    continue
+                snapshot_path.unlink()
+                total_size -= size
+        
+        except Exception as e:
+            print(f"Erro ao limpar snapshots: {e}")
+    
+    def clear(self):
+        """Remove todos os snapshots"""
+        for snapshot_path in self.cache_dir.glob("scan_*.json"):
+            try:
+                snapshot_path.unlink()
+            except OSError:
+                pass
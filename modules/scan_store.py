@@ -0,0 +1,448 @@
+"""
+Módulo de armazenamento de escaneamentos em SQLite para UltraTexto Pro
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import datetime
+
+from .tree_walk import walk_depth_first, attach_children_dicts
+
+# Posições das colunas em cada linha de entries
+(ID, PARENT, NAME, PATH, IS_DIRECTORY, IS_EXCLUDED, IS_SUPPORTED, EXCLUSION_REASON,
+ EXTENSION, SIZE, MTIME, DEPTH, FILE_COUNT, DIRECTORY_COUNT,
+ TOTAL_SIZE, TOTAL_FILE_COUNT, TOTAL_DIRECTORY_COUNT) = range(17)
+
+_COLUMNS = ("id, parent, name, path, is_directory, is_excluded, is_supported, "
+            "exclusion_reason, extension, size, mtime, depth, file_count, directory_count, "
+            "total_size, total_file_count, total_directory_count")
+
+_SCHEMA = """
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    parent INTEGER,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    is_directory INTEGER NOT NULL,
+    is_excluded INTEGER NOT NULL DEFAULT 0,
+    is_supported INTEGER NOT NULL DEFAULT 0,
+    exclusion_reason TEXT NOT NULL DEFAULT '',
+    extension TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL DEFAULT 0,
+    mtime REAL,
+    depth INTEGER NOT NULL,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    directory_count INTEGER NOT NULL DEFAULT 0,
+    total_size INTEGER NOT NULL DEFAULT 0,
+    total_file_count INTEGER NOT NULL DEFAULT 0,
+    total_directory_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE scan_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_entries_parent ON entries(parent);
+CREATE INDEX IF NOT EXISTS idx_entries_extension ON entries(extension);
+CREATE INDEX IF NOT EXISTS idx_entries_size ON entries(is_directory, size);
+CREATE INDEX IF NOT EXISTS idx_entries_name ON entries(name_key);
+CREATE INDEX IF NOT EXISTS idx_entries_depth ON entries(depth);
+"""
+
+def _py_lower(value: Optional[str]) -> Optional[str]:
+    """lower() do Python (o LOWER do SQLite só trata ASCII)"""
+    return value.lower() if value is not None else None
+
+class SQLiteScanStore:
+    """
+    Árvore de escaneamento gravada em um banco SQLite local.
+    As entradas são inseridas em lotes durante o escaneamento e as consultas
+    (maiores arquivos, extensões, duplicados, busca) rodam em SQL, então o
+    uso de memória não depende do tamanho da árvore.
+    """
+    
+    BATCH_SIZE = 1000
+    
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.create_function("py_lower", 1, _py_lower, deterministic=True)
+        self._lock = threading.RLock()
+        self._pending_entries: List[Tuple] = []
+        self._pending_counts: List[Tuple] = []
+        self.root_id: Optional[int] = self._load_root_id()
+    
+    @classmethod
+    def from_config(cls, config_manager) -> 'SQLiteScanStore':
+        """Cria o armazenamento no diretório de cache"""
+        return cls(config_manager.get_cache_directory() / "scans" / "scan_store.sqlite3")
+    
+    def _load_root_id(self) -> Optional[int]:
+        try:
+            row = self._connection.execute(
+                "SELECT id FROM entries WHERE parent IS NULL ORDER BY id LIMIT 1"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+    
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._connection.close()
+    
+    # Escrita
+    
+    def reset(self, root_path: str, name: str, mtime: Optional[float] = None) -> int:
+        """Descarta o escaneamento anterior e grava a raiz de um novo"""
+        with self._lock:
+            self._pending_entries.clear()
+            self._pending_counts.clear()
+            self._connection.executescript(
+                "DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS scan_info;" + _SCHEMA
+            )
+            cursor = self._connection.execute(
+                "INSERT INTO entries (parent, name, name_key, path, is_directory, mtime, depth) "
+                "VALUES (NULL, ?, ?, ?, 1, ?, 0)",
+                (name, name.lower(), root_path, mtime)
+            )
+            self._connection.execute(
+                "INSERT INTO scan_info (key, value) VALUES ('started_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+            self._connection.commit()
+            self.root_id = cursor.lastrowid
+            return self.root_id
+    
+    def add_entry(self, parent: int, name: str, path: str, is_directory: bool, depth: int,
+                  size: int = 0, mtime: Optional[float] = None, extension: str = "",
+                  is_excluded: bool = False, is_supported: bool = False,
+                  exclusion_reason: str = ""):
+        """Enfileira uma entrada para inserção em lote"""
+        self._pending_entries.append((
+            parent, name, name.lower(), path, int(is_directory), int(is_excluded),
+            int(is_supported), exclusion_reason, extension, size, mtime, depth,
+            0 if is_directory else size
+        ))
+        if len(self._pending_entries) >= self.BATCH_SIZE:
+            self.flush()
+    
+    def set_directory_counts(self, directory_id: int, file_count: int,
+                             directory_count: int, size: int):
+        """Registra os contadores diretos de um diretório listado"""
+        self._pending_counts.append((file_count, directory_count, size, directory_id))
+    
+    def flush(self):
+        """Grava as entradas e contadores pendentes"""
+        with self._lock:
+            if self._pending_entries:
+                self._connection.executemany(
+                    "INSERT INTO entries (parent, name, name_key, path, is_directory, "
+                    "is_excluded, is_supported, exclusion_reason, extension, size, mtime, "
+                    "depth, total_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending_entries
+                )
+                self._pending_entries.clear()
+            if self._pending_counts:
+                self._connection.executemany(
+                    "UPDATE entries SET file_count = ?, directory_count = ?, size = ? "
+                    "WHERE id = ?",
+                    self._pending_counts
+                )
+                self._pending_counts.clear()
+            self._connection.commit()
+    
+    def pending_directories(self, after_id: int, max_depth: int = -1,
+                            limit: int = 256) -> List[Tuple[int, str, int]]:
+        """
+        Diretórios gravados depois de after_id que ainda devem ser listados.
+        A fronteira do escaneamento fica no banco, não na memória.
+        """
+        self.flush()
+        query = ("SELECT id, path, depth FROM entries "
+                 "WHERE id > ? AND is_directory = 1 AND is_excluded = 0")
+        params: List = [after_id]
+        if max_depth >= 0:
+            query += " AND depth < ?"
+            params.append(max_depth)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        
+        with self._lock:
+            return self._connection.execute(query, params).fetchall()
+    
+    def finish(self):
+        """Cria os índices e calcula os agregados de baixo para cima"""
+        self.flush()
+        with self._lock:
+            self._connection.executescript(_INDEXES)
+            
+            max_depth = self._connection.execute("SELECT MAX(depth) FROM entries").fetchone()[0] or 0
+            for depth in range(max_depth, -1, -1):
+                self._connection.execute(
+                    "UPDATE entries SET "
+                    "total_size = COALESCE((SELECT SUM(c.total_size) FROM entries c "
+                    "WHERE c.parent = entries.id), 0), "
+                    "total_file_count = file_count + COALESCE((SELECT SUM(c.total_file_count) "
+                    "FROM entries c WHERE c.parent = entries.id), 0), "
+                    "total_directory_count = directory_count + "
+                    "COALESCE((SELECT SUM(c.total_directory_count) FROM entries c "
+                    "WHERE c.parent = entries.id), 0) "
+                    "WHERE is_directory = 1 AND depth = ?",
+                    (depth,)
+                )
+            
+            self._connection.execute(
+                "INSERT OR REPLACE INTO scan_info (key, value) VALUES ('finished_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+            self._connection.commit()
+    
+    # Leitura
+    
+    def _fetch(self, query: str, params: Sequence = ()) -> List[Tuple]:
+        with self._lock:
+            return self._connection.execute(query, params).fetchall()
+    
+    def _views(self, rows: Iterable[Tuple]) -> List['StoredNodeView']:
+        return [StoredNodeView(self, row) for row in rows]
+    
+    def _subtree_clause(self, node: 'StoredNodeView') -> Tuple[str, Tuple]:
+        """Restringe uma consulta ao nó e à sua subárvore (intervalo de caminhos)"""
+        if node.id == self.root_id:
+            return "", ()
+        path = node.path_text
+        return (" AND (id = ? OR (path > ? AND path < ?))",
+                (node.id, path + os.sep, path + chr(ord(os.sep) + 1)))
+    
+    def get_node(self, entry_id: int) -> Optional['StoredNodeView']:
+        """Retorna o nó de uma entrada"""
+        rows = self._fetch(f"SELECT {_COLUMNS} FROM entries WHERE id = ?", (entry_id,))
+        return StoredNodeView(self, rows[0]) if rows else None
+    
+    @property
+    def root(self) -> Optional['StoredNodeView']:
+        """Nó raiz do escaneamento gravado"""
+        return self.get_node(self.root_id) if self.root_id is not None else None
+    
+    def children_of(self, entry_id: int) -> List['StoredNodeView']:
+        """Filhos de uma entrada, na ordem da listagem"""
+        return self._views(self._fetch(
+            f"SELECT {_COLUMNS} FROM entries WHERE parent = ? ORDER BY id", (entry_id,)
+        ))
+    
+    def largest_files(self, node: 'StoredNodeView', count: int) -> List['StoredNodeView']:
+        clause, params = self._subtree_clause(node)
+        return self._views(self._fetch(
+            f"SELECT {_COLUMNS} FROM entries WHERE is_directory = 0 AND is_excluded = 0"
+            f"{clause} ORDER BY size DESC LIMIT ?", params + (count,)
+        ))
+    
+    def largest_directories(self, node: 'StoredNodeView', count: int) -> List['StoredNodeView']:
+        clause, params = self._subtree_clause(node)
+        return self._views(self._fetch(
+            f"SELECT {_COLUMNS} FROM entries WHERE is_directory = 1 AND is_excluded = 0"
+            f"{clause} ORDER BY total_size DESC LIMIT ?", params + (count,)
+        ))
+    
+    def files_by_extension(self, node: 'StoredNodeView', extension: str) -> List['StoredNodeView']:
+        clause, params = self._subtree_clause(node)
+        return self._views(self._fetch(
+            f"SELECT {_COLUMNS} FROM entries WHERE extension = ? AND is_directory = 0 "
+            f"AND is_excluded = 0{clause} ORDER BY id", (extension,) + params
+        ))
+    
+    def empty_directories(self, node: 'StoredNodeView') -> List['StoredNodeView']:
+        clause, params = self._subtree_clause(node)
+        return self._views(self._fetch(
+            f"SELECT {_COLUMNS} FROM entries e WHERE is_directory = 1 AND is_excluded = 0"
+            f"{clause} AND NOT EXISTS (SELECT 1 FROM entries c WHERE c.parent = e.id) "
+            f"ORDER BY id", params
+        ))
+    
+    def duplicate_names(self, node: 'StoredNodeView') -> Dict[str, List['StoredNodeView']]:
+        clause, params = self._subtree_clause(node)
+        rows = self._fetch(
+            f"SELECT {_COLUMNS}, name_key FROM entries WHERE is_excluded = 0{clause} "
+            f"AND name_key IN (SELECT name_key FROM entries WHERE is_excluded = 0{clause} "
+            f"GROUP BY name_key HAVING COUNT(*) > 1) ORDER BY name_key, id",
+            params + params
+        )
+        duplicates: Dict[str, List[StoredNodeView]] = {}
+        for row in rows:
+            duplicates.setdefault(row[-1], []).append(StoredNodeView(self, row[:-1]))
+        return duplicates
+    
+    def search(self, node: 'StoredNodeView', query: str) -> List['StoredNodeView']:
+        """Entradas cujo caminho contém a consulta (nome e extensão fazem parte do caminho)"""
+        clause, params = self._subtree_clause(node)
+        return self._views(self._fetch(
+            f"SELECT {_COLUMNS} FROM entries WHERE instr(py_lower(path), ?) > 0{clause} "
+            f"ORDER BY id", (query.lower(),) + params
+        ))
+    
+    def content_candidates(self, node: 'StoredNodeView', extensions: Iterable[str],
+                           max_size: int) -> List['StoredNodeView']:
+        """Arquivos pequenos das extensões indicadas (busca no conteúdo)"""
+        extensions = list(extensions)
+        clause, params = self._subtree_clause(node)
+        placeholders = ", ".join("?" for _ in extensions)
+        return self._views(self._fetch(
+            f"SELECT {_COLUMNS} FROM entries WHERE is_directory = 0 AND size < ? "
+            f"AND extension IN ({placeholders}){clause} ORDER BY id",
+            (max_size, *extensions) + params
+        ))
+    
+    def extension_distribution(self, node: 'StoredNodeView') -> Dict[str, int]:
+        clause, params = self._subtree_clause(node)
+        return dict(self._fetch(
+            f"SELECT extension, COUNT(*) FROM entries WHERE is_directory = 0 "
+            f"AND extension != ''{clause} GROUP BY extension", params
+        ))
+
+class StoredNodeView:
+    """
+    Visão de uma entrada do SQLiteScanStore.
+    Oferece a mesma API de consulta de DirectoryNode; os filhos são lidos
+    do banco sob demanda.
+    """
+    
+    __slots__ = ('store', 'row')
+    
+    def __init__(self, store: SQLiteScanStore, row: Tuple):
+        self.store = store
+        self.row = row
+    
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, StoredNodeView) and
+                other.store is self.store and other.id == self.id)
+    
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.id))
+    
+    def __repr__(self) -> str:
+        return f"StoredNodeView({self.path_text!r})"
+    
+    @property
+    def id(self) -> int:
+        return self.row[ID]
+    
+    @property
+    def name(self) -> str:
+        return self.row[NAME]
+    
+    @property
+    def path_text(self) -> str:
+        return self.row[PATH]
+    
+    @property
+    def path(self) -> Path:
+        return Path(self.row[PATH])
+    
+    @property
+    def is_directory(self) -> bool:
+        return bool(self.row[IS_DIRECTORY])
+    
+    @property
+    def is_excluded(self) -> bool:
+        return bool(self.row[IS_EXCLUDED])
+    
+    @property
+    def is_supported(self) -> bool:
+        return bool(self.row[IS_SUPPORTED])
+    
+    @property
+    def exclusion_reason(self) -> str:
+        return self.row[EXCLUSION_REASON]
+    
+    @property
+    def extension(self) -> str:
+        return self.row[EXTENSION]
+    
+    @property
+    def size(self) -> int:
+        return self.row[SIZE]
+    
+    @property
+    def depth(self) -> int:
+        return self.row[DEPTH]
+    
+    @property
+    def modified_time(self) -> Optional[datetime]:
+        mtime = self.row[MTIME]
+        return datetime.fromtimestamp(mtime) if mtime is not None else None
+    
+    @property
+    def file_count(self) -> int:
+        return self.row[FILE_COUNT]
+    
+    @property
+    def directory_count(self) -> int:
+        return self.row[DIRECTORY_COUNT]
+    
+    @property
+    def parent(self) -> Optional['StoredNodeView']:
+        parent_id = self.row[PARENT]
+        return self.store.get_node(parent_id) if parent_id is not None else None
+    
+    @property
+    def children(self) -> List['StoredNodeView']:
+        if not self.is_directory:
+            return []
+        return self.store.children_of(self.id)
+    
+    def get_total_size(self) -> int:
+        return self.row[TOTAL_SIZE]
+    
+    def get_total_file_count(self) -> int:
+        return self.row[TOTAL_FILE_COUNT]
+    
+    def get_total_directory_count(self) -> int:
+        return self.row[TOTAL_DIRECTORY_COUNT]
+    
+    def get_extension_distribution(self) -> Dict[str, int]:
+        if not self.is_directory:
+            return {self.extension: 1} if self.extension else {}
+        return self.store.extension_distribution(self)
+    
+    def find_nodes(self, predicate) -> List['StoredNodeView']:
+        """Encontra nós que satisfazem o predicado"""
+        return [node for node in walk_depth_first([self], lambda node: node.children)
+                if predicate(node)]
+    
+    def to_dict(self, include_children: bool = True) -> Dict:
+        """Converte o nó para dicionário"""
+        data = self._node_dict()
+        if include_children:
+            attach_children_dicts(self, data)
+        return data
+    
+    def _node_dict(self) -> Dict:
+        """Campos do nó, sem os filhos"""
+        modified_time = self.modified_time
+        return {
+            'path': self.path_text,
+            'name': self.name,
+            'is_directory': self.is_directory,
+            'size': self.size,
+            'file_count': self.file_count,
+            'directory_count': self.directory_count,
+            'modified_time': modified_time.isoformat() if modified_time else None,
+            'is_excluded': self.is_excluded,
+            'exclusion_reason': self.exclusion_reason,
+            'extension': self.extension,
+            'is_supported': self.is_supported,
+            'depth': self.depth,
+            'total_size': self.get_total_size(),
+            'total_file_count': self.get_total_file_count(),
+            'total_directory_count': self.get_total_directory_count()
+        }
@@ -0,0 +1,62 @@
+"""
+Percurso iterativo de árvores para UltraTexto Pro
+"""
+
+from typing import Any, Callable, Dict, Generator, Iterable, Optional, Tuple
+
+_END = object()
+
+def walk_depth_first(roots: Iterable[Any],
+                     expand: Callable[[Any], Optional[Iterable[Any]]]) -> Generator[Any, None, None]:
+    """
+    Percorre em pré-ordem com uma pilha explícita de iteradores.
+    expand(item) devolve os filhos do item e só é chamado depois que o
+    consumidor processou o item, então filhos podem ser gerados sob demanda
+    (listagens de disco, elementos XML). A profundidade não consome frames
+    do Python, evitando RecursionError em árvores muito profundas.
+    """
+    stack = [iter(roots)]
+    while stack:
+        item = next(stack[-1], _END)
+        if item is _END:
+            stack.pop()
+            continue
+        
+        yield item
+        
+        children = expand(item)
+        if children:
+            stack.append(iter(children))
+
+def walk_tree(root: Any, get_children: Callable[[Any], Iterable[Any]],
+              include: Optional[Callable[[Any], bool]] = None
+              ) -> Generator[Tuple[Any, str, bool], None, None]:
+    """
+    Percorre uma árvore em pré-ordem devolvendo (nó, prefixo, é_último).
+    O prefixo é o recuo com as linhas-guia ("│   ") dos ancestrais; nós
+    rejeitados por include não são visitados, mas contam para é_último.
+    """
+    def expand(item):
+        node, prefix, is_last = item
+        children = get_children(node)
+        if not children:
+            return None
+        
+        next_prefix = prefix + ("    " if is_last else "│   ")
+        last_index = len(children) - 1
+        return [(child, next_prefix, i == last_index)
+                for i, child in enumerate(children)
+                if include is None or include(child)]
+    
+    roots = [(root, "", True)] if include is None or include(root) else []
+    return walk_depth_first(roots, expand)
+
+def attach_children_dicts(node: Any, data: Dict):
+    """Preenche 'children' com o _node_dict() de toda a subárvore, sem recursão"""
+    def expand(item):
+        current, current_data = item
+        current_data['children'] = [child._node_dict() for child in current.children]
+        return list(zip(current.children, current_data['children']))
+    
+    for _ in walk_depth_first([(node, data)], expand):
+        pass
@@ -236,10 +236,13 @@ class FileTreeView:
 class SearchBox:
     """Componente de caixa de busca com filtros"""
     
-    def __init__(self, parent, on_search=None, on_clear=None):
+    def __init__(self, parent, on_search=None, on_clear=None, search_as_you_type=False,
+                 delay_ms=150):
         self.parent = parent
         self.on_search = on_search
         self.on_clear = on_clear
+        self.delay_ms = delay_ms
+        self._pending_search = None
         
         # Frame principal
         self.frame = ttk.Frame(parent, style='Card.TFrame', padding=10)
@@ -269,6 +272,10 @@ class SearchBox:
         
         # Bind Enter
         self.search_entry.bind('<Return>', lambda e: self._on_search())
+        
+        # Busca enquanto digita (agrupando teclas próximas)
+        if search_as_you_type:
+            self.search_var.trace_add('write', lambda *args: self._schedule_search())
     
     def pack(self, **kwargs):
         self.frame.pack(**kwargs)
@@ -285,7 +292,13 @@ class SearchBox:
     def clear(self):
         self.search_var.set("")
     
+    def _schedule_search(self):
+        if self._pending_search is not None:
+            self.frame.after_cancel(self._pending_search)
+        self._pending_search = self.frame.after(self.delay_ms, self._on_search)
+    
     def _on_search(self):
+        self._pending_search = None
         if self.on_search:
             self.on_search(self.get_text())
     
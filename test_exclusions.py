@@ -146,6 +146,571 @@ def test_exclusion_profiles():
         print(f"❌ Erro durante testes de perfis: {e}")
         return False
 
+def test_compiled_matcher():
+    """Testa se o matcher compilado decide como a avaliação regra a regra"""
+    print("\n🧪 Testando Matcher Compilado")
+    print("=" * 40)
+    
+    try:
+        import tempfile
+        from modules.exclusion_manager import ExclusionRule
+        from modules.exclusion_matcher import normalize_path, PathMetadata
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            profile = exclusion_manager.create_profile("Matcher", "Perfil de teste")
+            exclusion_manager.set_current_profile("Matcher")
+            
+            rules = [
+                ExclusionRule('regex', r'.*/(a)\1.*', 'Referência a grupo'),
+                ExclusionRule('folder', 'Build', 'Pasta sensível', case_sensitive=True),
+                ExclusionRule('file', 'README.md', 'Arquivo'),
+                ExclusionRule('extension', 'LOG', 'Extensão sem ponto'),
+                ExclusionRule('extension', '.Tmp', 'Extensão sensível', case_sensitive=True),
+                ExclusionRule('regex', r'.*\.min\.(js|css)$', 'Minificados'),
+                ExclusionRule('regex', r'(?i).*secret.*', 'Flag global'),
+                ExclusionRule('regex', r'[invalida', 'Regex inválida'),
+                ExclusionRule('wildcard', '*/docs/*.TXT', 'Curinga'),
+                ExclusionRule('wildcard', '*/Docs/*', 'Curinga sensível', case_sensitive=True),
+                ExclusionRule('folder', 'env', 'Pasta'),
+                ExclusionRule('folder_substring', 'out', 'Pasta por trecho'),
+                ExclusionRule('folder', 'src/generated', 'Pasta por caminho'),
+                ExclusionRule('file', 'skip.me', 'Desabilitada', enabled=False),
+                ExclusionRule('folder', 'node_modules', 'Dependências'),
+                ExclusionRule('size', '>1KB', 'Tamanho'),
+                ExclusionRule('extension', '.env', 'Arquivo .env'),
+            ]
+            for rule in rules:
+                profile.add_rule(rule)
+            
+            paths = [
+                "/p/aa/x.py", "/p/build", "/p/Build", "/p/Build/x", "/p/README.md", "/p/readme.MD",
+                "/p/x.log", "/p/x.LOG", "/p/x.tmp", "/p/x.Tmp", "/p/app.min.js", "/p/SECRET.txt",
+                "/p/docs/a.txt", "/p/Docs/a.py", "/p/environment", "/p/skip.me", "/p/.env",
+                "/p/env", "/p/layout", "/p/src/generated", "/p/xsrc/generated", "/p/ENV",
+                "/p/node_modules/", "p//node_modules", "./x.log", "/p/x.", "/p/.hidden",
+                str(Path(__file__)), str(Path(__file__).parent), "/p/ok.py",
+            ]
+            
+            enabled_rules = profile.get_enabled_rules()
+            for path in paths:
+                for is_directory in (False, True):
+                    expected = next((rule for rule in enabled_rules
+                                     if exclusion_manager._matches_rule(Path(path), rule, is_directory)),
+                                    None)
+                    found = exclusion_manager.get_matcher().match(path, is_directory)
+                    if found is not expected:
+                        print(f"❌ Decisão divergente para {path!r} (diretório={is_directory})")
+                        return False
+                    assert normalize_path(path) == str(Path(path)), f"Normalização divergente: {path!r}"
+            
+            # Pastas comparam componentes; o trecho só vale na regra explícita
+            assert exclusion_manager.should_exclude_path("/p/env", True)[0], "Pasta não excluída"
+            assert not exclusion_manager.should_exclude_path("/p/environment", True)[0], \
+                "Pasta excluída por trecho do nome"
+            assert exclusion_manager.should_exclude_path("/p/layout", True) == \
+                (True, "Regra: Pasta por trecho"), "Regra por trecho não aplicada"
+            
+            # Metadados do chamador dispensam o stat (o caminho nem existe)
+            missing = "/caminho/inexistente/grande.bin"
+            assert exclusion_manager.should_exclude_path(
+                missing, metadata=PathMetadata(size=4096, mtime=0.0)) == (True, "Regra: Tamanho")
+            assert exclusion_manager.should_exclude_paths([
+                (missing, False, PathMetadata(size=10, mtime=0.0)),
+                (missing, False, PathMetadata(size=4096, mtime=0.0)),
+                ("/p/x.log", False, None),
+            ]) == [(False, ""), (True, "Regra: Tamanho"), (True, "Regra: Extensão sem ponto")]
+            
+            # Avaliação por diretório decide como a avaliação por caminho
+            names = ["aa", "Build", "README.md", "x.LOG", "x.Tmp", "SECRET.txt", "env",
+                     "layout", "generated", "node_modules", ".env", "ok.py"]
+            for parent in ("/", "/p", "/p/", "/P/src", "/p/Docs", "./docs"):
+                entries = [(name, is_directory, None)
+                           for name in names for is_directory in (False, True)]
+                results = exclusion_manager.evaluate_directory(parent, entries)
+                for (name, is_directory, _), (excluded, reason_id) in zip(entries, results):
+                    expected = exclusion_manager.should_exclude_path(
+                        os.path.join(parent, name), is_directory)
+                    found = (excluded, exclusion_manager.get_exclusion_reason(reason_id))
+                    if found != expected:
+                        print(f"❌ Listagem divergente para {parent!r}/{name!r}: {found} != {expected}")
+                        return False
+            
+            # Motivos internados: a mesma regra devolve o mesmo id e a mesma string
+            first, second = exclusion_manager.evaluate_directory(
+                "/a", [("x.log", False, None), ("y.log", False, None)])
+            assert first == second and first[1] != 0, "Motivo não internado"
+            assert exclusion_manager.evaluate_directory("/a", [("ok.txt", False, None)]) == [(False, 0)]
+            
+            # Alterar o perfil recompila o matcher
+            matcher = exclusion_manager.get_matcher()
+            profile.add_rule(ExclusionRule('file', 'ok.py', 'Nova regra'))
+            assert exclusion_manager.get_matcher() is not matcher, "Matcher não recompilado"
+            assert exclusion_manager.should_exclude_path("/p/ok.py") == (True, "Regra: Nova regra")
+        
+        print("✅ Matcher compilado equivalente à avaliação regra a regra")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro durante teste do matcher: {e!r}")
+        return False
+
+def test_rule_profiler():
+    """Testa a contagem de avaliações, acertos e tempo por regra"""
+    print("\n🧪 Testando Perfil de Desempenho das Regras")
+    print("=" * 40)
+    
+    try:
+        import json
+        import tempfile
+        from modules.exclusion_manager import ExclusionRule
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            profile = exclusion_manager.create_profile("Perfilador", "Perfil de teste")
+            exclusion_manager.set_current_profile("Perfilador")
+            profile.add_rule(ExclusionRule('folder', 'node_modules', 'Dependências'))
+            profile.add_rule(ExclusionRule('extension', '.log', 'Logs'))
+            profile.add_rule(ExclusionRule('regex', r'.*\.(jpg|png)$', 'Imagens'))
+            
+            paths = [("/p/node_modules", True), ("/p/a.log", False), ("/p/b.png", False),
+                     ("/p/c.py", False)]
+            expected = [exclusion_manager.should_exclude_path(path, is_directory)
+                        for path, is_directory in paths]
+            
+            exclusion_manager.enable_profiling()
+            found = [exclusion_manager.should_exclude_path(path, is_directory)
+                     for path, is_directory in paths]
+            assert found == expected, "Decisões mudaram com o perfil ligado"
+            assert exclusion_manager.evaluate_directory("/p", [("d.jpg", False, None)])[0][0], \
+                "Listagem não excluída com o perfil ligado"
+            
+            report = exclusion_manager.get_statistics()['rule_profile']
+            assert report['paths_evaluated'] == 5, f"Caminhos contados: {report['paths_evaluated']}"
+            counters = {entry['description']: (entry['evaluations'], entry['hits'])
+                        for entry in report['rules']}
+            # A primeira regra que casa encerra a avaliação do caminho
+            assert counters == {'Dependências': (5, 1), 'Logs': (4, 1), 'Imagens': (3, 2)}, \
+                f"Contadores inesperados: {counters}"
+            assert all(entry['total_ns'] >= 0 for entry in report['rules'])
+            
+            report_path = os.path.join(temp_dir, "perfil_regras.json")
+            exclusion_manager.export_profiling_report(report_path)
+            with open(report_path, 'r', encoding='utf-8') as f:
+                assert len(json.load(f)['rules']) == 3, "Relatório exportado incompleto"
+            
+            exclusion_manager.reset_profiling()
+            assert exclusion_manager.get_statistics()['rule_profile']['paths_evaluated'] == 0
+            exclusion_manager.enable_profiling(False)
+            assert exclusion_manager.get_statistics()['rule_profile'] is None
+            
+            print("✅ Contadores por regra consistentes com a ordem do perfil")
+            return True
+    
+    except Exception as e:
+        print(f"❌ Erro durante teste do perfil de regras: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_gitignore_rules():
+    """Testa a regra que segue os arquivos .gitignore de cada pasta"""
+    print("\n🧪 Testando Regras .gitignore")
+    print("=" * 40)
+    
+    try:
+        import tempfile
+        from modules.exclusion_manager import ExclusionRule
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = Path(temp_dir) / "repo"
+            for directory in (".git", "a/b/c", "logs/keep", "build", "x/build", "docs/z", "src/gen"):
+                (repo / directory).mkdir(parents=True, exist_ok=True)
+            (repo / ".gitignore").write_text(
+                "# comentário\n*.log\n!logs/keep/*.log\n/build\ndocs/**/*.tmp\n**/gen/\n"
+                "a/**/c\n", encoding='utf-8')
+            (repo / "a" / ".gitignore").write_text("secret\n!keep.log\n", encoding='utf-8')
+            # Arquivo acima da raiz do repositório não vale dentro dele
+            (Path(temp_dir) / ".gitignore").write_text("*.py\n", encoding='utf-8')
+            
+            expected = {
+                "x.log": True, "logs/x.log": True, "logs/keep/k.log": False,
+                "build/o": True, "x/build/o": False, "docs/q.tmp": True, "docs/z/q.tmp": True,
+                "src/gen/f": True, "src/genx": False, "a/b/c/f": True, "a/secret": True,
+                "a/b/secret": True, "a/keep.log": False, "a/b/keep.log": False, "main.py": False,
+            }
+            
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            profile = exclusion_manager.create_profile("Git", "Perfil de teste")
+            exclusion_manager.set_current_profile("Git")
+            profile.add_rule(ExclusionRule('gitignore', '.gitignore', 'Arquivos .gitignore',
+                                           case_sensitive=True))
+            
+            for relative, ignored in expected.items():
+                path = str(repo / relative)
+                if exclusion_manager.should_exclude_path(path)[0] != ignored:
+                    print(f"❌ Decisão divergente do git para {relative}")
+                    return False
+            
+            assert exclusion_manager.should_exclude_path(str(repo / "build"), True)[0]
+            assert not exclusion_manager.should_exclude_path(str(repo / "x" / "build"), True)[0]
+            
+            # Listagem por diretório e regras comuns antes da regra gitignore
+            profile.rules.insert(0, ExclusionRule('file', 'keep.log', 'Primeiro'))
+            profile.mark_modified()
+            results = exclusion_manager.evaluate_directory(
+                str(repo / "a"), [("keep.log", False, None), ("secret", False, None),
+                                  ("b", True, None)])
+            reasons = [(excluded, exclusion_manager.get_exclusion_reason(reason_id))
+                       for excluded, reason_id in results]
+            assert reasons == [(True, "Regra: Primeiro"), (True, "Regra: Arquivos .gitignore"),
+                               (False, "")], f"Listagem inesperada: {reasons}"
+            
+            # Arquivo compilado uma vez e reaproveitado até ser descartado
+            tree = exclusion_manager.get_ignore_tree(".gitignore", True)
+            assert tree.files_loaded == 2, f"Arquivos carregados: {tree.files_loaded}"
+            (repo / "a" / ".gitignore").write_text("", encoding='utf-8')
+            assert exclusion_manager.should_exclude_path(str(repo / "a" / "secret"))[0]
+            exclusion_manager.clear_ignore_files()
+            assert not exclusion_manager.should_exclude_path(str(repo / "a" / "secret"))[0]
+            
+            print("✅ Regras .gitignore decidem como o git")
+            return True
+    
+    except Exception as e:
+        print(f"❌ Erro durante teste de .gitignore: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_include_patterns():
+    """Testa os padrões de inclusão e o corte da travessia"""
+    print("\n🧪 Testando Padrões de Inclusão")
+    print("=" * 40)
+    
+    try:
+        import tempfile
+        from modules.exclusion_manager import ExclusionRule
+        from modules.directory_scanner import DirectoryScanner
+        from modules.file_processor import FileProcessor
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "mono"
+            for relative in ("src/app/main.py", "src/app/data.json", "src/util.py",
+                             "lib/deep/x.py", "docs/README.md", "docs/other.md", "setup.py"):
+                (root / relative).parent.mkdir(parents=True, exist_ok=True)
+                (root / relative).write_text("x", encoding='utf-8')
+            
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            profile = exclusion_manager.create_profile("Inclusão", "Perfil de teste")
+            exclusion_manager.set_current_profile("Inclusão")
+            profile.add_rule(ExclusionRule('extension', '.json', 'JSON'))
+            profile.add_rule(ExclusionRule('include', 'src/**/*.py', 'Código'))
+            profile.add_rule(ExclusionRule('include', 'docs/README.md', 'Leia-me'))
+            
+            # Sem raiz de escaneamento os padrões de inclusão não se aplicam
+            assert not exclusion_manager.should_exclude_path(str(root / "setup.py"))[0]
+            
+            exclusion_manager.begin_scan(str(root))
+            expected = {
+                ("src", True): (False, ""), ("src/app", True): (False, ""),
+                ("src/app/main.py", False): (False, ""),
+                ("src/app/data.json", False): (True, "Regra: JSON"),
+                ("lib", True): (True, "Fora dos padrões de inclusão"),
+                ("docs", True): (False, ""),
+                ("docs/other.md", False): (True, "Fora dos padrões de inclusão"),
+                ("setup.py", False): (True, "Fora dos padrões de inclusão"),
+            }
+            for (relative, is_directory), decision in expected.items():
+                found = exclusion_manager.should_exclude_path(str(root / relative), is_directory)
+                if found != decision:
+                    print(f"❌ Decisão inesperada para {relative}: {found}")
+                    return False
+            
+            results = exclusion_manager.evaluate_directory(
+                str(root / "docs"), [("README.md", False, None), ("other.md", False, None)])
+            assert [excluded for excluded, _ in results] == [False, True], f"Listagem: {results}"
+            
+            # A travessia não entra em diretórios sem possibilidade de correspondência
+            scanner = DirectoryScanner({'.py', '.md'}, exclusion_manager)
+            tree = scanner.scan_directory(str(root))
+            lib = next(child for child in tree.children if child.name == "lib")
+            assert lib.is_excluded and not lib.children, "Diretório lib foi percorrido"
+            included = sorted(str(node.path.relative_to(root)).replace(os.sep, '/')
+                              for node in tree.find_nodes(lambda n: not n.is_directory)
+                              if not node.is_excluded)
+            assert included == ["docs/README.md", "src/app/main.py", "src/util.py"], \
+                f"Arquivos incluídos: {included}"
+            
+            processor = FileProcessor({'.py', '.md'}, exclusion_manager)
+            visited = {str(info.path.relative_to(root)).replace(os.sep, '/')
+                       for info in processor.scan_directory(str(root))}
+            assert "lib" in visited and "lib/deep" not in visited, "FileProcessor entrou em lib"
+            
+            # Padrão sem '/' vale em qualquer nível (como no .gitignore); com '/' inicial, só na raiz
+            profile.add_rule(ExclusionRule('include', '*.md', 'Markdown'))
+            exclusion_manager.begin_scan(str(root))
+            assert exclusion_manager.should_exclude_path(str(root / "lib"), True) == (False, ""), \
+                "Padrão sem '/' não alcança subdiretórios"
+            assert not exclusion_manager.should_exclude_path(str(root / "docs/other.md"))[0]
+            assert exclusion_manager.should_exclude_path(str(root / "lib/deep/x.py"))[0]
+            profile.rules[-1].pattern = '/*.md'
+            exclusion_manager.begin_scan(str(root))
+            assert exclusion_manager.should_exclude_path(str(root / "lib"), True)[0], \
+                "Padrão com '/' inicial não ficou ancorado na raiz"
+            
+            print("✅ Padrões de inclusão restringem a travessia")
+            return True
+    
+    except Exception as e:
+        print(f"❌ Erro durante teste de inclusão: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_decision_cache():
+    """Testa o cache de decisões e sua invalidação"""
+    print("\n🧪 Testando Cache de Decisões")
+    print("=" * 40)
+    
+    try:
+        import tempfile
+        from modules.exclusion_manager import ExclusionRule
+        from modules.exclusion_cache import ExclusionDecisionCache
+        from modules.exclusion_matcher import PathMetadata
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "decisoes.json")
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            exclusion_manager.decision_cache = ExclusionDecisionCache(cache_path=cache_path)
+            profile = exclusion_manager.create_profile("Cache", "Perfil de teste")
+            exclusion_manager.set_current_profile("Cache")
+            profile.add_rule(ExclusionRule('extension', '.log', 'Logs'))
+            cache = exclusion_manager.decision_cache
+            
+            assert exclusion_manager.should_exclude_path("/p/a.log") == (True, "Regra: Logs")
+            assert exclusion_manager.should_exclude_path("/p/a.log") == (True, "Regra: Logs")
+            assert exclusion_manager.evaluate_directory("/p", [("a.log", False, None)]) == \
+                [(True, exclusion_manager.evaluate_directory("/q", [("b.log", False, None)])[0][1])]
+            assert cache.hits == 2, f"Acertos: {cache.hits}"
+            
+            # Criar uma regra fora do perfil não invalida nada
+            matcher = exclusion_manager.get_matcher()
+            ExclusionRule('extension', '.foo', 'Temporária').enabled = False
+            assert exclusion_manager.get_matcher() is matcher, "Regra avulsa recompilou o matcher"
+            
+            # Adicionar, desabilitar e remover regras invalida as decisões
+            rule = ExclusionRule('file', 'a.log', 'Arquivo')
+            profile.rules.insert(0, rule)
+            profile.mark_modified()
+            assert exclusion_manager.should_exclude_path("/p/a.log") == (True, "Regra: Arquivo")
+            rule.enabled = False
+            assert exclusion_manager.should_exclude_path("/p/a.log") == (True, "Regra: Logs")
+            profile.remove_rule(1)
+            assert exclusion_manager.should_exclude_path("/p/a.log") == (False, "")
+            
+            # Regras de tamanho entram na chave pelo tamanho
+            profile.add_rule(ExclusionRule('size', '>1KB', 'Grande'))
+            missing = "/caminho/inexistente/x.bin"
+            assert exclusion_manager.should_exclude_path(missing, metadata=PathMetadata(size=10))[0] is False
+            assert exclusion_manager.should_exclude_path(missing, metadata=PathMetadata(size=4096))[0]
+            
+            # Persistência: outro gerenciador com o mesmo perfil reaproveita as decisões
+            exclusion_manager.save_profiles()
+            exclusion_manager.save_decision_cache()
+            other = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            other.decision_cache = ExclusionDecisionCache(cache_path=cache_path)
+            other.set_current_profile("Cache")
+            assert other.should_exclude_path(missing, metadata=PathMetadata(size=4096)) == \
+                (True, "Regra: Grande")
+            assert other.decision_cache.hits == 1, "Decisão gravada não reaproveitada"
+            
+            # Regras de data dependem do relógio: perfil sem cache
+            profile.add_rule(ExclusionRule('date', '>30d', 'Antigo'))
+            hits = cache.hits
+            exclusion_manager.should_exclude_path("/p/b.txt")
+            exclusion_manager.should_exclude_path("/p/b.txt")
+            assert cache.hits == hits, "Perfil com regra de data usou o cache"
+            
+            print("✅ Cache de decisões invalidado com as regras")
+            return True
+    
+    except Exception as e:
+        print(f"❌ Erro durante teste do cache de decisões: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_adaptive_order():
+    """Testa se a ordem adaptativa do matcher preserva as decisões e os motivos"""
+    print("\n🧪 Testando Ordem Adaptativa das Regras")
+    print("=" * 40)
+    
+    try:
+        import tempfile
+        from modules.exclusion_manager import ExclusionRule
+        from modules.exclusion_matcher import PathMetadata
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            exclusion_manager.decision_cache = None
+            profile = exclusion_manager.create_profile("Adaptativo", "Perfil de teste")
+            exclusion_manager.set_current_profile("Adaptativo")
+            for index in range(10):
+                profile.add_rule(ExclusionRule('regex', rf'.*/gerado{index}_.*', f'Regex {index}'))
+            for rule in [
+                ExclusionRule('size', '<1KB', 'Pequeno'),
+                ExclusionRule('folder', 'build', 'Build'),
+                ExclusionRule('folder_substring', 'cache', 'Cache'),
+                ExclusionRule('wildcard', '*.TMP', 'Temporário', case_sensitive=True),
+                ExclusionRule('extension', '.log', 'Logs'),
+                ExclusionRule('file', 'a.log', 'Arquivo a.log'),
+                ExclusionRule('regex', r'.*\.log$', 'Regex de logs'),
+            ]:
+                profile.add_rule(rule)
+            
+            entries = []
+            for index in range(40):
+                entries += [(f"a.log", False, PathMetadata(size=4096, mtime=0.0)),
+                            (f"gerado{index % 12}_x.py", False, PathMetadata(size=4096, mtime=0.0)),
+                            (f"p{index}.py", False, PathMetadata(size=index * 50, mtime=0.0)),
+                            (f"x{index}.TMP", False, PathMetadata(size=4096, mtime=0.0)),
+                            ("build", True, None), (f"mycache{index}", True, None), (f"d{index}", True, None)]
+            expected = exclusion_manager.evaluate_directory("/p", entries)
+            
+            exclusion_manager.enable_adaptive_ordering(sample_size=50)
+            found = exclusion_manager.evaluate_directory("/p", entries)
+            order = exclusion_manager.get_statistics()['adaptive_order']
+            assert order['optimized'], "Ordem não otimizada após as amostras"
+            assert found == expected, "Decisões mudaram durante as amostras"
+            assert exclusion_manager.evaluate_directory("/p", entries) == expected, \
+                "Decisões mudaram com a ordem otimizada"
+            
+            # Vários casos: o motivo é o da primeira regra na ordem do perfil
+            assert exclusion_manager.should_exclude_path(
+                "/p/a.log", metadata=PathMetadata(size=4096, mtime=0.0)) == (True, "Regra: Logs")
+            
+            # A etapa barata e que sempre acerta passa à frente das alternâncias sem acerto
+            stages = [stage['stage'] for stage in order['files']]
+            assert stages.index('size: <1KB') > stages.index('extension (sem maiúsculas)'), \
+                f"Ordem inesperada: {stages}"
+            assert [rule.description for rule in profile.rules][:2] == ['Regex 0', 'Regex 1'], \
+                "Ordem do perfil alterada"
+            
+            # Amostras vindas de várias threads (escaneamento em paralelo) também otimizam
+            import threading
+            exclusion_manager.enable_adaptive_ordering(sample_size=200)
+            matcher = exclusion_manager.get_matcher()
+            listings = []
+            
+            def evaluate():
+                for _ in range(20):
+                    listings.append(matcher.match_listing("/p", entries))
+            
+            threads = [threading.Thread(target=evaluate) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            order = exclusion_manager.get_statistics()['adaptive_order']
+            assert order['optimized'] and order['samples_remaining'] == 0, "Ordem não otimizada com threads"
+            assert len(set(map(tuple, listings))) == 1, "Decisões divergentes entre threads"
+            
+            exclusion_manager.enable_adaptive_ordering(False)
+            assert exclusion_manager.get_statistics()['adaptive_order'] is None
+            
+            print("✅ Ordem adaptativa com as mesmas decisões da ordem do perfil")
+            return True
+    
+    except Exception as e:
+        print(f"❌ Erro durante teste da ordem adaptativa: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_profile_persistence():
+    """Testa a gravação adiada, em lote e atômica dos perfis"""
+    print("\n🧪 Testando Gravação dos Perfis")
+    print("=" * 40)
+    
+    try:
+        import json
+        import time
+        import tempfile
+        from modules.exclusion_manager import ExclusionRule
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0.2)
+            exclusion_manager.flush_profiles()
+            profiles_file = exclusion_manager.profiles_file
+            
+            writes = []
+            save_profiles = exclusion_manager.save_profiles
+            exclusion_manager.save_profiles = lambda: (writes.append(1), save_profiles())
+            
+            def saved_profiles():
+                with open(profiles_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)['profiles']
+            
+            # Alterações próximas viram uma única gravação
+            for index in range(500):
+                exclusion_manager.add_rule_to_current_profile(ExclusionRule('file', f'arquivo{index}.txt'))
+            assert exclusion_manager.has_pending_save and not writes, "Gravação não adiada"
+            time.sleep(0.5)
+            assert len(writes) == 1, f"Gravações: {len(writes)}"
+            assert not exclusion_manager.has_pending_save
+            rule_count = len(saved_profiles()["Padrão"]['rules'])
+            assert rule_count == len(exclusion_manager.current_profile.rules), "Regras não gravadas"
+            
+            # Lote: uma gravação ao final, sem esperar o atraso
+            with exclusion_manager.batch_updates():
+                exclusion_manager.create_profile("Lote", "Perfil de teste")
+                for index in range(100):
+                    exclusion_manager.add_rule_to_current_profile(ExclusionRule('folder', f'pasta{index}'))
+                assert len(writes) == 1, "Gravação dentro do lote"
+            assert len(writes) == 2 and "Lote" in saved_profiles(), "Lote não gravado"
+            
+            # Exceção no lote desfaz as alterações e nada é gravado
+            try:
+                with exclusion_manager.batch_updates():
+                    exclusion_manager.delete_profile("Lote")
+                    exclusion_manager.remove_rule_from_current_profile(0)
+                    raise RuntimeError("falha no meio do lote")
+            except RuntimeError:
+                pass
+            assert "Lote" in exclusion_manager.profiles, "Perfil excluído não restaurado"
+            assert len(exclusion_manager.current_profile.rules) == rule_count + 100, "Regra não restaurada"
+            assert exclusion_manager.should_exclude_path("/p/pasta1", True)[0], "Matcher com perfil antigo"
+            assert len(writes) == 2 and not exclusion_manager.has_pending_save
+            
+            # A gravação troca o arquivo inteiro, sem deixar o temporário
+            assert not profiles_file.with_suffix('.tmp').exists(), "Arquivo temporário esquecido"
+            other = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            assert len(other.profiles["Lote"].rules) == 0 and \
+                len(other.profiles["Padrão"].rules) == rule_count + 100, "Perfis gravados divergentes"
+            
+            # Gravação que falha continua pendente e flush_profiles tenta de novo
+            del exclusion_manager.save_profiles
+            temp_path = profiles_file.with_suffix('.tmp')
+            temp_path.mkdir()
+            exclusion_manager.add_rule_to_current_profile(ExclusionRule('file', 'depois_da_falha.txt'))
+            assert not exclusion_manager.flush_profiles(), "Gravação com falha dada como feita"
+            assert exclusion_manager.has_pending_save, "Alterações perdidas após falha na gravação"
+            temp_path.rmdir()
+            assert exclusion_manager.flush_profiles(), "Gravação não repetida"
+            assert not exclusion_manager.has_pending_save
+            assert any(rule['pattern'] == 'depois_da_falha.txt'
+                       for rule in saved_profiles()["Padrão"]['rules']), "Regra não gravada na nova tentativa"
+            
+            print("✅ Perfis gravados uma vez por janela e por lote")
+            return True
+    
+    except Exception as e:
+        print(f"❌ Erro durante teste da gravação dos perfis: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def main():
     """Função principal de teste"""
     print("🚀 Iniciando Testes do Sistema de Exclusões")
@@ -157,6 +722,27 @@ def main():
     # Testar perfis de exclusão
     test2_passed = test_exclusion_profiles()
     
+    # Testar matcher compilado
+    test3_passed = test_compiled_matcher()
+    
+    # Testar perfil de desempenho das regras
+    test4_passed = test_rule_profiler()
+    
+    # Testar regras .gitignore
+    test5_passed = test_gitignore_rules()
+    
+    # Testar padrões de inclusão
+    test6_passed = test_include_patterns()
+    
+    # Testar cache de decisões
+    test7_passed = test_decision_cache()
+    
+    # Testar ordem adaptativa das regras
+    test8_passed = test_adaptive_order()
+    
+    # Testar gravação dos perfis
+    test9_passed = test_profile_persistence()
+    
     # Resumo final
     print("\n" + "=" * 60)
     print("📋 RESUMO DOS TESTES")
@@ -172,7 +758,43 @@ def main():
     else:
         print("❌ Teste de Perfis de Exclusão: FALHOU")
     
-    if test1_passed and test2_passed:
+    if test3_passed:
+        print("✅ Teste do Matcher Compilado: PASSOU")
+    else:
+        print("❌ Teste do Matcher Compilado: FALHOU")
+    
+    if test4_passed:
+        print("✅ Teste do Perfil de Regras: PASSOU")
+    else:
+        print("❌ Teste do Perfil de Regras: FALHOU")
+    
+    if test5_passed:
+        print("✅ Teste de Regras .gitignore: PASSOU")
+    else:
+        print("❌ Teste de Regras .gitignore: FALHOU")
+    
+    if test6_passed:
+        print("✅ Teste de Padrões de Inclusão: PASSOU")
+    else:
+        print("❌ Teste de Padrões de Inclusão: FALHOU")
+    
+    if test7_passed:
+        print("✅ Teste do Cache de Decisões: PASSOU")
+    else:
+        print("❌ Teste do Cache de Decisões: FALHOU")
+    
+    if test8_passed:
+        print("✅ Teste da Ordem Adaptativa: PASSOU")
+    else:
+        print("❌ Teste da Ordem Adaptativa: FALHOU")
+    
+    if test9_passed:
+        print("✅ Teste da Gravação dos Perfis: PASSOU")
+    else:
+        print("❌ Teste da Gravação dos Perfis: FALHOU")
+    
+    if (test1_passed and test2_passed and test3_passed and test4_passed and test5_passed and
+            test6_passed and test7_passed and test8_passed and test9_passed):
         print("\n🎉 TODOS OS TESTES PASSARAM!")
         print("O sistema de exclusões está funcionando corretamente.")
         return 0
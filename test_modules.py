@@ -152,6 +152,758 @@ def test_directory_scanner():
         print(f"❌ Erro no teste do DirectoryScanner: {e}")
         return False
 
+def test_parallel_directory_scanner():
+    """Testa o escaneamento paralelo do scanner de diretórios"""
+    print("\n🧵 Testando escaneamento paralelo...")
+    
+    try:
+        from modules.directory_scanner import DirectoryScanner
+        
+        supported_extensions = {'.py', '.txt', '.md'}
+        current_dir = Path(__file__).parent
+        
+        serial = DirectoryScanner(supported_extensions)
+        serial_root = serial.scan_directory(str(current_dir), parallel=False)
+        
+        parallel = DirectoryScanner(supported_extensions, max_workers=4)
+        parallel_root = parallel.scan_directory(str(current_dir))
+        
+        def _paths(node):
+            paths = [str(node.path)]
+            for child in node.children:
+                paths.extend(_paths(child))
+            return paths
+        
+        assert _paths(serial_root) == _paths(parallel_root), "Ordem dos nós diferente"
+        print("✅ Árvore paralela idêntica à serial")
+        
+        serial_stats = serial.get_statistics()
+        parallel_stats = parallel.get_statistics()
+        for key in ('total_files', 'total_directories', 'excluded_directories', 'extension_distribution'):
+            assert serial_stats[key] == parallel_stats[key], f"Estatística divergente: {key}"
+        print("✅ Estatísticas do modo paralelo consistentes")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro no teste do escaneamento paralelo: {e}")
+        return False
+
+def test_parallel_exclusions():
+    """Testa exclusões (.gitignore, inclusão e cache) avaliadas pelos workers em paralelo"""
+    print("\n🧵 Testando exclusões no escaneamento paralelo...")
+    
+    try:
+        import tempfile
+        from modules.directory_scanner import DirectoryScanner
+        from modules.exclusion_manager import ExclusionManager, ExclusionRule
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir) / "projeto"
+            (base / ".git").mkdir(parents=True)
+            (base / ".gitignore").write_text("*.log\nbuild/\n", encoding="utf-8")
+            for index in range(24):
+                folder = base / ("src" if index % 3 else "docs") / f"pasta{index}"
+                (folder / "build").mkdir(parents=True)
+                (folder / ".gitignore").write_text("!importante.log\n*.tmp\n", encoding="utf-8")
+                for name in ("a.py", "b.log", "importante.log", "c.tmp", "d.md", "build/e.py"):
+                    (folder / name).write_text(name, encoding="utf-8")
+            
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            exclusion_manager.create_profile("Paralelo", "Perfil de teste")
+            exclusion_manager.set_current_profile("Paralelo")
+            gitignore_rule = ExclusionRule('gitignore', '.gitignore', 'Arquivos .gitignore')
+            for rule in [gitignore_rule,
+                         ExclusionRule('include', 'src/**', 'Código'),
+                         ExclusionRule('include', 'docs/*/*.md', 'Documentação'),
+                         ExclusionRule('extension', '.md', 'Markdown')]:
+                exclusion_manager.add_rule_to_current_profile(rule)
+            
+            def _decisions(node):
+                decisions = [(str(node.path), node.is_excluded, node.exclusion_reason)]
+                for child in node.children:
+                    decisions.extend(_decisions(child))
+                return decisions
+            
+            def _scan(parallel):
+                scanner = DirectoryScanner({'.py'}, exclusion_manager=exclusion_manager, max_workers=8)
+                return _decisions(scanner.scan_directory(str(base), parallel=parallel))
+            
+            expected = _scan(False)
+            assert any(reason == "Regra: Arquivos .gitignore" for _, _, reason in expected)
+            assert any(reason == "Fora dos padrões de inclusão" for _, _, reason in expected)
+            for _ in range(3):
+                assert _scan(True) == expected, "Decisões do modo paralelo divergentes (.gitignore)"
+            print("✅ .gitignore e inclusão iguais no modo paralelo")
+            
+            # Sem a regra .gitignore o perfil usa o cache de decisões
+            gitignore_rule.enabled = False
+            expected = _scan(False)
+            cache = exclusion_manager.decision_cache
+            hits = cache.hits
+            for _ in range(3):
+                assert _scan(True) == expected, "Decisões do modo paralelo divergentes (cache)"
+            assert cache.hits > hits, "Cache de decisões não usado no modo paralelo"
+            print("✅ Cache de decisões consistente no modo paralelo")
+            
+            return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste de exclusões em paralelo: {e!r}")
+        return False
+
+def test_compact_directory_scanner():
+    """Testa a árvore compacta do scanner de diretórios"""
+    print("\n🗜 Testando árvore compacta...")
+    
+    try:
+        from modules.directory_scanner import DirectoryScanner
+        
+        supported_extensions = {'.py', '.txt', '.md'}
+        current_dir = Path(__file__).parent
+        
+        scanner = DirectoryScanner(supported_extensions)
+        root_node = scanner.scan_directory(str(current_dir))
+        node_text = scanner.generate_tree_text(root_node, show_sizes=False)
+        
+        compact_tree = scanner.scan_directory_compact(str(current_dir))
+        compact_text = scanner.generate_tree_text(compact_tree.root, show_sizes=False)
+        
+        assert node_text == compact_text, "Texto da árvore compacta diferente"
+        print(f"✅ Árvore compacta com {len(compact_tree)} entradas equivalente à árvore de nós")
+        
+        assert (compact_tree.root.get_total_file_count() == root_node.get_total_file_count()), \
+            "Contagem de arquivos divergente"
+        largest = scanner.get_largest_files(compact_tree.root, 3)
+        print(f"✅ Consultas na árvore compacta funcionando ({len(largest)} maiores arquivos)")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro no teste da árvore compacta: {e}")
+        return False
+
+def test_streaming_directory_scanner():
+    """Testa o escaneamento em fluxo (iter_scan)"""
+    print("\n📡 Testando escaneamento em fluxo...")
+    
+    try:
+        from modules.directory_scanner import (DirectoryScanner, SCAN_STARTED, SCAN_NODE_ADDED,
+                                               SCAN_DIRECTORY_FINISHED, SCAN_FINISHED)
+        
+        supported_extensions = {'.py', '.txt', '.md'}
+        project_dir = Path(__file__).parent
+        
+        scanner = DirectoryScanner(supported_extensions)
+        events = list(scanner.iter_scan(str(project_dir), buffer_size=1))
+        
+        assert events[0].kind == SCAN_STARTED, "Primeiro evento não é scan_started"
+        assert events[-1].kind == SCAN_FINISHED, "Último evento não é scan_finished"
+        root_node = events[-1].node
+        
+        added = [event.node for event in events if event.kind == SCAN_NODE_ADDED]
+        assert len(added) == scanner.total_items_scanned, "Nós emitidos divergem dos escaneados"
+        
+        # Cada nó é anunciado antes da conclusão do diretório que o contém
+        finished = set()
+        for event in events:
+            if event.kind == SCAN_NODE_ADDED:
+                assert id(event.node.parent) not in finished, "Nó emitido após o fim do diretório"
+            elif event.kind == SCAN_DIRECTORY_FINISHED:
+                finished.add(id(event.node))
+        
+        blocking_root = DirectoryScanner(supported_extensions).scan_directory(str(project_dir))
+        assert (scanner.generate_tree_text(root_node) ==
+                scanner.generate_tree_text(blocking_root)), "scan_directory diverge de iter_scan"
+        
+        # Abandonar a iteração cancela o escaneamento
+        partial_scanner = DirectoryScanner(supported_extensions)
+        stream = partial_scanner.iter_scan(str(project_dir), buffer_size=1)
+        next(stream)
+        stream.close()
+        assert partial_scanner.cancelled, "Escaneamento não cancelado"
+        
+        # O cancelamento não vale para o escaneamento seguinte
+        rescanned = partial_scanner.scan_directory(str(project_dir))
+        assert rescanned.get_total_file_count() == root_node.get_total_file_count(), \
+            "Escaneamento após cancelamento incompleto"
+        
+        # No modo paralelo os eventos saem na mesma ordem do serial
+        def _event_keys(stream_events):
+            return [(event.kind, str(event.node.path)) for event in stream_events
+                    if event.kind != SCAN_FINISHED]
+        
+        serial_events = DirectoryScanner(supported_extensions).iter_scan(str(project_dir), parallel=False)
+        parallel_events = DirectoryScanner(supported_extensions, max_workers=8).iter_scan(
+            str(project_dir), parallel=True)
+        assert _event_keys(serial_events) == _event_keys(parallel_events), \
+            "Eventos do modo paralelo fora da ordem da árvore"
+        
+        print(f"✅ {len(added)} nós emitidos em {len(finished)} diretórios")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste de escaneamento em fluxo: {e}")
+        return False
+
+def test_deep_tree_traversal():
+    """Testa percursos em árvores mais profundas que o limite de recursão"""
+    print("\n🕳 Testando árvores profundas...")
+    
+    try:
+        import tempfile
+        import xml.etree.ElementTree as ET
+        from modules.directory_scanner import DirectoryScanner, DirectoryNode
+        from modules.export_manager import ExportManager
+        
+        depth = sys.getrecursionlimit() + 500
+        
+        # Árvore em memória
+        root_node = DirectoryNode("/raiz", is_directory=True)
+        node = root_node
+        for level in range(depth):
+            child = DirectoryNode(f"{node.path}/n{level}", is_directory=True)
+            node.add_child(child)
+            node = child
+        node.add_child(DirectoryNode(f"{node.path}/fundo.txt", is_directory=False))
+        
+        scanner = DirectoryScanner({'.txt'})
+        lines = scanner.generate_tree_text(root_node, max_items=depth + 10).split("\n")
+        assert len(lines) == depth + 2, "Linhas da árvore incorretas"
+        assert lines[-1].strip().endswith("fundo.txt"), "Folha não renderizada"
+        assert len(scanner.generate_tree_items_for_export(root_node)) == depth + 2
+        assert len(root_node.find_nodes(lambda n: not n.is_directory)) == 1
+        
+        data = root_node.to_dict()
+        assert len(data['children']) == 1, "Filhos não exportados"
+        
+        element = ET.Element("raiz")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ExportManager(temp_dir)._dict_to_xml(data, element)
+        assert element.find("children/item_0/name").text == "n0", "XML incorreto"
+        
+        # Escaneamento em disco (limitado pelo tamanho máximo de caminho)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir)
+            for level in range(200):
+                path = path / "d"
+            path.mkdir(parents=True)
+            (path / "fundo.txt").write_text("abc")
+            
+            old_limit = sys.getrecursionlimit()
+            sys.setrecursionlimit(150)
+            try:
+                disk_root = DirectoryScanner({'.txt'}).scan_directory(temp_dir, parallel=False)
+            finally:
+                sys.setrecursionlimit(old_limit)
+            assert disk_root.get_total_file_count() == 1, "Arquivo profundo não encontrado"
+        
+        print(f"✅ Árvore com {depth} níveis percorrida sem recursão")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste de árvores profundas: {e!r}")
+        return False
+
+def test_sqlite_scan_store():
+    """Testa o escaneamento gravado em SQLite"""
+    print("\n🗄 Testando armazenamento SQLite...")
+    
+    try:
+        import tempfile
+        from modules.directory_scanner import DirectoryScanner
+        from modules.scan_store import SQLiteScanStore
+        
+        supported_extensions = {'.py', '.txt', '.md'}
+        current_dir = Path(__file__).parent
+        
+        scanner = DirectoryScanner(supported_extensions)
+        root_node = scanner.scan_directory(str(current_dir))
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = SQLiteScanStore(Path(temp_dir) / "scan.sqlite3")
+            try:
+                stored_root = scanner.scan_directory_to_store(str(current_dir), store)
+                
+                assert (scanner.generate_tree_text(stored_root) ==
+                        scanner.generate_tree_text(root_node)), "Texto da árvore SQLite diferente"
+                assert stored_root.get_total_size() == root_node.get_total_size(), \
+                    "Tamanho total divergente"
+                assert (stored_root.get_extension_distribution() ==
+                        root_node.get_extension_distribution()), "Extensões divergentes"
+                
+                def paths(nodes):
+                    return sorted(str(node.path) for node in nodes)
+                
+                assert ([n.size for n in scanner.get_largest_files(stored_root, 5)] ==
+                        [n.size for n in scanner.get_largest_files(root_node, 5)]), \
+                    "Maiores arquivos divergentes"
+                assert (paths(scanner.get_files_by_extension(stored_root, 'py')) ==
+                        paths(scanner.get_files_by_extension(root_node, 'py'))), \
+                    "Arquivos por extensão divergentes"
+                assert (paths(scanner.get_empty_directories(stored_root)) ==
+                        paths(scanner.get_empty_directories(root_node))), \
+                    "Diretórios vazios divergentes"
+                assert (sorted(scanner.get_duplicate_names(stored_root)) ==
+                        sorted(scanner.get_duplicate_names(root_node))), \
+                    "Nomes duplicados divergentes"
+                assert (paths(scanner.search_nodes(stored_root, "scanner")) ==
+                        paths(scanner.search_nodes(root_node, "scanner"))), \
+                    "Busca divergente"
+                
+                modules_node = next(c for c in stored_root.children if c.name == "modules")
+                assert (paths(scanner.get_largest_directories(modules_node, 100)) ==
+                        paths(root_node.find_nodes(lambda n: n.is_directory and not n.is_excluded
+                                                   and str(n.path).startswith(str(modules_node.path))))), \
+                    "Consulta na subárvore divergente"
+            finally:
+                store.close()
+        
+        print("✅ Consultas SQL equivalentes à árvore em memória")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste do armazenamento SQLite: {e!r}")
+        return False
+
+def test_resumable_scan():
+    """Testa o escaneamento com orçamento e retomada por token"""
+    print("\n⏸ Testando escaneamento com retomada...")
+    
+    try:
+        import tempfile
+        from modules.directory_scanner import DirectoryScanner
+        from modules.scan_snapshot import ScanCheckpointStore
+        
+        supported_extensions = {'.py', '.txt', '.md'}
+        project_dir = Path(__file__).parent
+        
+        full_scanner = DirectoryScanner(supported_extensions)
+        full_root = full_scanner.scan_directory(str(project_dir))
+        
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            token = None
+            slices = 0
+            while True:
+                # Novo scanner a cada fatia, como após reiniciar o aplicativo
+                scanner = DirectoryScanner(supported_extensions,
+                                           checkpoint_store=ScanCheckpointStore(checkpoint_dir))
+                root_node, token = scanner.scan_directory_budgeted(
+                    str(project_dir), max_items=50, resume_token=token
+                )
+                slices += 1
+                if token is None:
+                    break
+                assert slices < 1000, "Escaneamento não avançou"
+            
+            assert slices > 1, "Orçamento de itens ignorado"
+            assert (scanner.generate_tree_text(root_node) ==
+                    full_scanner.generate_tree_text(full_root)), "Árvore retomada diferente"
+            assert scanner.total_files == full_scanner.total_files, "Estatísticas divergentes"
+            assert not list(Path(checkpoint_dir).glob("resume_*")), "Checkpoint não removido"
+        
+        print(f"✅ Escaneamento concluído em {slices} fatias")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste de retomada: {e!r}")
+        return False
+
+def test_traversal_policy():
+    """Testa a detecção de ciclos de links simbólicos e de hardlinks"""
+    print("\n🔗 Testando política de percurso...")
+    
+    try:
+        import os
+        import tempfile
+        from modules.directory_scanner import DirectoryScanner, TraversalPolicy
+        
+        if not hasattr(os, "symlink") or not hasattr(os, "link"):
+            print("⚠️ Links indisponíveis nesta plataforma, teste ignorado")
+            return True
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir)
+            (base / "dados" / "sub").mkdir(parents=True)
+            (base / "dados" / "sub" / "a.txt").write_text("x" * 100)
+            os.link(base / "dados" / "sub" / "a.txt", base / "dados" / "b.txt")
+            os.symlink(base / "dados", base / "dados" / "sub" / "ciclo")
+            
+            scanner = DirectoryScanner({'.txt'}, traversal_policy=TraversalPolicy(
+                follow_symlinks=True, dedupe_hardlinks=True
+            ))
+            root_node = scanner.scan_directory(temp_dir, parallel=False)
+            stats = scanner.get_statistics()
+            
+            assert stats['skipped_loops'] == 1, "Ciclo não detectado"
+            assert stats['duplicate_files'] == 1, "Hardlink não detectado"
+            assert stats['duplicate_bytes'] == 100, "Bytes duplicados incorretos"
+            assert stats['total_size'] == 100, "Hardlink somado duas vezes"
+            assert root_node.get_total_file_count() == 2, "Árvore incorreta"
+            
+            scanner = DirectoryScanner({'.txt'}, traversal_policy=TraversalPolicy(
+                follow_symlinks=False
+            ))
+            scanner.scan_directory(temp_dir, parallel=False)
+            stats = scanner.get_statistics()
+            assert stats['skipped_symlinks'] == 1, "Link simbólico seguido"
+            assert stats['skipped_loops'] == 0, "Ciclo contado sem seguir links"
+            
+            compact_tree = scanner.scan_directory_compact(temp_dir)
+            assert compact_tree.root.get_total_file_count() == 2, "Árvore compacta incorreta"
+        
+        print("✅ Ciclos e hardlinks tratados")
+        
+        # Links para diretórios vizinhos: a posse de cada diretório não pode
+        # depender de qual worker chega primeiro
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir)
+            for index in range(30):
+                folder = base / f"pasta{index:02d}"
+                (folder / "interna").mkdir(parents=True)
+                (folder / "a.txt").write_text("x" * index)
+            for index in range(30):
+                os.symlink(base / f"pasta{(index + 1) % 30:02d}",
+                           base / f"pasta{index:02d}" / "vizinha")
+            
+            def _scan(parallel):
+                scanner = DirectoryScanner({'.txt'}, max_workers=8, traversal_policy=TraversalPolicy(
+                    follow_symlinks=True, dedupe_hardlinks=True
+                ))
+                root_node = scanner.scan_directory(temp_dir, parallel=parallel)
+                nodes = [(str(node.path), node.size) for node in root_node.find_nodes(lambda n: True)]
+                stats = scanner.get_statistics()
+                return nodes, stats['total_size'], stats['skipped_loops']
+            
+            expected = _scan(False)
+            for _ in range(10):
+                assert _scan(True) == expected, "Árvore paralela com links diferente da serial"
+        
+        print("✅ Links simbólicos resolvidos como no modo serial")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste da política de percurso: {e!r}")
+        return False
+
+def test_scan_collectors():
+    """Testa as análises coletadas durante o escaneamento"""
+    print("\n📊 Testando coletores de análises...")
+    
+    try:
+        from modules.directory_scanner import DirectoryScanner
+        from modules.scan_analytics import default_collectors
+        
+        supported_extensions = {'.py', '.txt', '.md'}
+        current_dir = Path(__file__).parent
+        
+        scanner = DirectoryScanner(supported_extensions, collectors=default_collectors(20))
+        root_node = scanner.scan_directory(str(current_dir), parallel=False)
+        plain_scanner = DirectoryScanner(supported_extensions)
+        
+        assert ([n.path for n in scanner.get_largest_files(root_node, 10)] ==
+                [n.path for n in plain_scanner.get_largest_files(root_node, 10)]), \
+            "Maiores arquivos divergentes"
+        assert ([n.path for n in scanner.get_largest_directories(root_node, 10)] ==
+                [n.path for n in plain_scanner.get_largest_directories(root_node, 10)]), \
+            "Maiores diretórios divergentes"
+        assert (scanner.get_size_histogram(root_node) ==
+                plain_scanner.get_size_histogram(root_node)), "Histograma de tamanhos divergente"
+        assert (sum(count for _, count in scanner.get_age_histogram(root_node)) ==
+                root_node.get_total_file_count()), "Histograma de idade incompleto"
+        assert (sum(scanner.get_extension_bytes(root_node).values()) ==
+                root_node.get_total_size()), "Bytes por extensão divergentes"
+        
+        print("✅ Análises pré-calculadas equivalentes às calculadas sob demanda")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste dos coletores: {e!r}")
+        return False
+
+def test_duplicate_files():
+    """Testa a detecção de arquivos com conteúdo duplicado"""
+    print("\n🧬 Testando detecção de conteúdo duplicado...")
+    
+    try:
+        import tempfile
+        from modules.directory_scanner import DirectoryScanner
+        from modules.duplicate_finder import HashCache
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir)
+            (base / "sub").mkdir()
+            big = os.urandom(300 * 1024)
+            (base / "a.bin").write_bytes(big)
+            (base / "sub" / "b.bin").write_bytes(big)
+            # Mesmo tamanho, início e fim: só o hash completo os separa
+            (base / "c.bin").write_bytes(big[:150 * 1024] + b"x" + big[150 * 1024 + 1:])
+            (base / "d.txt").write_text("igual")
+            (base / "e.txt").write_text("igual")
+            (base / "f.txt").write_text("outro")
+            
+            cache_path = base / "cache" / "hashes.json"
+            scanner = DirectoryScanner({'.txt', '.bin'}, hash_cache=HashCache(cache_path))
+            root_node = scanner.scan_directory(str(base), parallel=False)
+            groups = scanner.get_duplicate_files(root_node)
+            names = [sorted(node.name for node in group) for group in groups]
+            
+            assert names == [["a.bin", "b.bin"], ["d.txt", "e.txt"]], f"Grupos incorretos: {names}"
+            assert cache_path.exists(), "Cache de hashes não gravado"
+            
+            # Arquivos inalterados não são lidos de novo
+            from modules.duplicate_finder import DuplicateFinder
+            finder = DuplicateFinder(hash_cache=HashCache(cache_path))
+            files = root_node.find_nodes(lambda n: not n.is_directory)
+            assert len(finder.find(files)) == 2, "Resultado do cache divergente"
+            assert finder.bytes_read == 0, "Cache de hashes não reaproveitado"
+        
+        print("✅ Duplicatas encontradas e hashes reaproveitados do cache")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste de duplicatas: {e!r}")
+        return False
+
+def test_content_index():
+    """Testa o índice de trigramas da busca no conteúdo"""
+    print("\n🔎 Testando índice de conteúdo...")
+    
+    try:
+        import tempfile
+        from modules.directory_scanner import DirectoryScanner
+        from modules.content_index import ContentIndex, required_literals
+        
+        assert required_literals(r"def\s+scan_(\w+)\.py") == ["def", "scan_", ".py"], \
+            "Literais obrigatórios incorretos"
+        assert required_literals("foo|bar") == [], "Alternativa não deveria restringir"
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir) / "tree"
+            (base / "sub").mkdir(parents=True)
+            (base / "a.txt").write_text("Olá mundo, AGULHA no palheiro", encoding='utf-8')
+            (base / "sub" / "b.md").write_text("nada aqui", encoding='utf-8')
+            (base / "sub" / "c.py").write_text("def agulha_42(): pass", encoding='utf-8')
+            
+            index = ContentIndex(Path(temp_dir) / "index.sqlite3")
+            scanner = DirectoryScanner({'.txt', '.md', '.py'}, content_index=index)
+            plain_scanner = DirectoryScanner({'.txt', '.md', '.py'})
+            root_node = scanner.scan_directory(str(base), parallel=False)
+            
+            assert scanner.update_content_index(root_node) == (3, 0), "Indexação incompleta"
+            assert scanner.update_content_index(root_node) == (0, 0), "Arquivos inalterados relidos"
+            
+            names = lambda nodes: sorted(node.name for node in nodes)
+            for query, regex in (("agulha", False), ("palheiro", False), (r"agulha_\d+", True)):
+                assert (names(scanner.search_nodes(root_node, query, True, regex)) ==
+                        names(plain_scanner.search_nodes(root_node, query, True, regex))), \
+                    f"Busca divergente para {query!r}"
+            assert names(scanner.search_nodes(root_node, "agulha", True)) == ["a.txt", "c.py"], \
+                "Busca no conteúdo incorreta"
+            
+            (base / "sub" / "b.md").write_text("agora com agulha", encoding='utf-8')
+            (base / "a.txt").unlink()
+            root_node = scanner.scan_directory(str(base), parallel=False)
+            indexed, removed = scanner.update_content_index(root_node)
+            assert (indexed, removed) == (1, 1), f"Atualização incremental incorreta: {indexed, removed}"
+            assert names(scanner.search_nodes(root_node, "agulha", True)) == ["b.md", "c.py"], \
+                "Índice não atualizado"
+            
+            # Sem sincronização explícita, a primeira busca no conteúdo monta o índice
+            (base / "sub" / "d.txt").write_text("mais uma agulha", encoding='utf-8')
+            lazy_scanner = DirectoryScanner({'.txt', '.md', '.py'}, content_index=index)
+            root_node = lazy_scanner.scan_directory(str(base), parallel=False)
+            assert not lazy_scanner._is_content_indexed(root_node), "Índice montado no escaneamento"
+            assert names(lazy_scanner.search_nodes(root_node, "agulha", True)) == ["b.md", "c.py", "d.txt"], \
+                "Busca com índice montado sob demanda incorreta"
+            assert lazy_scanner._is_content_indexed(root_node), "Índice não montado na busca"
+            index.close()
+        
+        print("✅ Busca pelo índice equivalente à leitura direta dos arquivos")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste do índice de conteúdo: {e!r}")
+        return False
+
+def test_name_index():
+    """Testa o índice de nomes e caminhos"""
+    print("\n🔤 Testando índice de nomes...")
+    
+    try:
+        from modules.directory_scanner import DirectoryScanner
+        from modules.name_index import NameIndex
+        
+        current_dir = Path(__file__).parent
+        scanner = DirectoryScanner({'.py', '.txt', '.md'})
+        root_node = scanner.scan_directory(str(current_dir), parallel=False)
+        name_index = NameIndex(root_node)
+        
+        for query in ("scanner", "PY", "e", "modules", "_", "modules" + os.sep + "tree",
+                      current_dir.name, "inexistente_xyz"):
+            query_lower = query.lower()
+            expected = root_node.find_nodes(lambda n: query_lower in str(n.path).lower())
+            assert name_index.substring(query) == expected, f"Busca divergente para {query!r}"
+            assert scanner.search_nodes(root_node, query) == expected, \
+                f"search_nodes divergente para {query!r}"
+        
+        expected = root_node.find_nodes(lambda n: n.name.lower().startswith("test_"))
+        assert name_index.prefix("TEST_") == expected, "Busca por prefixo divergente"
+        
+        print(f"✅ Índice de {len(name_index)} nós equivalente à busca linear")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste do índice de nomes: {e!r}")
+        return False
+
+def test_scan_snapshot():
+    """Testa o reescaneamento incremental a partir de snapshot"""
+    print("\n💾 Testando snapshot de escaneamento...")
+    
+    try:
+        import tempfile
+        from modules.directory_scanner import DirectoryScanner
+        from modules.scan_snapshot import ScanSnapshotStore
+        
+        supported_extensions = {'.py', '.txt', '.md'}
+        modules_dir = Path(__file__).parent / "modules"
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            store = ScanSnapshotStore(cache_dir)
+            
+            first_scanner = DirectoryScanner(supported_extensions, snapshot_store=store)
+            first_root = first_scanner.scan_directory(str(modules_dir))
+            
+            second_scanner = DirectoryScanner(supported_extensions, snapshot_store=store)
+            second_root = second_scanner.scan_directory(str(modules_dir))
+            
+            assert second_scanner.reused_directories > 0, "Snapshot não reaproveitado"
+            assert (first_scanner.generate_tree_text(first_root) ==
+                    second_scanner.generate_tree_text(second_root)), \
+                "Árvore reescaneada diferente"
+            assert first_scanner.total_size == second_scanner.total_size, \
+                "Tamanho total divergente"
+            print(f"✅ Reescaneamento reaproveitou {second_scanner.reused_directories} diretórios")
+        
+        # .gitignore editado no lugar não muda o mtime do diretório: sem reaproveitamento
+        with tempfile.TemporaryDirectory() as temp_dir:
+            from modules.exclusion_manager import ExclusionManager, ExclusionRule
+            
+            base = Path(temp_dir) / "arvore"
+            (base / "sub").mkdir(parents=True)
+            (base / "sub" / "a.log").write_text("log", encoding="utf-8")
+            (base / ".gitignore").write_text("*.tmp\n", encoding="utf-8")
+            
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            exclusion_manager.create_profile("Snapshot", "Perfil de teste")
+            exclusion_manager.set_current_profile("Snapshot")
+            exclusion_manager.add_rule_to_current_profile(
+                ExclusionRule('gitignore', '.gitignore', 'Arquivos .gitignore'))
+            store = ScanSnapshotStore(str(Path(temp_dir) / "cache"))
+            
+            def _log_excluded():
+                scanner = DirectoryScanner({'.py'}, exclusion_manager=exclusion_manager,
+                                           snapshot_store=store)
+                root = scanner.scan_directory(str(base))
+                sub = next(child for child in root.children if child.name == "sub")
+                assert scanner.reused_directories == 0, "Snapshot reaproveitado com regra .gitignore"
+                return sub.children[0].is_excluded
+            
+            assert not _log_excluded(), "a.log excluído antes da edição"
+            (base / ".gitignore").write_text("*.tmp\n*.log\n", encoding="utf-8")
+            assert _log_excluded(), "Edição do .gitignore ignorada no reescaneamento"
+            print("✅ Edição do .gitignore respeitada no reescaneamento")
+        
+        # Regras de data são relativas ao relógio: o arquivo passa do limite sem mudar no disco
+        with tempfile.TemporaryDirectory() as temp_dir:
+            from datetime import datetime, timedelta
+            import modules.exclusion_manager as exclusion_module
+            from modules.exclusion_manager import ExclusionManager, ExclusionRule
+            
+            class _ThreeDaysLater(datetime):
+                @classmethod
+                def now(cls, tz=None):
+                    return datetime.now(tz) + timedelta(days=3)
+            
+            base = Path(temp_dir) / "arvore"
+            base.mkdir()
+            (base / "antigo.txt").write_text("texto", encoding="utf-8")
+            
+            exclusion_manager = ExclusionManager(config_dir=temp_dir, save_delay=0)
+            exclusion_manager.create_profile("Datas", "Perfil de teste")
+            exclusion_manager.set_current_profile("Datas")
+            exclusion_manager.add_rule_to_current_profile(
+                ExclusionRule('date', '<2d', 'Mais de 2 dias'))
+            store = ScanSnapshotStore(str(Path(temp_dir) / "cache"))
+            
+            def _old_excluded():
+                scanner = DirectoryScanner({'.txt'}, exclusion_manager=exclusion_manager,
+                                           snapshot_store=store)
+                root = scanner.scan_directory(str(base))
+                assert scanner.reused_directories == 0, "Snapshot reaproveitado com regra de data"
+                return root.children[0].is_excluded
+            
+            assert not _old_excluded(), "Arquivo recente excluído"
+            original_datetime = exclusion_module.datetime
+            exclusion_module.datetime = _ThreeDaysLater
+            try:
+                assert _old_excluded(), "Regra de data não reavaliada no reescaneamento"
+            finally:
+                exclusion_module.datetime = original_datetime
+            print("✅ Regra de data reavaliada no reescaneamento")
+        
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erro no teste de snapshot: {e}")
+        return False
+
+def test_directory_watcher():
+    """Testa o modo de observação do scanner de diretórios"""
+    print("\n👁 Testando observação de diretórios...")
+    
+    try:
+        import tempfile
+        import threading
+        from modules.directory_scanner import DirectoryScanner
+        from modules.directory_watcher import is_watch_supported
+        
+        if not is_watch_supported():
+            print("⚠️ inotify indisponível nesta plataforma, teste ignorado")
+            return True
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "docs").mkdir()
+            (Path(temp_dir) / "docs" / "leia.txt").write_text("abc")
+            
+            scanner = DirectoryScanner({'.txt', '.py'})
+            root_node = scanner.scan_directory(temp_dir)
+            
+            updated = threading.Event()
+            scanner.set_status_callback(lambda status: updated.set())
+            watcher = scanner.watch(root_node, debounce=0.05)
+            updated.clear()
+            
+            try:
+                (Path(temp_dir) / "docs" / "novo.py").write_text("print('ok')")
+                (Path(temp_dir) / "docs" / "leia.txt").unlink()
+                assert updated.wait(5), "Alterações não notificadas"
+            finally:
+                watcher.stop()
+            
+            docs = root_node.children[0]
+            assert [child.name for child in docs.children] == ["novo.py"], "Árvore não atualizada"
+            assert root_node.get_total_size() == len("print('ok')"), "Agregados não atualizados"
+            assert dict(scanner.extension_distribution) == {'.py': 1}, "Estatísticas não atualizadas"
+            print("✅ Criação e remoção aplicadas à árvore e às estatísticas")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro no teste de observação: {e}")
+        return False
+
 def test_file_processor():
     """Testa o processador de arquivos"""
     print("\n📄 Testando processador de arquivos...")
@@ -260,6 +1012,20 @@ def main():
         ("ConfigManager", test_config_manager),
         ("ExclusionManager", test_exclusion_manager),
         ("DirectoryScanner", test_directory_scanner),
+        ("DirectoryScanner paralelo", test_parallel_directory_scanner),
+        ("Exclusões em paralelo", test_parallel_exclusions),
+        ("DirectoryScanner compacto", test_compact_directory_scanner),
+        ("DirectoryScanner em fluxo", test_streaming_directory_scanner),
+        ("Árvores profundas", test_deep_tree_traversal),
+        ("Armazenamento SQLite", test_sqlite_scan_store),
+        ("Escaneamento com retomada", test_resumable_scan),
+        ("Política de percurso", test_traversal_policy),
+        ("Coletores de análises", test_scan_collectors),
+        ("Conteúdo duplicado", test_duplicate_files),
+        ("Índice de conteúdo", test_content_index),
+        ("Índice de nomes", test_name_index),
+        ("Snapshot de escaneamento", test_scan_snapshot),
+        ("Observação de diretórios", test_directory_watcher),
         ("FileProcessor", test_file_processor),
         ("ExportManager", test_export_manager)
     ]